@@ -1,35 +1,31 @@
 import xml.etree.ElementTree as ET
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
 import os
 import json
 
-import re
+from glossary_schema import load_glossary_schema
 
 def parse_glossary_file(glossary_filepath):
-    """Parses the glossary file to extract all defined XML tags."""
-    tags = set()
+    """Returns all XML tags defined in the glossary, from its compiled schema (rebuilt only when the glossary changes)."""
     try:
-        with open(glossary_filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Regex to find <tag_name ...> or <tag_name> or </tag_name>
-        # This will capture root tags and sub-tags mentioned in the glossary
-        # It's a simplified approach; a more robust parser might be needed for complex glossary structures
-        # but for extracting tag names, this should be a good start.
-        # It specifically looks for tags starting with < followed by a letter,
-        # and captures the tag name itself.
-        found_tags = re.findall(r"<([a-zA-Z][a-zA-Z0-9_:]*)\s*[^>]*?>", content)
-        tags.update(found_tags)
-
-        # Also capture closing tags to ensure we get all unique names
-        closing_tags = re.findall(r"</([a-zA-Z][a-zA-Z0-9_:]*)>", content)
-        tags.update(closing_tags)
-
+        return set(load_glossary_schema(glossary_filepath)["tags"])
     except FileNotFoundError:
         print(f"Glossary file not found: {glossary_filepath}")
-    return tags
+        return set()
+
+DEFAULT_CACHE_FILE = ".tag_analysis_cache.json"
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compares the tags used in 01_Core XML files against the glossary.")
+    arg_parser.add_argument("--jobs", type=int, default=1, help="Worker processes for scanning files (default: 1, serial).")
+    arg_parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE,
+                            help=f"Per-file tag counts from earlier runs; only changed files are rescanned (default: {DEFAULT_CACHE_FILE}).")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Rescan every file and leave the cache untouched.")
+    args = arg_parser.parse_args(argv)
 
-def main():
     core_data_dir = "01_Core"
     glossary_file = "glossary_xml_tags_v1.txt"
 
@@ -45,7 +41,8 @@ def main():
 
     print(f"Found {len(all_project_xml_files)} XML files to analyze.")
 
-    all_found_tags, discrepancies = analyze_files_for_tags(all_project_xml_files, GLOSSARY_TAGS)
+    all_found_tags, discrepancies = analyze_files_for_tags(all_project_xml_files, GLOSSARY_TAGS, jobs=args.jobs,
+                                                           cache_file=None if args.no_cache else args.cache_file)
 
     output = {
         "glossary_tags_count": len(GLOSSARY_TAGS),
@@ -76,19 +73,81 @@ def main():
 
     print("\nAnalysis complete. Report saved to tag_analysis_report.json")
 
-def analyze_files_for_tags(xml_files, glossary_tags_set):
+def analyze_files_for_tags(xml_files, glossary_tags_set, jobs=1, cache_file=None):
     """Analyzes XML files to find unique tags and discrepancies against a glossary set."""
     discrepancies = defaultdict(list)
     all_found_tags = set()
-    for xml_file in xml_files:
+    for xml_file, tag_counts in count_tags_in_files(xml_files, jobs=jobs, cache_file=cache_file):
         # print(f"Analyzing: {xml_file}")
-        tags_in_file = get_unique_tags_in_file(xml_file)
-        all_found_tags.update(tags_in_file)
-        for tag in tags_in_file:
+        all_found_tags.update(tag_counts)
+        for tag in tag_counts:
             if tag not in glossary_tags_set:
                 discrepancies[tag].append(xml_file)
     return all_found_tags, discrepancies
 
+def count_tags_in_files(xml_files, jobs=1, cache_file=None):
+    """
+    Returns [(xml_file, Counter of tag -> occurrences), ...] in the order of xml_files.
+
+    With a cache_file, files whose (mtime, size) match their cached entry reuse the cached counts
+    and only new or changed files are scanned; with jobs > 1 those are spread over a process pool.
+    Files that fail to parse are never cached, so they are retried (and reported) every run.
+    """
+    cache = load_tag_cache(cache_file) if cache_file else {}
+    stat_keys = {xml_file: _stat_key(xml_file) for xml_file in xml_files}
+    counts = {}
+    for xml_file in xml_files:
+        entry = cache.get(xml_file)
+        if entry and stat_keys[xml_file] == (entry["mtime_ns"], entry["size"]):
+            counts[xml_file] = Counter(entry["tags"])
+
+    pending = [xml_file for xml_file in xml_files if xml_file not in counts]
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            scanned = list(executor.map(_scan_file, pending))
+    else:
+        scanned = [_scan_file(xml_file) for xml_file in pending]
+    for xml_file, (tag_counts, error) in zip(pending, scanned):
+        counts[xml_file] = tag_counts
+        if error:
+            print(error)
+        elif stat_keys[xml_file] is not None:
+            mtime_ns, size = stat_keys[xml_file]
+            cache[xml_file] = {"mtime_ns": mtime_ns, "size": size, "tags": dict(tag_counts)}
+
+    if cache_file and pending:
+        store_tag_cache(cache_file, {xml_file: entry for xml_file, entry in cache.items() if xml_file in stat_keys})
+    return [(xml_file, counts[xml_file]) for xml_file in xml_files]
+
+def _stat_key(filepath):
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _analyzer_fingerprint():
+    """Hash of this module's source, so changing how tags are counted invalidates the cache."""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_tag_cache(cache_file):
+    """{path: {"mtime_ns", "size", "tags": {tag: count}}}, or {} if the cache is missing or stale."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("analyzer") != _analyzer_fingerprint():
+        return {}
+    return cache.get("files", {})
+
+def store_tag_cache(cache_file, entries):
+    temp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"analyzer": _analyzer_fingerprint(), "files": entries}, f, indent=1, sort_keys=True)
+    os.replace(temp_path, cache_file)
+
 def get_all_xml_files(root_dir):
     """Finds all .xml files in the given directory and its subdirectories."""
     xml_files = []
@@ -102,16 +161,41 @@ def get_all_xml_files(root_dir):
 
 def get_unique_tags_in_file(filepath):
     """Extracts all unique tags from a single XML file."""
-    tags = set()
+    return set(count_tags_in_file(filepath))
+
+def count_tags_in_file(filepath):
+    """Counts the occurrences of each tag in a single XML file (empty if it can't be parsed)."""
+    tag_counts, error = _scan_file(filepath)
+    if error:
+        print(error)
+    return tag_counts
+
+def _scan_file(filepath):
+    """
+    Streams filepath with iterparse, counting tags as elements start and dropping each element
+    once it ends, so memory stays flat however large the file is. Returns (Counter, error message
+    or None); like ET.parse, a file that fails to parse yields no tags.
+    """
+    tag_counts = Counter()
     try:
-        tree = ET.parse(filepath)
-        for element in tree.iter():
-            tags.add(element.tag)
+        context = ET.iterparse(filepath, events=("start", "end"))
+        _, root = next(context)
+        tag_counts[root.tag] += 1
+        depth = 0
+        for event, elem in context:
+            if event == "start":
+                tag_counts[elem.tag] += 1
+                depth += 1
+                continue
+            depth -= 1
+            elem.clear()
+            if depth == 0 and elem is not root:
+                root.remove(elem)
     except ET.ParseError as e:
-        print(f"Could not parse {filepath}: {e}")
+        return Counter(), f"Could not parse {filepath}: {e}"
     except FileNotFoundError:
-        print(f"File not found: {filepath}")
-    return tags
+        return Counter(), f"File not found: {filepath}"
+    return tag_counts, None
 
 # Removed the duplicated/older main() function that was here.
 
@@ -0,0 +1,59 @@
+import argparse
+import copy
+import json
+import tracemalloc
+from time import perf_counter
+
+from parse_bestiary import monster_glossary_template, new_monster_record
+
+def json_round_trip_copy():
+    """The previous approach used by initialize_monster_data."""
+    return json.loads(json.dumps(monster_glossary_template))
+
+def deepcopy_copy():
+    return copy.deepcopy(monster_glossary_template)
+
+STRATEGIES = [
+    ("json round-trip", json_round_trip_copy),
+    ("copy.deepcopy", deepcopy_copy),
+    ("record factory", new_monster_record),
+]
+
+def time_strategy(factory, count):
+    start = perf_counter()
+    for _ in range(count):
+        factory()
+    return perf_counter() - start
+
+def retained_bytes_per_record(factory, count):
+    """Average bytes held by each live record, measured with tracemalloc."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    records = [factory() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return (after - before) / count
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compares ways of creating fresh monster records from the glossary template.")
+    arg_parser.add_argument("--count", type=int, default=100_000, help="Number of monster records to create per strategy (default: 100000).")
+    arg_parser.add_argument("--alloc-count", type=int, default=10_000, help="Number of records kept alive to measure memory per record (default: 10000).")
+    args = arg_parser.parse_args(argv)
+
+    for _, factory in STRATEGIES:
+        if factory() != monster_glossary_template:
+            raise SystemExit(f"{factory.__name__} does not reproduce the template")
+
+    print(f"Creating {args.count} monster records per strategy\n")
+    print(f"{'strategy':<16}  {'total s':>8}  {'us/record':>9}  {'speedup':>7}  {'KiB/record':>10}")
+    baseline_seconds = None
+    for label, factory in STRATEGIES:
+        seconds = time_strategy(factory, args.count)
+        if baseline_seconds is None:
+            baseline_seconds = seconds
+        retained = retained_bytes_per_record(factory, args.alloc_count)
+        print(f"{label:<16}  {seconds:>8.3f}  {seconds * 1e6 / args.count:>9.2f}  {baseline_seconds / seconds:>6.1f}x  {retained / 1024:>10.2f}")
+
+if __name__ == "__main__":
+    main()
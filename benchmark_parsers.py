@@ -0,0 +1,267 @@
+import argparse
+import contextlib
+import copy
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from time import perf_counter
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# parser -> real inputs the replicated corpora are built from
+CORPUS_SOURCES = {
+    "parse_bestiary": "01_Core/bestiaries/*.xml",
+    "parse_spells": "deprecated/spells-phb24.xml",
+    "item_parser": "01_Core/items/items-phb24.xml",
+    "parse_races": "01_Core/races/races-phb24.xml",
+    "parse_maneuvers_to_xml": "maneuvers.json",
+}
+DEFAULT_SCALES = [1, 10, 100]
+
+def count_output_elements(path, tag):
+    """Top-level <tag> elements of a parser's output file; 0 if it wasn't written."""
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    for _, elem in ET.iterparse(path):
+        if elem.tag == tag:
+            count += 1
+            elem.clear()
+    return count
+
+def replicate_files(pattern, corpus_dir, scale):
+    """scale byte-for-byte copies of every matching file; returns the copied paths."""
+    paths = []
+    for source in sorted(glob.glob(os.path.join(REPO_DIR, pattern))):
+        stem, ext = os.path.splitext(os.path.basename(source))
+        for copy_number in range(scale):
+            target = os.path.join(corpus_dir, f"{stem}_x{copy_number}{ext}")
+            shutil.copyfile(source, target)
+            paths.append(target)
+    return paths
+
+def replicate_xml_children(source, target, scale):
+    """Writes target with every top-level child of source repeated scale times."""
+    tree = ET.parse(source)
+    root = tree.getroot()
+    originals = list(root)
+    for _ in range(scale - 1):
+        root.extend(copy.deepcopy(child) for child in originals)
+    tree.write(target, encoding="UTF-8", xml_declaration=True)
+    return len(originals) * scale
+
+def replicate_json_entries(source, target, scale):
+    """Writes target with every key of a JSON object repeated scale times (copies get a suffix)."""
+    with open(source, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    replicated = {}
+    for copy_number in range(scale):
+        suffix = f" ({copy_number})" if copy_number else ""
+        for name, value in entries.items():
+            replicated[name + suffix] = value
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(replicated, f)
+    return len(replicated)
+
+# Each parser has a prepare step (builds the replicated corpus, run in the parent process; it may
+# return the entity count it wrote) and a run step (parses it, run in a fresh worker, and returns
+# the number of entities actually parsed). Run steps take the worker process count; parsers
+# without a parallel mode ignore it.
+
+def prepare_parse_bestiary(corpus_dir, scale):
+    replicate_files(CORPUS_SOURCES["parse_bestiary"], corpus_dir, scale)
+
+def run_parse_bestiary(corpus_dir, jobs=1):
+    from parse_bestiary import parse_shards
+    shards = parse_shards(sorted(glob.glob(os.path.join(corpus_dir, "*.xml"))), jobs=jobs)
+    return sum(len(monsters) for _, monsters in shards)
+
+def prepare_parse_spells(corpus_dir, scale):
+    return replicate_xml_children(os.path.join(REPO_DIR, CORPUS_SOURCES["parse_spells"]), os.path.join(corpus_dir, "spells.xml"), scale)
+
+def run_parse_spells(corpus_dir, jobs=1):
+    from parse_spells import parse_spell_files
+    counts = parse_spell_files([os.path.join(corpus_dir, "spells.xml")], os.path.join(corpus_dir, "out"), jobs=jobs)
+    return sum(counts.values())
+
+def prepare_item_parser(corpus_dir, scale):
+    return replicate_xml_children(os.path.join(REPO_DIR, CORPUS_SOURCES["item_parser"]), os.path.join(corpus_dir, "items.xml"), scale)
+
+def run_item_parser(corpus_dir, jobs=1):
+    from item_parser import parse_item_files
+    counts = parse_item_files([os.path.join(corpus_dir, "items.xml")], corpus_dir, jobs=jobs)
+    return sum(counts.values())
+
+def prepare_parse_races(corpus_dir, scale):
+    return replicate_xml_children(os.path.join(REPO_DIR, CORPUS_SOURCES["parse_races"]), os.path.join(corpus_dir, "races.xml"), scale)
+
+def run_parse_races(corpus_dir, jobs=1):
+    from parse_races import parse_races
+    parse_races(os.path.join(corpus_dir, "races.xml"), os.path.join(corpus_dir, "races-parsed.xml"))
+    return count_output_elements(os.path.join(corpus_dir, "races-parsed.xml"), "race")
+
+def prepare_parse_maneuvers(corpus_dir, scale):
+    return replicate_json_entries(os.path.join(REPO_DIR, CORPUS_SOURCES["parse_maneuvers_to_xml"]), os.path.join(corpus_dir, "maneuvers.json"), scale)
+
+def run_parse_maneuvers(corpus_dir, jobs=1):
+    from parse_maneuvers_to_xml import main as parse_maneuvers_main
+    parse_maneuvers_main(os.path.join(corpus_dir, "maneuvers.json"), os.path.join(corpus_dir, "maneuvers.xml"))
+    return count_output_elements(os.path.join(corpus_dir, "maneuvers.xml"), "maneuver")
+
+PARSERS = {
+    "parse_bestiary": (prepare_parse_bestiary, run_parse_bestiary),
+    "parse_spells": (prepare_parse_spells, run_parse_spells),
+    "item_parser": (prepare_item_parser, run_item_parser),
+    "parse_races": (prepare_parse_races, run_parse_races),
+    "parse_maneuvers_to_xml": (prepare_parse_maneuvers, run_parse_maneuvers),
+}
+
+def run_worker(parser_name, corpus_dir, jobs=1):
+    """
+    Parses a prepared corpus in this process and prints a JSON result line. Each measurement
+    gets its own process so ru_maxrss is that parser's peak and nothing else's. With jobs > 1
+    the parser's own worker processes are measured separately (see children_peak_rss_kib).
+    """
+    sys.path.insert(0, REPO_DIR)
+    _, run = PARSERS[parser_name]
+    start = perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        entities = run(corpus_dir, jobs)
+    seconds = perf_counter() - start
+    print(json.dumps({"entities": entities, "wall_seconds": seconds, "peak_rss_mb": round(peak_rss_kib() / 1024, 1),
+                      "children_peak_rss_mb": round(children_peak_rss_kib() / 1024, 1)}))
+
+def peak_rss_kib():
+    """
+    Peak resident set size of this process. Linux carries ru_maxrss over from the forking
+    parent across exec, so VmHWM (reset with the new address space) is preferred there.
+    """
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+def children_peak_rss_kib():
+    """
+    Peak resident set size of the largest child process this process has waited for (the
+    parser's --jobs workers), 0 if it started none. It is the biggest single worker, not the
+    sum of the workers that ran at the same time.
+    """
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def measure(parser_name, scale, repeat, jobs=1):
+    """Builds the scale-x corpus once, then keeps the fastest of repeat worker runs; peak RSS figures are the largest seen."""
+    prepare, _ = PARSERS[parser_name]
+    best = None
+    with tempfile.TemporaryDirectory(prefix=f"bench_{parser_name}_") as corpus_dir:
+        expected_entities = prepare(corpus_dir, scale)
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", parser_name, corpus_dir, str(jobs)],
+                                       capture_output=True, text=True, cwd=REPO_DIR)
+            if completed.returncode != 0:
+                print(f"Error: {parser_name} at {scale}x failed:\n{completed.stderr.strip()}")
+                return None
+            run_result = json.loads(completed.stdout.strip().splitlines()[-1])
+            peaks = {key: max(run_result[key], best[key] if best else 0) for key in ("peak_rss_mb", "children_peak_rss_mb")}
+            if best is None or run_result["wall_seconds"] < best["wall_seconds"]:
+                best = dict(run_result)
+            best.update(peaks)
+
+    entities = best["entities"]
+    if expected_entities is not None and entities != expected_entities:
+        print(f"Warning: {parser_name} at {scale}x parsed {entities} of the {expected_entities} entities in its corpus")
+    seconds = best["wall_seconds"]
+    return {
+        "parser": parser_name,
+        "scale": scale,
+        "jobs": jobs,
+        "entities": entities,
+        "wall_seconds": round(seconds, 4),
+        "entities_per_second": round(entities / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": best["peak_rss_mb"],                    # the measuring process only
+        "children_peak_rss_mb": best["children_peak_rss_mb"],  # its largest worker process, 0 without --jobs
+    }
+
+def find_regressions(results, baseline_path, max_regression):
+    """Results whose throughput dropped more than max_regression (a fraction) below the baseline run."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r["parser"], r["scale"], r.get("jobs", 1)): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["parser"], result["scale"], result["jobs"]))
+        if not previous or not previous.get("entities_per_second") or not result.get("entities_per_second"):
+            continue
+        change = result["entities_per_second"] / previous["entities_per_second"] - 1
+        result["throughput_change"] = round(change, 4)
+        if change < -max_regression:
+            regressions.append(result)
+    return regressions
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmarks the repository parsers on replicated 01_Core corpora.")
+    arg_parser.add_argument("--parsers", nargs="+", choices=list(PARSERS), default=list(PARSERS),
+                            help="Parsers to benchmark (default: all).")
+    arg_parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES,
+                            help="Corpus replication factors (default: 1 10 100).")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement; the fastest is reported (default: 1).")
+    arg_parser.add_argument("--jobs", type=int, default=1,
+                            help="Worker processes for parsers with a parallel mode: parse_bestiary, parse_spells, item_parser (default: 1).")
+    arg_parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results.")
+    arg_parser.add_argument("--baseline", help="Earlier results JSON to compare throughput against.")
+    arg_parser.add_argument("--max-regression", type=float, default=0.10,
+                            help="Allowed throughput drop against --baseline before failing, as a fraction (default: 0.10).")
+    arg_parser.add_argument("--worker", nargs=3, metavar=("PARSER", "CORPUS_DIR", "JOBS"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], int(args.worker[2]))
+        return
+
+    results = []
+    print(f"{'parser':<24}  {'scale':>5}  {'jobs':>4}  {'entities':>9}  {'wall s':>8}  {'entities/s':>11}  "
+          f"{'main RSS MB':>11}  {'max worker RSS MB':>17}")
+    for parser_name in args.parsers:
+        for scale in args.scales:
+            result = measure(parser_name, scale, args.repeat, args.jobs)
+            if result is None:
+                continue
+            results.append(result)
+            print(f"{parser_name:<24}  {scale:>4}x  {args.jobs:>4}  {result['entities']:>9}  {result['wall_seconds']:>8.3f}  "
+                  f"{result['entities_per_second'] or 0:>11.1f}  {result['peak_rss_mb']:>11.1f}  {result['children_peak_rss_mb']:>17.1f}")
+
+    regressions = []
+    if args.baseline:
+        regressions = find_regressions(results, args.baseline, args.max_regression)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if regressions:
+        for result in regressions:
+            print(f"Regression: {result['parser']} at {result['scale']}x throughput changed by {result['throughput_change']:+.1%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
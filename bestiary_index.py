@@ -0,0 +1,261 @@
+import argparse
+import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from time import perf_counter
+
+from parse_bestiary import iter_bestiary_jsonl
+
+SPEED_MODES = ("walk", "fly", "swim", "burrow", "climb")
+
+def challenge_rating_to_number(cr_value):
+    """'1/4' -> 0.25, '5' -> 5.0, 5 -> 5.0. Returns None for empty or unparseable values."""
+    if isinstance(cr_value, (int, float)):
+        return float(cr_value)
+    cr_text = str(cr_value or "").strip()
+    if not cr_text:
+        return None
+    try:
+        if '/' in cr_text:
+            num, den = cr_text.split('/', 1)
+            return int(num) / int(den)
+        return float(cr_text)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+def speed_to_feet(speed_value):
+    """'30 ft.' -> 30. Returns None when there is no leading number."""
+    digits = ""
+    for char in str(speed_value or "").strip():
+        if not char.isdigit():
+            break
+        digits += char
+    return int(digits) if digits else None
+
+def _as_collection(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+class SortedIndex:
+    """Numeric key -> monster ids, kept sorted so range lookups are two bisects."""
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ids = [monster_id for _, monster_id in pairs]
+        self.key_by_id = {monster_id: key for key, monster_id in pairs}
+
+    def range(self, low=None, high=None):
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return IdRange(self, start, end, low, high)
+
+class IdRange:
+    """
+    The ids of a SortedIndex whose key is in [low, high], without copying them: len() is the
+    slice length and `id in range` checks that id's key, both O(1), so a wide range costs
+    nothing unless it is the smallest candidate set and gets iterated.
+    """
+
+    def __init__(self, index, start, end, low, high):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.low = low
+        self.high = high
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __iter__(self):
+        ids = self.index.ids
+        return (ids[position] for position in range(self.start, self.end))
+
+    def __contains__(self, monster_id):
+        key = self.index.key_by_id.get(monster_id)
+        return key is not None and (self.low is None or key >= self.low) and (self.high is None or key <= self.high)
+
+class BestiaryIndex:
+    """
+    In-memory indexes over the structured bestiary (bestiario_estructurado.json).
+
+    Hash indexes cover challenge rating, creature type, size, damage resistances /
+    immunities / vulnerabilities, condition immunities and speed modes; sorted indexes
+    cover numeric challenge rating and each speed mode's distance in feet. A query
+    intersects the posting sets of every filter, smallest first, so its cost depends on
+    the size of the matching sets rather than on the number of monsters.
+    """
+
+    def __init__(self, monsters):
+        self.monsters = list(monsters)
+        self.by_name = {}
+        self.by_challenge_rating = defaultdict(set)
+        self.by_creature_type = defaultdict(set)
+        self.by_size = defaultdict(set)
+        self.by_damage_resistance = defaultdict(set)
+        self.by_damage_immunity = defaultdict(set)
+        self.by_damage_vulnerability = defaultdict(set)
+        self.by_condition_immunity = defaultdict(set)
+        self.by_speed_mode = defaultdict(set)
+
+        cr_pairs = []
+        speed_pairs = defaultdict(list)
+        for monster_id, monster in enumerate(self.monsters):
+            self.by_name.setdefault(monster.get('name', '').strip().lower(), monster_id)
+
+            cr_number = challenge_rating_to_number(monster.get('challenge_rating', {}).get('value'))
+            if cr_number is not None:
+                self.by_challenge_rating[cr_number].add(monster_id)
+                cr_pairs.append((cr_number, monster_id))
+
+            creature_type = monster.get('creature_type', {}).get('type', '').strip().lower()
+            if creature_type:
+                self.by_creature_type[creature_type].add(monster_id)
+
+            size_code = monster.get('size', {}).get('code', '').strip().upper()
+            if size_code:
+                self.by_size[size_code].add(monster_id)
+
+            defenses = monster.get('defenses', {})
+            for defense_key, index in (("damage_resistances", self.by_damage_resistance),
+                                       ("damage_immunities", self.by_damage_immunity),
+                                       ("damage_vulnerabilities", self.by_damage_vulnerability),
+                                       ("condition_immunities", self.by_condition_immunity)):
+                for entry in defenses.get(defense_key, {}).get('list', []):
+                    entry_type = entry.get('type', '').strip().lower()
+                    if entry_type:
+                        index[entry_type].add(monster_id)
+
+            speeds = monster.get('speed', {})
+            for mode in SPEED_MODES:
+                mode_value = speeds.get(mode, {}).get('value', '')
+                if mode_value:
+                    self.by_speed_mode[mode].add(monster_id)
+                    feet = speed_to_feet(mode_value)
+                    if feet is not None:
+                        speed_pairs[mode].append((feet, monster_id))
+
+        self.challenge_rating_sorted = SortedIndex(cr_pairs)
+        self.speed_sorted = {mode: SortedIndex(pairs) for mode, pairs in speed_pairs.items()}
+
+    @classmethod
+    def from_json(cls, filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_jsonl(cls, filepath):
+        return cls(iter_bestiary_jsonl(filepath))
+
+    def __len__(self):
+        return len(self.monsters)
+
+    def get(self, name):
+        monster_id = self.by_name.get(name.strip().lower())
+        return self.monsters[monster_id] if monster_id is not None else None
+
+    def query_ids(self, challenge_rating=None, cr_min=None, cr_max=None, creature_type=None, size=None,
+                  damage_resistance=None, damage_immunity=None, damage_vulnerability=None,
+                  condition_immunity=None, speed_mode=None, min_speed=None):
+        """
+        Returns the sorted ids of monsters matching every given filter.
+
+        challenge_rating, creature_type and size accept one value or a collection meaning
+        "any of". The defense filters and speed_mode accept one value or a collection meaning
+        "all of". min_speed is a {mode: feet} mapping of minimum speeds.
+        """
+        candidate_sets = []
+
+        def any_of(index, values, normalize):
+            matched = set()
+            for value in values:
+                matched |= index.get(normalize(value), set())
+            candidate_sets.append(matched)
+
+        def all_of(index, values, normalize):
+            for value in values:
+                candidate_sets.append(index.get(normalize(value), set()))
+
+        if challenge_rating is not None:
+            any_of(self.by_challenge_rating, _as_collection(challenge_rating), challenge_rating_to_number)
+        if cr_min is not None or cr_max is not None:
+            candidate_sets.append(self.challenge_rating_sorted.range(
+                challenge_rating_to_number(cr_min) if cr_min is not None else None,
+                challenge_rating_to_number(cr_max) if cr_max is not None else None))
+        if creature_type is not None:
+            any_of(self.by_creature_type, _as_collection(creature_type), lambda v: v.strip().lower())
+        if size is not None:
+            any_of(self.by_size, _as_collection(size), lambda v: v.strip().upper())
+
+        lower = lambda v: v.strip().lower()
+        for index, values in ((self.by_damage_resistance, damage_resistance),
+                              (self.by_damage_immunity, damage_immunity),
+                              (self.by_damage_vulnerability, damage_vulnerability),
+                              (self.by_condition_immunity, condition_immunity),
+                              (self.by_speed_mode, speed_mode)):
+            if values is not None:
+                all_of(index, _as_collection(values), lower)
+
+        for mode, feet in (min_speed or {}).items():
+            sorted_index = self.speed_sorted.get(mode.strip().lower())
+            candidate_sets.append(sorted_index.range(low=feet) if sorted_index else set())
+
+        if not candidate_sets:
+            return list(range(len(self.monsters)))
+
+        # Only the smallest candidate set is materialized; the others (sets or lazy IdRanges)
+        # are just probed for membership
+        candidate_sets.sort(key=len)
+        result = set(candidate_sets[0])
+        for candidates in candidate_sets[1:]:
+            if not result:
+                break
+            if isinstance(candidates, set):
+                result &= candidates
+            else:
+                result = {monster_id for monster_id in result if monster_id in candidates}
+        return sorted(result)
+
+    def query(self, **filters):
+        """Same filters as query_ids, but returns the monster dicts in corpus order."""
+        return [self.monsters[monster_id] for monster_id in self.query_ids(**filters)]
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Runs a conjunctive query against the structured bestiary.")
+    arg_parser.add_argument("--input", default="bestiario_estructurado.json", help="Structured bestiary (.json or .jsonl).")
+    arg_parser.add_argument("--cr", action="append", help="Challenge rating (repeat for 'any of').")
+    arg_parser.add_argument("--cr-min")
+    arg_parser.add_argument("--cr-max")
+    arg_parser.add_argument("--type", action="append", dest="creature_type", help="Creature type (repeat for 'any of').")
+    arg_parser.add_argument("--size", action="append", help="Size code such as M or L (repeat for 'any of').")
+    arg_parser.add_argument("--resist", action="append", help="Damage resistance (repeat for 'all of').")
+    arg_parser.add_argument("--immune", action="append", help="Damage immunity (repeat for 'all of').")
+    arg_parser.add_argument("--vulnerable", action="append", help="Damage vulnerability (repeat for 'all of').")
+    arg_parser.add_argument("--condition-immune", action="append", help="Condition immunity (repeat for 'all of').")
+    arg_parser.add_argument("--speed", action="append", help="Speed mode such as fly or swim (repeat for 'all of').")
+    args = arg_parser.parse_args(argv)
+
+    start = perf_counter()
+    if args.input.endswith('.jsonl'):
+        index = BestiaryIndex.from_jsonl(args.input)
+    else:
+        index = BestiaryIndex.from_json(args.input)
+    build_seconds = perf_counter() - start
+
+    start = perf_counter()
+    results = index.query(challenge_rating=args.cr, cr_min=args.cr_min, cr_max=args.cr_max,
+                          creature_type=args.creature_type, size=args.size,
+                          damage_resistance=args.resist, damage_immunity=args.immune,
+                          damage_vulnerability=args.vulnerable, condition_immunity=args.condition_immune,
+                          speed_mode=args.speed)
+    query_seconds = perf_counter() - start
+
+    for monster in results:
+        print(f"{monster['name']} (CR {monster['challenge_rating']['value']}, {monster['creature_type']['type']})")
+    print(f"{len(results)} of {len(index)} monsters matched. Index built in {build_seconds * 1000:.1f} ms, query took {query_seconds * 1e6:.1f} us.")
+
+if __name__ == "__main__":
+    main()
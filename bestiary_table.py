@@ -0,0 +1,191 @@
+import argparse
+import re
+from time import perf_counter
+
+import numpy as np
+
+from bestiary_index import SPEED_MODES, challenge_rating_to_number, speed_to_feet
+from parse_bestiary import iter_bestiary_jsonl
+from update_json_references import iter_json_array_items
+
+DEFAULT_OUTPUT = "bestiario_estructurado.npz"
+MISSING = -1  # integer columns use this where the bestiary has no (numeric) value; cr uses NaN
+CATEGORIES_SUFFIX = "__categories"
+
+SIGNED_INT_PATTERN = re.compile(r"^\s*([+-]?\d+)")
+
+ABILITY_COLUMNS = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+
+# Experience points by challenge rating (the rules' table; CR 0 is listed as "0 or 10", 10 is used)
+XP_BY_CR = {
+    0: 10, 0.125: 25, 0.25: 50, 0.5: 100, 1: 200, 2: 450, 3: 700, 4: 1100, 5: 1800, 6: 2300,
+    7: 2900, 8: 3900, 9: 5000, 10: 5900, 11: 7200, 12: 8400, 13: 10000, 14: 11500, 15: 13000,
+    16: 15000, 17: 18000, 18: 20000, 19: 22000, 20: 25000, 21: 33000, 22: 41000, 23: 50000,
+    24: 62000, 25: 75000, 26: 90000, 27: 105000, 28: 120000, 29: 135000, 30: 155000,
+}
+
+def _as_int(value):
+    """5 -> 5, '+3' -> 3, '30 ft.' -> 30; MISSING for empty or non-numeric values such as 'equals your Proficiency Bonus'."""
+    if isinstance(value, bool):
+        return MISSING
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = SIGNED_INT_PATTERN.match(str(value or ""))
+    return int(match.group(1)) if match else MISSING
+
+def _xp(monster):
+    """XP for the monster's challenge rating; MISSING if the CR is unknown or not in XP_BY_CR."""
+    cr_number = challenge_rating_to_number(monster.get('challenge_rating', {}).get('value'))
+    return XP_BY_CR.get(cr_number, MISSING)
+
+def _speed_feet(monster, mode):
+    feet = speed_to_feet(monster.get('speed', {}).get(mode, {}).get('value', ''))
+    return MISSING if feet is None else feet
+
+# Integer columns: (column, int dtype, getter). Speeds get one column each, e.g. speed_fly.
+INT_COLUMNS = [
+    *[(ability, np.int16, lambda monster, ability=ability: _as_int(monster.get('statistics', {}).get(ability, {}).get('score')))
+      for ability in ABILITY_COLUMNS],
+    ("armor_class", np.int16, lambda monster: _as_int(monster.get('defenses', {}).get('armor_class', {}).get('value'))),
+    ("hit_points", np.int32, lambda monster: _as_int(monster.get('defenses', {}).get('hit_points', {}).get('average'))),
+    ("xp", np.int64, _xp),  # parse_bestiary leaves challenge_rating.xp_value at 0, so it comes from the CR
+    ("proficiency_bonus", np.int8, lambda monster: _as_int(monster.get('proficiency_bonus', {}).get('value'))),
+    ("passive_perception", np.int16, lambda monster: _as_int(monster.get('senses', {}).get('passive_perception', {}).get('value'))),
+    *[(f"speed_{mode}", np.int16, lambda monster, mode=mode: _speed_feet(monster, mode)) for mode in SPEED_MODES],
+]
+
+# Categorical columns are dictionary-encoded: int32 codes into a sorted array of the distinct values.
+CATEGORICAL_COLUMNS = [
+    ("size", lambda monster: monster.get('size', {}).get('code', '').strip().upper()),
+    ("creature_type", lambda monster: monster.get('creature_type', {}).get('type', '').strip().lower()),
+    ("alignment", lambda monster: monster.get('alignment', {}).get('abbreviation', '').strip()),
+    ("source", lambda monster: monster.get('source', {}).get('book', '').strip()),
+]
+
+class BestiaryTable:
+    """
+    The bestiary as NumPy columns, one row per monster: name, the six ability scores,
+    armor_class, hit_points (average), cr (float, NaN if unknown), xp (from the CR), proficiency_bonus,
+    passive_perception, speed_<mode> in feet, and the dictionary-encoded categorical
+    columns. Filters and aggregates are plain vectorized expressions over the columns, e.g.
+    table["hit_points"][(table["cr"] >= 5) & table.equals("creature_type", "dragon")].mean().
+    Integer columns hold MISSING (-1) where a monster has no value.
+    """
+
+    def __init__(self, columns, categories):
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def codes(self, column, value):
+        """Code of value in a categorical column, or -1 if no monster has it (so it matches nothing)."""
+        categories = self.categories[column]
+        position = int(np.searchsorted(categories, value))
+        return position if position < len(categories) and categories[position] == value else -1
+
+    def equals(self, column, value):
+        """Boolean row mask of a categorical column == value."""
+        return self.columns[column] == self.codes(column, value)
+
+    def decode(self, column, rows=slice(None)):
+        """The categorical values of the selected rows (a row mask, indexes or a slice)."""
+        return self.categories[column][self.columns[column][rows]]
+
+    def save(self, path, compressed=False):
+        """Writes every column, and each categorical column's values as <column>__categories, to a .npz file."""
+        arrays = dict(self.columns)
+        arrays.update({f"{column}{CATEGORIES_SUFFIX}": values for column, values in self.categories.items()})
+        (np.savez_compressed if compressed else np.savez)(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            columns, categories = {}, {}
+            for key in data.files:
+                if key.endswith(CATEGORIES_SUFFIX):
+                    categories[key[:-len(CATEGORIES_SUFFIX)]] = data[key]
+                else:
+                    columns[key] = data[key]
+        return cls(columns, categories)
+
+def build_bestiary_table(monsters):
+    """
+    One pass over the monster dicts (any iterable, so a JSON Lines bestiary can be streamed in),
+    appending each field to its column; the columns become NumPy arrays at the end.
+    """
+    names = []
+    cr_values = []
+    int_values = {column: [] for column, _, _ in INT_COLUMNS}
+    category_codes = {column: {} for column, _ in CATEGORICAL_COLUMNS}
+    categorical_values = {column: [] for column, _ in CATEGORICAL_COLUMNS}
+
+    for monster in monsters:
+        names.append(monster.get('name', ''))
+        cr_number = challenge_rating_to_number(monster.get('challenge_rating', {}).get('value'))
+        cr_values.append(np.nan if cr_number is None else cr_number)
+        for column, _, getter in INT_COLUMNS:
+            int_values[column].append(getter(monster))
+        for column, getter in CATEGORICAL_COLUMNS:
+            codes = category_codes[column]
+            value = getter(monster)
+            if value not in codes:
+                codes[value] = len(codes)
+            categorical_values[column].append(codes[value])
+
+    columns = {"name": np.array(names, dtype=str), "cr": np.array(cr_values, dtype=np.float32)}
+    for column, dtype, _ in INT_COLUMNS:
+        columns[column] = np.array(int_values[column], dtype=dtype)
+
+    categories = {}
+    for column, _ in CATEGORICAL_COLUMNS:
+        # Codes were handed out in order of first appearance; remap them so the values are sorted
+        values = list(category_codes[column])
+        order = sorted(range(len(values)), key=values.__getitem__)
+        remap = np.empty(len(values), dtype=np.int32)
+        remap[order] = np.arange(len(values), dtype=np.int32)
+        columns[column] = remap[np.array(categorical_values[column], dtype=np.int32)] if values else np.array([], dtype=np.int32)
+        categories[column] = np.array([values[i] for i in order], dtype=str)
+    return BestiaryTable(columns, categories)
+
+def _iter_json_monsters(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for _, monster in iter_json_array_items(f):
+            yield monster
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Builds a columnar NumPy table (.npz) of the structured bestiary.")
+    arg_parser.add_argument("--input", default="bestiario_estructurado.json", help="Structured bestiary (.json or .jsonl).")
+    arg_parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Table file (default: {DEFAULT_OUTPUT}).")
+    arg_parser.add_argument("--compressed", action="store_true", help="Write a compressed .npz (smaller, slower to load).")
+    args = arg_parser.parse_args(argv)
+
+    start = perf_counter()
+    try:
+        monsters = iter_bestiary_jsonl(args.input) if args.input.endswith('.jsonl') else _iter_json_monsters(args.input)
+        table = build_bestiary_table(monsters)
+    except FileNotFoundError:
+        print(f"Error: File not found {args.input}")
+        return
+    build_seconds = perf_counter() - start
+    table.save(args.output, compressed=args.compressed)
+    print(f"Wrote {len(table)} monsters x {len(table.columns)} columns to {args.output} in {build_seconds * 1000:.1f} ms.")
+
+    start = perf_counter()
+    table = BestiaryTable.load(args.output)
+    load_seconds = perf_counter() - start
+    start = perf_counter()
+    known = ~np.isnan(table["cr"]) & (table["hit_points"] != MISSING)
+    crs = np.unique(table["cr"][known])
+    mean_hp = [table["hit_points"][known & (table["cr"] == cr)].mean() for cr in crs]
+    query_seconds = perf_counter() - start
+    for cr, hp in zip(crs, mean_hp):
+        print(f"  CR {cr:g}: mean HP {hp:.1f}")
+    print(f"Loaded in {load_seconds * 1000:.1f} ms; mean HP by CR took {query_seconds * 1000:.2f} ms.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from time import perf_counter
+
+from compendium_db import iter_entity_elements
+
+DEFAULT_COLLECTION = "01_Core/sources/collection-01_core.xml"
+DEFAULT_CACHE_SIZE = 8
+XINCLUDE_TAG = "{http://www.w3.org/2001/XInclude}include"
+XPOINTER_PATTERN = re.compile(r"^xpointer\((/[\w/]+)\)$")
+
+# Book directories of the old layout the manifests' hrefs were written for; the files now live
+# in per-category directories (classes/, spells/, bestiaries/...), which take precedence.
+LEGACY_DIRS = ("01_Players_Handbook_2024", "02_Dungeon_Masters_Guide_2024", "03_Monster_Manual_2024")
+
+class CompendiumDocument:
+    """Registry entry for one <doc>: where it was declared, where it resolved to, and its source book."""
+    def __init__(self, key, href, path, source, legacy=False, alternatives=()):
+        self.key = key
+        self.href = href
+        self.path = path
+        self.source = source
+        self.legacy = legacy
+        self.alternatives = list(alternatives)
+
+    @property
+    def category(self):
+        """Directory the document lives in ('classes', 'spells', ...), or None if unresolved."""
+        return os.path.basename(os.path.dirname(self.path)) if self.path else None
+
+    def __repr__(self):
+        return f"CompendiumDocument({self.key!r}, path={self.path!r}, source={self.source.get('abbreviation')!r})"
+
+def _is_legacy(path):
+    return any(part in LEGACY_DIRS for part in os.path.normpath(path).split(os.sep))
+
+def index_xml_files(root_dir):
+    """{file name: [paths]} of every .xml file under root_dir, current-layout paths before legacy ones."""
+    by_name = {}
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith('.xml'):
+                by_name.setdefault(filename, []).append(os.path.join(dirpath, filename))
+    for paths in by_name.values():
+        paths.sort(key=_is_legacy)
+    return by_name
+
+def _select_xpointer(root, xpointer):
+    """The elements an xpointer(/a/b/c) expression selects from root (only plain child paths are supported)."""
+    match = XPOINTER_PATTERN.match(xpointer or "")
+    if not match:
+        print(f"Warning: unsupported xpointer '{xpointer}', using /source/collection/doc")
+        steps = ["source", "collection", "doc"]
+    else:
+        steps = match.group(1).strip("/").split("/")
+    if root.tag != steps[0]:
+        return []
+    return root.findall("/".join(steps[1:])) if len(steps) > 1 else [root]
+
+class Compendium:
+    """
+    The documents a collection file describes, loaded on demand.
+
+    Opening reads only the collection and its source manifests (collection-01_core.xml ->
+    source-*.xml -> <doc href>), resolving every href against the current 01_Core layout, so
+    it costs a handful of small files no matter how big the compendium is. document(key)
+    parses a document the first time it is needed and keeps the most recently used
+    cache_size parsed documents; iter_elements() streams without caching at all.
+    """
+
+    def __init__(self, collection_path=DEFAULT_COLLECTION, root_dir=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.collection_path = collection_path
+        collection_dir = os.path.dirname(collection_path)
+        # The collection's hrefs are relative to the compendium root it was written for (01_Core/)
+        self.root_dir = root_dir or os.path.dirname(collection_dir)
+        self.cache_size = cache_size
+        self.sources = []
+        self.documents = OrderedDict()
+        self.unresolved = []
+        self._files = index_xml_files(self.root_dir)
+        self._parsed = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+        collection_root = ET.parse(collection_path).getroot()
+        for include in collection_root.iter(XINCLUDE_TAG):
+            manifest_path, _, _ = self._resolve(self.root_dir, include.get("href", ""))
+            if manifest_path is None:
+                self.unresolved.append(include.get("href", ""))
+                continue
+            self._load_manifest(manifest_path, include)
+
+    def _resolve(self, base_dir, href):
+        """(path, legacy, other candidates) for href, preferring the current layout; path is None if missing."""
+        candidates = [path for path in self._files.get(os.path.basename(href), []) if not _is_legacy(path)]
+        if candidates:
+            return candidates[0], False, candidates[1:]
+        declared = os.path.normpath(os.path.join(base_dir, href))
+        if os.path.exists(declared):
+            return declared, _is_legacy(declared), []
+        legacy = self._files.get(os.path.basename(href), [])
+        if legacy:
+            return legacy[0], True, legacy[1:]
+        return None, False, []
+
+    def _load_manifest(self, manifest_path, include):
+        manifest_root = ET.parse(manifest_path).getroot()
+        source = {
+            "name": manifest_root.findtext("name") or include.get("source", ""),
+            "abbreviation": manifest_root.findtext("abbreviation", ""),
+            "pubdate": manifest_root.findtext("pubdate") or include.get("pubdate", ""),
+            "manifest": manifest_path,
+            "documents": [],
+        }
+        # Doc hrefs are relative to where the manifest used to live (e.g. 01_Core/01_Players_Handbook_2024/)
+        declared_dir = os.path.dirname(os.path.join(self.root_dir, include.get("href", "")))
+        for doc in _select_xpointer(manifest_root, include.get("xpointer")):
+            href = doc.get("href", "")
+            path, legacy, alternatives = self._resolve(declared_dir, href)
+            key = os.path.splitext(os.path.basename(href))[0]
+            if path is None:
+                self.unresolved.append(href)
+                continue
+            if key in self.documents:
+                print(f"Warning: document '{key}' is listed more than once; keeping {self.documents[key].path}")
+                continue
+            self.documents[key] = CompendiumDocument(key, href, path, source, legacy, alternatives)
+            source["documents"].append(key)
+        self.sources.append(source)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __iter__(self):
+        return iter(self.documents)
+
+    def __contains__(self, key):
+        return key in self.documents
+
+    def find_documents(self, category=None, source=None):
+        """Documents in a category directory and/or from a source (name or abbreviation)."""
+        return [entry for entry in self.documents.values()
+                if (category is None or entry.category == category)
+                and (source is None or source in (entry.source["name"], entry.source["abbreviation"]))]
+
+    def document(self, key):
+        """
+        The parsed root element of a document, parsing it on first access. Raises KeyError for
+        unknown keys and ET.ParseError for malformed files (which are not cached).
+        """
+        if key in self._parsed:
+            self.hits += 1
+            self._parsed.move_to_end(key)
+            return self._parsed[key]
+        path = self.documents[key].path
+        self.misses += 1
+        root = ET.parse(path).getroot()
+        self._parsed[key] = root
+        if len(self._parsed) > self.cache_size:
+            self._parsed.popitem(last=False)
+            self.evictions += 1
+        return root
+
+    def iter_elements(self, tag, keys=None):
+        """
+        Streams every top-level <tag> element of the given documents (default: all) as
+        (document key, element), one element in memory at a time and bypassing the cache.
+        Documents already in the cache are read from it.
+        """
+        for key in keys if keys is not None else self.documents:
+            if key in self._parsed:
+                for element in self._parsed[key].findall(tag):
+                    yield key, element
+            else:
+                for element in iter_entity_elements(self.documents[key].path, tag):
+                    yield key, element
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "cached": len(self._parsed), "cache_size": self.cache_size}
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Lists the compendium documents a collection file describes.")
+    arg_parser.add_argument("--collection", default=DEFAULT_COLLECTION, help=f"Collection file (default: {DEFAULT_COLLECTION}).")
+    arg_parser.add_argument("--doc", action="append", default=[], help="Parse a document by key and summarise its elements (repeatable).")
+    arg_parser.add_argument("--check", action="store_true", help="Parse every document and report the ones that fail.")
+    arg_parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                            help=f"Parsed documents kept in memory (default: {DEFAULT_CACHE_SIZE}).")
+    args = arg_parser.parse_args(argv)
+
+    start = perf_counter()
+    try:
+        compendium = Compendium(args.collection, cache_size=args.cache_size)
+    except (FileNotFoundError, ET.ParseError) as e:
+        print(f"Error opening collection {args.collection}: {e}")
+        return
+    open_ms = (perf_counter() - start) * 1000
+
+    legacy = sum(entry.legacy for entry in compendium.documents.values())
+    print(f"{len(compendium)} documents from {len(compendium.sources)} sources, opened in {open_ms:.1f} ms "
+          f"({legacy} only in the legacy layout, {len(compendium.unresolved)} unresolved).")
+    for source in compendium.sources:
+        print(f"  {source['abbreviation'] or source['name']}: {len(source['documents'])} documents ({source['manifest']})")
+    for href in compendium.unresolved:
+        print(f"  Unresolved: {href}")
+
+    for key in args.doc:
+        try:
+            root = compendium.document(key)
+        except KeyError:
+            print(f"No document '{key}'")
+            continue
+        except ET.ParseError as e:
+            print(f"{key}: could not parse {compendium.documents[key].path}: {e}")
+            continue
+        counts = {}
+        for child in root:
+            counts[child.tag] = counts.get(child.tag, 0) + 1
+        summary = ", ".join(f"{count} <{tag}>" for tag, count in counts.items())
+        print(f"{key} ({compendium.documents[key].path}): {summary or 'empty'}")
+
+    if args.check:
+        start = perf_counter()
+        failures = 0
+        for key, entry in compendium.documents.items():
+            try:
+                compendium.document(key)
+            except ET.ParseError as e:
+                failures += 1
+                print(f"  {key}: could not parse {entry.path}: {e}")
+        print(f"Parsed {len(compendium)} documents in {(perf_counter() - start) * 1000:.1f} ms: {failures} failed.")
+
+if __name__ == "__main__":
+    main()
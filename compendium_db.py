@@ -0,0 +1,347 @@
+import argparse
+import glob
+import json
+import sqlite3
+import xml.etree.ElementTree as ET
+
+from bestiary_index import challenge_rating_to_number
+from parse_bestiary import iter_bestiary_jsonl
+
+DEFAULT_DB_PATH = "compendium.sqlite"
+
+# Default inputs are the outputs of parse_bestiary, parse_spells, item_parser, parse_races
+# and parse_maneuvers_to_xml.
+DEFAULT_SOURCES = {
+    "monster": ["bestiario_estructurado.json"],
+    "spell": ["01_Core/spells/spells-*-phb24.xml"],
+    "item": ["items-phb24-structured.xml"],
+    "race": ["races-phb24-parsed.xml"],
+    "maneuver": ["maneuvers.xml"],
+}
+
+# kind -> table, full-text code and the filterable columns stored next to the name.
+# The code keeps full-text rowids unique across kinds: fts rowid = entity id * 8 + code.
+ENTITY_TABLES = {
+    "monster": {
+        "table": "monsters",
+        "code": 1,
+        "columns": [("challenge_rating", "TEXT"), ("cr_value", "REAL"), ("creature_type", "TEXT"),
+                    ("size", "TEXT"), ("alignment", "TEXT"), ("source_book", "TEXT"),
+                    ("source_file", "TEXT"), ("data", "TEXT")],
+        "indexes": ["cr_value", "creature_type", "size"],
+    },
+    "spell": {
+        "table": "spells",
+        "code": 2,
+        "columns": [("level", "INTEGER"), ("school", "TEXT"), ("ritual", "INTEGER"),
+                    ("concentration", "INTEGER"), ("source_book", "TEXT"), ("source_file", "TEXT")],
+        "indexes": ["level", "school"],
+    },
+    "item": {
+        "table": "items",
+        "code": 3,
+        "columns": [("item_type", "TEXT"), ("item_subtype", "TEXT"), ("rarity", "TEXT"),
+                    ("source_book", "TEXT"), ("source_file", "TEXT")],
+        "indexes": ["item_type", "rarity"],
+    },
+    "race": {
+        "table": "races",
+        "code": 4,
+        "columns": [("size", "TEXT"), ("speed", "INTEGER"), ("source_book", "TEXT"), ("source_file", "TEXT")],
+        "indexes": ["size"],
+    },
+    "maneuver": {
+        "table": "maneuvers",
+        "code": 5,
+        "columns": [("cost_resource", "TEXT"), ("source_book", "TEXT"), ("source_file", "TEXT")],
+        "indexes": [],
+    },
+}
+KIND_BY_CODE = {spec["code"]: kind for kind, spec in ENTITY_TABLES.items()}
+FTS_ROWID_STRIDE = 8
+
+def _text_of(element):
+    """All text below an element, one line per non-empty fragment."""
+    if element is None:
+        return ""
+    return "\n".join(fragment.strip() for fragment in element.itertext() if fragment.strip())
+
+def _child_text(element, tag):
+    child = element.find(tag)
+    return child.text.strip() if child is not None and child.text else ""
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def iter_entity_elements(filepath, tag, strict=False):
+    """
+    Streams the top-level <tag> elements of an XML file, releasing each one after use. Parse errors
+    and missing files are printed and end the stream, or with strict=True are raised to the caller.
+    """
+    try:
+        context = ET.iterparse(filepath, events=("start", "end"))
+        _, root = next(context)
+        depth = 0
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0 and elem.tag == tag:
+                yield elem
+                elem.clear()
+                root.remove(elem)
+    except ET.ParseError as e:
+        if strict:
+            raise
+        print(f"Error parsing XML file {filepath}: {e}")
+    except FileNotFoundError:
+        if strict:
+            raise
+        print(f"Error: File not found {filepath}")
+
+def iter_flavor_text(monster):
+    """The title and text blocks of a monster's flavor_text entries ([{"title", "text_block": [...]}]) as strings."""
+    for entry in monster.get('flavor_text', []):
+        if isinstance(entry, str):
+            yield entry
+            continue
+        if entry.get('title'):
+            yield entry['title']
+        yield from entry.get('text_block', [])
+
+def iter_monster_records(filepath):
+    if filepath.endswith('.jsonl'):
+        monsters = iter_bestiary_jsonl(filepath)
+    else:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                monsters = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: File not found {filepath}")
+            return
+    for monster in monsters:
+        body = [monster.get('description_text', '')]
+        body.extend(iter_flavor_text(monster))
+        for section in ('traits', 'actions', 'bonus_actions', 'reactions'):
+            for entry in monster.get(section, []):
+                body.append(entry.get('name', ''))
+                body.append(entry.get('text_description', ''))
+        cr_text = monster.get('challenge_rating', {}).get('value', '')
+        yield {
+            "name": monster.get('name', ''),
+            "challenge_rating": cr_text,
+            "cr_value": challenge_rating_to_number(cr_text),
+            "creature_type": monster.get('creature_type', {}).get('type', '').lower(),
+            "size": monster.get('size', {}).get('code', ''),
+            "alignment": monster.get('alignment', {}).get('text_override', ''),
+            "source_book": monster.get('source', {}).get('book', ''),
+            "source_file": monster.get('source_file', ''),
+            "data": json.dumps(monster, ensure_ascii=False, separators=(',', ':')),
+            "body": "\n".join(filter(None, body)),
+        }
+
+def iter_spell_records(filepath):
+    for spell in iter_entity_elements(filepath, 'spell'):
+        school = spell.find('school')
+        source = spell.find('source')
+        yield {
+            "name": _child_text(spell, 'name'),
+            "level": _int_or_none(_child_text(spell, 'level')),
+            "school": school.text.strip() if school is not None and school.text else "",
+            "ritual": int(spell.find('ritual') is not None),
+            "concentration": int(spell.find('duration/concentration') is not None),
+            "source_book": source.get('name', '') if source is not None else "",
+            "source_file": filepath,
+            "classes": [class_el.text.strip() for class_el in spell.findall('classes/class_name') if class_el.text],
+            "body": _text_of(spell.find('description')),
+        }
+
+def iter_item_records(filepath):
+    for item in iter_entity_elements(filepath, 'item'):
+        item_type = item.find('item_type')
+        rarity = item.find('rarity')
+        source = item.find('source')
+        yield {
+            "name": _child_text(item, 'name'),
+            "item_type": item_type.get('main', '') if item_type is not None else "",
+            "item_subtype": item_type.get('sub', '') if item_type is not None else "",
+            "rarity": rarity.get('type', '') if rarity is not None else "",
+            "source_book": source.get('book', '') if source is not None else "",
+            "source_file": filepath,
+            "body": _text_of(item.find('description_text')),
+        }
+
+def iter_race_records(filepath):
+    for race in iter_entity_elements(filepath, 'race'):
+        size = race.find('size_summary')
+        speed = race.find('speed')
+        yield {
+            "name": _child_text(race, 'name'),
+            "size": size.get('code', '') if size is not None else "",
+            "speed": _int_or_none(speed.get('base')) if speed is not None else None,
+            "source_book": _child_text(race, 'source'),
+            "source_file": filepath,
+            "body": "\n".join(_text_of(trait) for trait in race.findall('trait')),
+        }
+
+def iter_maneuver_records(filepath):
+    for maneuver in iter_entity_elements(filepath, 'maneuver'):
+        cost = maneuver.find('cost')
+        source = maneuver.find('source')
+        yield {
+            "name": maneuver.get('name', ''),
+            "cost_resource": cost.get('resource', '') if cost is not None else "",
+            "source_book": source.get('book', '') if source is not None else "",
+            "source_file": filepath,
+            "body": _child_text(maneuver, 'description_text'),
+        }
+
+RECORD_READERS = {
+    "monster": iter_monster_records,
+    "spell": iter_spell_records,
+    "item": iter_item_records,
+    "race": iter_race_records,
+    "maneuver": iter_maneuver_records,
+}
+
+def connect_compendium(db_path=DEFAULT_DB_PATH):
+    """Opens (creating if needed) the compendium database with its schema in place."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    create_schema(conn)
+    return conn
+
+def create_schema(conn):
+    with conn:
+        for spec in ENTITY_TABLES.values():
+            column_sql = "".join(f", {column} {column_type}" for column, column_type in spec["columns"])
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {spec['table']} "
+                         f"(id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE{column_sql})")
+            for column in spec["indexes"]:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{spec['table']}_{column} ON {spec['table']} ({column})")
+        conn.execute("CREATE TABLE IF NOT EXISTS spell_classes ("
+                     "spell_id INTEGER NOT NULL REFERENCES spells(id) ON DELETE CASCADE, "
+                     "class_name TEXT NOT NULL, PRIMARY KEY (spell_id, class_name))")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_spell_classes_class_name ON spell_classes (class_name)")
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS compendium_fts USING fts5(name, body, tokenize='porter unicode61')")
+
+def clear_compendium(conn):
+    """Empties every table. Runs inside the caller's transaction."""
+    conn.execute("DELETE FROM compendium_fts")
+    conn.execute("DELETE FROM spell_classes")
+    for spec in ENTITY_TABLES.values():
+        conn.execute(f"DELETE FROM {spec['table']}")
+
+def upsert_entities(conn, kind, records, seen_names=None):
+    """
+    Inserts or replaces records keyed by name, keeping the full-text row and spell classes in
+    step. Runs inside the caller's transaction. A name already in seen_names (the names this
+    build has written so far) is skipped with a warning, so the first record wins as in
+    monster_store. Returns the number of distinct rows written.
+    """
+    spec = ENTITY_TABLES[kind]
+    columns = [column for column, _ in spec["columns"]]
+    upsert_sql = (f"INSERT INTO {spec['table']} (name, {', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' * (len(columns) + 1))}) "
+                  f"ON CONFLICT(name) DO UPDATE SET {', '.join(f'{c}=excluded.{c}' for c in columns)} "
+                  f"RETURNING id")
+    if seen_names is None:
+        seen_names = set()
+    count = 0
+    for record in records:
+        name = record.get("name", "").strip()
+        if not name:
+            continue
+        if name in seen_names:
+            print(f"Warning: duplicate {kind} name '{name}' skipped in {record.get('source_file', '')}")
+            continue
+        seen_names.add(name)
+        entity_id = conn.execute(upsert_sql, [name] + [record.get(column) for column in columns]).fetchone()[0]
+        fts_rowid = entity_id * FTS_ROWID_STRIDE + spec["code"]
+        conn.execute("DELETE FROM compendium_fts WHERE rowid = ?", (fts_rowid,))
+        conn.execute("INSERT INTO compendium_fts (rowid, name, body) VALUES (?, ?, ?)",
+                     (fts_rowid, name, record.get("body", "")))
+        if kind == "spell":
+            conn.execute("DELETE FROM spell_classes WHERE spell_id = ?", (entity_id,))
+            conn.executemany("INSERT OR IGNORE INTO spell_classes (spell_id, class_name) VALUES (?, ?)",
+                             [(entity_id, class_name) for class_name in record.get("classes", [])])
+        count += 1
+    return count
+
+def build_compendium(db_path, sources, rebuild=False):
+    """
+    Loads every source file into the database in a single transaction. With rebuild=True the
+    tables are emptied first; otherwise records are upserted by name. Returns {kind: distinct rows written}.
+    """
+    conn = connect_compendium(db_path)
+    counts = {}
+    try:
+        with conn:
+            if rebuild:
+                clear_compendium(conn)
+            for kind, patterns in sources.items():
+                reader = RECORD_READERS[kind]
+                seen_names = set()
+                for pattern in patterns:
+                    filepaths = sorted(glob.glob(pattern)) or [pattern]
+                    for filepath in filepaths:
+                        counts[kind] = counts.get(kind, 0) + upsert_entities(conn, kind, reader(filepath), seen_names)
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    return counts
+
+def search_compendium(conn, text, kind=None, limit=20):
+    """
+    Full-text search over names and descriptions, best BM25 rank first: [(kind, name, snippet)].
+    The kind filter (the rowid code) and the limit are applied in SQL, so only the returned rows
+    reach Python; FTS5 still finds and ranks the matches of every kind before the rowid filter
+    drops the other kinds.
+    """
+    sql = ("SELECT rowid, name, snippet(compendium_fts, 1, '[', ']', '...', 12) "
+           "FROM compendium_fts WHERE compendium_fts MATCH ?")
+    params = [text]
+    if kind is not None:
+        sql += " AND rowid % ? = ?"
+        params += [FTS_ROWID_STRIDE, ENTITY_TABLES[kind]["code"]]
+    rows = conn.execute(sql + " ORDER BY rank LIMIT ?", params + [limit])
+    return [(KIND_BY_CODE.get(rowid % FTS_ROWID_STRIDE), name, snippet) for rowid, name, snippet in rows]
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Builds a SQLite compendium (with FTS5 search) from the parser outputs.")
+    arg_parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"SQLite database path (default: {DEFAULT_DB_PATH}).")
+    arg_parser.add_argument("--rebuild", action="store_true", help="Empty the tables before loading instead of upserting by name.")
+    for kind in ENTITY_TABLES:
+        arg_parser.add_argument(f"--{kind}s", nargs="+", metavar="PATH",
+                                help=f"{kind.capitalize()} inputs, globs allowed (default: {' '.join(DEFAULT_SOURCES[kind])}).")
+    arg_parser.add_argument("--only", nargs="+", choices=list(ENTITY_TABLES), help="Load only these kinds.")
+    arg_parser.add_argument("--search", help="Run a full-text query against the database instead of building it.")
+    args = arg_parser.parse_args(argv)
+
+    if args.search:
+        conn = connect_compendium(args.db)
+        try:
+            for kind, name, snippet in search_compendium(conn, args.search):
+                print(f"[{kind}] {name}: {snippet}")
+        except sqlite3.OperationalError as e:
+            print(f"Error: invalid search query '{args.search}': {e}")
+        finally:
+            conn.close()
+        return
+
+    sources = {}
+    for kind in args.only or ENTITY_TABLES:
+        sources[kind] = getattr(args, f"{kind}s") or DEFAULT_SOURCES[kind]
+    counts = build_compendium(args.db, sources, rebuild=args.rebuild)
+    for kind, count in counts.items():
+        print(f"{kind}: {count} distinct records")
+    print(f"Compendium written to {args.db}")
+
+if __name__ == "__main__":
+    main()
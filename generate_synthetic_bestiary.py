@@ -0,0 +1,229 @@
+import argparse
+import glob
+import random
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+DEFAULT_SOURCE_PATTERN = "01_Core/bestiaries/*.xml"
+
+CHALLENGE_RATINGS = ["0", "1/8", "1/4", "1/2"] + [str(cr) for cr in range(1, 31)]
+
+NAME_PREFIXES = [
+    "Ashen", "Blighted", "Cinder", "Dread", "Elder", "Feral", "Gloom", "Hollow", "Iron", "Jade",
+    "Mire", "Night", "Pale", "Rime", "Storm", "Thorn", "Umbral", "Venom", "Wild", "Zephyr",
+]
+
+ABILITY_TAGS = ("str", "dex", "con", "int", "wis", "cha")
+NAME_TAG_PATTERN = re.compile(r"\s*\[[^\]]*\]\s*$")
+# Where the spell lists of a Spellcasting action start ("At will: ...", "• 1/Day each: ...")
+SPELL_LISTS_PATTERN = re.compile(r"\s*(?:•\s*)?(?:At will:|\d+/Day)")
+SPELLCASTING_ABILITIES = ("Intelligence", "Wisdom", "Charisma")
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<compendium version="5" auto_indent="NO">\n'
+XML_FOOTER = '</compendium>\n'
+
+def proficiency_bonus_for_cr(cr_text):
+    """Same CR -> PB bands parse_bestiary falls back to."""
+    if '/' in cr_text:
+        return 2
+    cr_value = int(cr_text)
+    if cr_value < 5:
+        return 2
+    return min(9, 3 + (cr_value - 5) // 4)
+
+class StatBlockPool:
+    """
+    The real stat blocks the generator mutates, plus the action, legendary and spell pools
+    blocks can borrow from. Blocks are kept serialized and re-parsed per synthetic monster,
+    so every mutation works on a private copy and the pool never grows.
+    """
+
+    def __init__(self, xml_files):
+        self.templates = []
+        self.actions = []
+        self.legendary_blocks = []
+        self.spell_names = set()
+        for xml_file in xml_files:
+            try:
+                root = ET.parse(xml_file).getroot()
+            except (ET.ParseError, FileNotFoundError) as e:
+                print(f"Error reading {xml_file}: {e}", file=sys.stderr)
+                continue
+            for monster in root.findall('monster'):
+                self.templates.append(ET.tostring(monster, encoding='unicode'))
+                for action in monster.findall('action'):
+                    # Spellcasting would list spells the borrowing monster's <spells> doesn't have
+                    if action.findtext('name', '') not in ("Multiattack", "Spellcasting"):
+                        self.actions.append(ET.tostring(action, encoding='unicode'))
+                legendary = monster.findall('legendary')
+                if legendary:
+                    self.legendary_blocks.append([ET.tostring(block, encoding='unicode') for block in legendary])
+                spells = monster.findtext('spells', '')
+                self.spell_names.update(name.strip() for name in spells.split(',') if name.strip())
+        self.spell_names = sorted(self.spell_names)
+        if not self.templates:
+            raise ValueError("No <monster> stat blocks found to build synthetic monsters from")
+
+def _strip_tails(element):
+    element.tail = None
+    return element
+
+def _insert_after_last(monster, tag, new_elements):
+    """Inserts new_elements after the last child with tag (or at the end if there is none)."""
+    children = list(monster)
+    position = len(children)
+    for index, child in enumerate(children):
+        if child.tag == tag:
+            position = index + 1
+    for offset, element in enumerate(new_elements):
+        monster.insert(position + offset, element)
+
+def _spellcasting_action(monster):
+    return next((action for action in monster.findall('action')
+                 if action.findtext('name', '').strip().lower() == 'spellcasting'), None)
+
+def _set_spell_lists(spellcasting, spell_names, rng, caster_name):
+    """
+    Rewrites the spell lists of a Spellcasting action (the part parse_bestiary reads first) to
+    spell_names, keeping its introduction; an action without text gets a generic one.
+    """
+    text = spellcasting.find('text')
+    if text is None:
+        text = ET.SubElement(spellcasting, 'text')
+    lists_start = SPELL_LISTS_PATTERN.search(text.text or "")
+    intro = (text.text or "")[:lists_start.start()] if lists_start else (text.text or "")
+    if not intro.strip():
+        intro = (f"The {caster_name.lower()} casts one of the following spells, using "
+                 f"{rng.choice(SPELLCASTING_ABILITIES)} as the spellcasting ability (spell save DC {rng.randint(10, 20)}):")
+    names = [NAME_TAG_PATTERN.sub("", name) for name in spell_names]
+    at_will_count = rng.randint(1, len(names))
+    lists = f"At will: {', '.join(names[:at_will_count])}"
+    if names[at_will_count:]:
+        lists += f"\n1/Day each: {', '.join(names[at_will_count:])}"
+    text.text = f"{intro.rstrip()}\n\n{lists}"
+
+def mutate_stat_block(pool, rng, serial_number):
+    """Builds one synthetic <monster> element from a random real stat block."""
+    monster = ET.fromstring(rng.choice(pool.templates))
+
+    # Name and sort name
+    name_element = monster.find('name')
+    base_name = NAME_TAG_PATTERN.sub("", name_element.text or "Monster")
+    new_name = f"{rng.choice(NAME_PREFIXES)} {base_name} {serial_number:06d}"
+    name_element.text = f"{new_name} [Synthetic]"
+    sort_name = monster.find('sortname')
+    if sort_name is not None:
+        sort_name.text = new_name
+
+    # Challenge rating (a few steps either way) and the matching proficiency bonus
+    cr_element = monster.find('cr')
+    if cr_element is not None and cr_element.text in CHALLENGE_RATINGS:
+        cr_index = CHALLENGE_RATINGS.index(cr_element.text) + rng.randint(-3, 3)
+        cr_element.text = CHALLENGE_RATINGS[max(0, min(len(CHALLENGE_RATINGS) - 1, cr_index))]
+        for trait in monster.findall('trait'):
+            if trait.findtext('name', '') == "Proficiency Bonus" and trait.find('text') is not None:
+                trait.find('text').text = f"+{proficiency_bonus_for_cr(cr_element.text)}"
+
+    # Ability scores
+    for tag in ABILITY_TAGS:
+        score = monster.find(tag)
+        if score is not None and (score.text or "").strip().isdigit():
+            score.text = str(max(1, min(30, int(score.text) + rng.randint(-2, 2))))
+
+    # Actions: swap one (never Spellcasting, which goes with <spells>) for an action borrowed
+    # from another stat block, sometimes add one
+    actions = [action for action in monster.findall('action') if action is not _spellcasting_action(monster)]
+    if actions and pool.actions and rng.random() < 0.5:
+        replaced = rng.choice(actions)
+        borrowed = _strip_tails(ET.fromstring(rng.choice(pool.actions)))
+        monster.insert(list(monster).index(replaced), borrowed)
+        monster.remove(replaced)
+    if pool.actions and rng.random() < 0.3:
+        _insert_after_last(monster, 'action', [_strip_tails(ET.fromstring(rng.choice(pool.actions)))])
+
+    # Spellcasting: reroll the spell list, add one to non-casters, or drop it. The Spellcasting
+    # action's text is what parse_bestiary reads first, so it changes together with <spells>.
+    spells = monster.find('spells')
+    spellcasting = _spellcasting_action(monster)
+    roll = rng.random()
+    if pool.spell_names and (spells is not None and roll < 0.6 or spells is None and roll < 0.15):
+        if spellcasting is None:
+            spellcasting = ET.Element('action')
+            ET.SubElement(spellcasting, 'name').text = "Spellcasting"
+            _insert_after_last(monster, 'action', [spellcasting])
+        if spells is None:
+            spells = ET.Element('spells')
+            _insert_after_last(monster, 'action', [spells])
+        spell_names = rng.sample(pool.spell_names, min(len(pool.spell_names), rng.randint(2, 10)))
+        spells.text = ", ".join(spell_names)
+        _set_spell_lists(spellcasting, spell_names, rng, base_name)
+    elif spells is not None and roll > 0.9:
+        monster.remove(spells)
+        if spellcasting is not None:
+            monster.remove(spellcasting)
+
+    # Legendary blocks: drop them or give a non-legendary monster a borrowed set
+    legendary = monster.findall('legendary')
+    if legendary and rng.random() < 0.2:
+        for block in legendary:
+            monster.remove(block)
+    elif not legendary and pool.legendary_blocks and rng.random() < 0.1:
+        borrowed_blocks = [_strip_tails(ET.fromstring(block)) for block in rng.choice(pool.legendary_blocks)]
+        _insert_after_last(monster, 'action', borrowed_blocks)
+
+    monster.tail = "\n"
+    return monster
+
+def generate_synthetic_bestiary(pool, output, seed=0, count=None, max_bytes=None):
+    """
+    Streams a <compendium> of synthetic monsters to the open text file output until count
+    monsters or max_bytes of UTF-8 encoded XML have been written. Monster i depends only on
+    (seed, i), so the same seed always yields the same file, and memory use does not grow with
+    the output size. Returns (monsters written, bytes written).
+    """
+    output.write(XML_HEADER)
+    written_bytes = len(XML_HEADER.encode('utf-8'))
+    serial_number = 0
+    while (count is None or serial_number < count) and (max_bytes is None or written_bytes < max_bytes):
+        rng = random.Random(f"{seed}:{serial_number}")
+        monster_xml = ET.tostring(mutate_stat_block(pool, rng, serial_number), encoding='unicode')
+        output.write(monster_xml)
+        written_bytes += len(monster_xml.encode('utf-8'))
+        serial_number += 1
+    output.write(XML_FOOTER)
+    written_bytes += len(XML_FOOTER.encode('utf-8'))
+    return serial_number, written_bytes
+
+def _parse_size(size_text):
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    size_text = size_text.strip().lower().rstrip("b")
+    if size_text and size_text[-1] in units:
+        return int(float(size_text[:-1]) * units[size_text[-1]])
+    return int(size_text)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Generates a deterministic synthetic bestiary by mutating real stat blocks.")
+    limit = arg_parser.add_mutually_exclusive_group(required=True)
+    limit.add_argument("--count", type=int, help="Number of synthetic monsters to write.")
+    limit.add_argument("--size", help="Approximate output size in bytes (UTF-8), e.g. 500M or 2G.")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed always produces the same file (default: 0).")
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE_PATTERN, help=f"Glob of real bestiary files to mutate (default: {DEFAULT_SOURCE_PATTERN}).")
+    arg_parser.add_argument("--output", default="-", help="Output XML file, or - for stdout (default).")
+    args = arg_parser.parse_args(argv)
+
+    source_files = sorted(glob.glob(args.source))
+    if not source_files:
+        print(f"Error: no bestiary files match {args.source}", file=sys.stderr)
+        return
+    pool = StatBlockPool(source_files)
+
+    max_bytes = _parse_size(args.size) if args.size else None
+    if args.output == "-":
+        monsters, written_bytes = generate_synthetic_bestiary(pool, sys.stdout, args.seed, args.count, max_bytes)
+    else:
+        with open(args.output, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+            monsters, written_bytes = generate_synthetic_bestiary(pool, f, args.seed, args.count, max_bytes)
+    print(f"Wrote {monsters} synthetic monsters ({written_bytes / 1024 / 1024:.1f} MiB) from {len(pool.templates)} real stat blocks.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+DEFAULT_GLOSSARY_FILE = "glossary_xml_tags_v1.txt"
+SCHEMA_SUFFIX = ".schema.json"
+SCHEMA_VERSION = 2  # bump when the compiled layout changes, so stale artifacts are rebuilt
+
+# Same tag extraction analyze_xml_tags has always used for the flat tag set
+GLOSSARY_TAG_PATTERN = re.compile(r"<([a-zA-Z][a-zA-Z0-9_:]*)\s*[^>]*?>")
+GLOSSARY_CLOSING_TAG_PATTERN = re.compile(r"</([a-zA-Z][a-zA-Z0-9_:]*)>")
+
+# Glossary markdown: "**`<tag ...>`**" declares an element, "**`attr="A|B"`**" an attribute,
+# "`name`: ..." under an element an attribute (or, under an attribute, one of its values).
+BULLET_PATTERN = re.compile(r"^( *)\*\s+(.*)$")
+BOLD_CODE_PATTERN = re.compile(r"\*\*`([^`]+)`\*\*")
+LEADING_CODE_PATTERN = re.compile(r"^(?:\*\*)?`([^`]+)`")
+ELEMENT_PATTERN = re.compile(r"<([a-zA-Z][\w:]*)([^<>]*)")
+ATTRIBUTE_PATTERN = re.compile(r'([\w:-]+)="([^"]*)"')
+BARE_NAME_PATTERN = re.compile(r"^[A-Za-z_][\w-]*$")
+# "**Contenido común:** `<name>`, `<text>`...", "Puede contener `<text>`...", "Contiene etiquetas `<effect>`...":
+# the children an element may hold (nested bullets continue the list)
+CONTENT_LIST_PATTERN = re.compile(r"^(?:\*\*Contenido[^*]*\*\*|Puede contener|Contiene)")
+INLINE_TAG_PATTERN = re.compile(r"`<([a-zA-Z][\w:]*)[^`]*>`")
+INLINE_CODE_PATTERN = re.compile(r"`([^`]+)`")
+ROOT_MARKER = "Contenedor raíz"
+OPEN_ENUM_MARKERS = ("...", "etc.", "etc")
+CONTENT_LIST = object()  # stack marker in _apply_bullets: the bullets below continue a content list
+
+def new_node():
+    return {"attributes": {}, "children": {}, "open_children": False}
+
+def add_attribute(node, name, raw_value=None):
+    """Records attribute name on node; raw_value like "[A|B]", "true|false", "Finesse" or "[placeholder]"."""
+    spec = node["attributes"].setdefault(name, {"values": [], "open": False, "_placeholder": False})
+    if raw_value is None:
+        return spec
+    value = raw_value.strip()
+    placeholder = "[" in value
+    value = value.strip("[]")
+    if "|" in value:
+        for option in value.split("|"):
+            option = option.strip()
+            if option in OPEN_ENUM_MARKERS:
+                spec["open"] = True
+            elif option and option not in spec["values"]:
+                spec["values"].append(option)
+    elif placeholder or not value:
+        spec["_placeholder"] = True
+    elif value not in spec["values"]:
+        spec["values"].append(value)
+    return spec
+
+def add_element(parent, declaration):
+    """Adds the element(s) of one "<tag attr=...>" declaration under parent; returns the first one's node."""
+    declared = ELEMENT_PATTERN.findall(declaration)
+    if not declared:
+        return None
+    tag, attribute_text = declared[0]
+    node = parent["children"].setdefault(tag, new_node())
+    node["_tag"] = tag  # lets _apply_bullets recognise examples of the element inside its own definition
+    for name, raw_value in ATTRIBUTE_PATTERN.findall(attribute_text):
+        add_attribute(node, name, raw_value)
+    # "<personality_traits><trait_option text=.../>...</personality_traits>": the rest are its children
+    for child_tag, child_attribute_text in declared[1:]:
+        if child_tag == tag:
+            continue
+        child = node["children"].setdefault(child_tag, new_node())
+        for name, raw_value in ATTRIBUTE_PATTERN.findall(child_attribute_text):
+            add_attribute(child, name, raw_value)
+    return node
+
+def add_content_children(node, text):
+    """Allows every `<tag>` a content list names as a child of node; "etc." also allows any shared element."""
+    for tag in INLINE_TAG_PATTERN.findall(text):
+        node["children"].setdefault(tag, new_node())
+    if "etc." in text:
+        node["open_children"] = True
+
+def _finish_node(node):
+    """An attribute is an enforceable enum only if it was only ever given as literal values or lists."""
+    for spec in node["attributes"].values():
+        placeholder = spec.pop("_placeholder")
+        spec["open"] = spec["open"] or placeholder or not spec["values"]
+    for child in node["children"].values():
+        _finish_node(child)
+
+def _apply_bullets(section_node, lines):
+    # Stack of (indent, owner node, attribute name or None); bullets attach to the nearest shallower entry.
+    stack = []
+    for line in lines:
+        bullet = BULLET_PATTERN.match(line)
+        if not bullet:
+            continue
+        indent = len(bullet.group(1)) // 4
+        content = bullet.group(2)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        owner, owner_attribute = (stack[-1][1], stack[-1][2]) if stack else (section_node, None)
+
+        if owner_attribute is CONTENT_LIST or CONTENT_LIST_PATTERN.match(content):
+            add_content_children(owner, content)
+            stack.append((indent, owner, CONTENT_LIST))
+            continue
+        code = LEADING_CODE_PATTERN.match(content)
+        code_text = code.group(1).strip() if code else ""
+        if code_text.startswith("<"):
+            tag = ELEMENT_PATTERN.match(code_text)
+            if tag and owner_attribute is None and tag.group(1) == owner.get("_tag"):
+                # An example of the owning element itself, e.g. `<property name="Finesse"/>` under <property>
+                for name, raw_value in ATTRIBUTE_PATTERN.findall(tag.group(2)):
+                    add_attribute(owner, name, raw_value)
+                stack.append((indent, owner, None))
+            elif content.startswith("**"):
+                node = add_element(owner, code_text)
+                stack.append((indent, node if node is not None else owner, None))
+            else:
+                stack.append((indent, owner, owner_attribute))
+        elif code_text and "=" in code_text:
+            for name, raw_value in ATTRIBUTE_PATTERN.findall(code_text):
+                add_attribute(owner, name, raw_value)
+            attribute_names = ATTRIBUTE_PATTERN.findall(code_text)
+            stack.append((indent, owner, attribute_names[0][0] if len(attribute_names) == 1 else None))
+        elif code_text and BARE_NAME_PATTERN.match(code_text):
+            if owner_attribute is not None:
+                add_attribute(owner, owner_attribute, code_text)  # a documented value of the attribute
+                stack.append((indent, owner, owner_attribute))
+            else:
+                add_attribute(owner, code_text)
+                if content.startswith("**"):
+                    # "**`type`**: `Damage`, `Heal`, ..." lists the attribute's values inline
+                    rest = content[code.end():]
+                    for value in INLINE_CODE_PATTERN.findall(rest):
+                        if BARE_NAME_PATTERN.match(value):
+                            add_attribute(owner, code_text, value)
+                    if "etc." in rest:
+                        add_attribute(owner, code_text)["open"] = True
+                stack.append((indent, owner, code_text))
+        else:
+            stack.append((indent, owner, owner_attribute))
+
+def _strip_tags(node):
+    node.pop("_tag", None)
+    for child in node["children"].values():
+        _strip_tags(child)
+
+def _iter_sections(lines):
+    """Yields (is_root, [tag declarations], body lines) for every top-level "**`<tag>`**" definition."""
+    header = None
+    body = []
+    for index, line in enumerate(lines):
+        if line.startswith(("**", "---", "#")):
+            if header is not None:
+                yield header[0], header[1], body
+            header, body = None, []
+            declarations = [code for code in BOLD_CODE_PATTERN.findall(line) if code.startswith("<")]
+            if line.startswith("**`<") and declarations:
+                following = next((l for l in lines[index + 1:] if l.strip()), "")
+                header = (following.startswith(ROOT_MARKER), declarations)
+        elif header is not None:
+            body.append(line)
+    if header is not None:
+        yield header[0], header[1], body
+
+def compile_glossary(content):
+    """
+    Compiles the glossary markdown into a schema dict:
+      tags      every tag name the glossary mentions (what analyze_xml_tags compares against)
+      roots     per root container (<class>, <feat>, <race>, <item>...): its attributes and the
+                nested tree of allowed children, each with attributes and their enumerated values
+      elements  the shared definitions outside the root containers (<feature>, <effect>, <uses>...)
+    Attributes are {"values": [...], "open": bool}; only closed lists are enforced by check_element.
+    A node's open_children means its content list ended in "etc.", so any shared element may
+    appear in it besides the children listed.
+    """
+    lines = content.splitlines()
+    schema = {
+        "version": SCHEMA_VERSION,
+        "tags": sorted(set(GLOSSARY_TAG_PATTERN.findall(content)) | set(GLOSSARY_CLOSING_TAG_PATTERN.findall(content))),
+        "roots": {},
+        "elements": {},
+    }
+    for is_root, declarations, body in _iter_sections(lines):
+        holder = new_node()
+        nodes = [add_element(holder, declaration) for declaration in declarations]
+        nodes = [node for node in nodes if node is not None]
+        if not nodes:
+            continue
+        for node in nodes:
+            _apply_bullets(node, body)
+        _strip_tags(holder)
+        target = schema["roots"] if is_root else schema["elements"]
+        for tag, node in holder["children"].items():
+            if tag in target:
+                _merge_nodes(target[tag], node)
+            else:
+                target[tag] = node
+    for nodes in (schema["roots"], schema["elements"]):
+        for node in nodes.values():
+            _finish_node(node)
+    return schema
+
+def _merge_nodes(into, node):
+    for name, spec in node["attributes"].items():
+        existing = into["attributes"].setdefault(name, {"values": [], "open": False, "_placeholder": False})
+        existing["values"].extend(value for value in spec["values"] if value not in existing["values"])
+        existing["open"] = existing["open"] or spec["open"]
+        existing["_placeholder"] = existing["_placeholder"] or spec["_placeholder"]
+    into["open_children"] = into["open_children"] or node["open_children"]
+    for tag, child in node["children"].items():
+        if tag in into["children"]:
+            _merge_nodes(into["children"][tag], child)
+        else:
+            into["children"][tag] = child
+
+def schema_path_for(glossary_path):
+    return os.path.splitext(glossary_path)[0] + SCHEMA_SUFFIX
+
+_LOADED = {}
+
+def load_glossary_schema(glossary_path=DEFAULT_GLOSSARY_FILE, schema_path=None, rebuild=False):
+    """
+    Returns the compiled schema for glossary_path, recompiling the cached JSON artifact only
+    when the glossary changed: an unchanged (mtime, size) is trusted outright, otherwise the
+    glossary's sha256 decides. Repeated calls in one process reuse the loaded dict.
+    Raises FileNotFoundError if the glossary does not exist.
+    """
+    schema_path = schema_path or schema_path_for(glossary_path)
+    stat = os.stat(glossary_path)
+    stat_key = [stat.st_mtime_ns, stat.st_size]
+    loaded = _LOADED.get(schema_path)
+    if loaded and not rebuild and loaded[0] == stat_key:
+        return loaded[1]
+
+    schema = None
+    if not rebuild:
+        try:
+            with open(schema_path, 'r', encoding='utf-8') as f:
+                schema = json.load(f)
+        except (OSError, ValueError):
+            schema = None
+        if schema and (schema.get("version") != SCHEMA_VERSION or schema.get("glossary", {}).get("path") != glossary_path):
+            schema = None
+
+    if schema is None or schema["glossary"]["stat"] != stat_key:
+        with open(glossary_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if schema is None or schema["glossary"]["sha256"] != digest:
+            schema = compile_glossary(raw.decode('utf-8'))
+        schema["glossary"] = {"path": glossary_path, "stat": stat_key, "sha256": digest}
+        temp_path = f"{schema_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, schema_path)
+
+    _LOADED[schema_path] = (stat_key, schema)
+    return schema
+
+def _union_nodes(shared, node):
+    """
+    A node allowing everything either definition allows: attribute enumerations are combined
+    (open if either is), and children defined in both are unioned the same way.
+    """
+    attributes = dict(shared["attributes"])
+    for name, spec in node["attributes"].items():
+        existing = attributes.get(name)
+        if existing is None:
+            attributes[name] = spec
+        else:
+            attributes[name] = {"values": existing["values"] + [value for value in spec["values"] if value not in existing["values"]],
+                                "open": existing["open"] or spec["open"]}
+    children = dict(shared["children"])
+    for tag, child in node["children"].items():
+        children[tag] = _union_nodes(children[tag], child) if tag in children else child
+    return {"attributes": attributes, "children": children, "open_children": shared["open_children"] or node["open_children"]}
+
+def _effective_node(tag, node, schema):
+    """node widened with the shared definition of the same tag, if the glossary has one."""
+    shared = schema["elements"].get(tag)
+    if shared is None:
+        return node
+    if node is None:
+        return shared
+    return _union_nodes(shared, node)
+
+def check_element(element, schema):
+    """
+    Structural problems of one root-container element against the schema, as (path, message)
+    pairs: children the glossary doesn't allow where it lists children, attributes it doesn't
+    list where it lists attributes, and values outside a closed enumeration.
+    """
+    node = schema["roots"].get(element.tag)
+    problems = []
+    if node is not None:
+        _check_node(element, _effective_node(element.tag, node, schema), schema, element.tag, problems)
+    return problems
+
+def _check_node(element, node, schema, path, problems):
+    attributes = node["attributes"]
+    if attributes:
+        for name, value in element.attrib.items():
+            spec = attributes.get(name)
+            if spec is None:
+                problems.append((path, f"unknown attribute '{name}'"))
+            elif not spec["open"] and value not in spec["values"]:
+                problems.append((path, f"{name}=\"{value}\" is not one of {'|'.join(spec['values'])}"))
+    children = node["children"]
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        if child.tag in children:
+            child_node = _effective_node(child.tag, children[child.tag], schema)
+        else:
+            child_node = schema["elements"].get(child.tag) if node["open_children"] else None
+        if child_node is None:
+            if children:
+                problems.append((path, f"unexpected child <{child.tag}>"))
+            continue
+        _check_node(child, child_node, schema, f"{path}/{child.tag}", problems)
+
+def check_file(xml_file, schema):
+    """Counter of (path, message) problems over every root container in xml_file."""
+    problems = Counter()
+    root = ET.parse(xml_file).getroot()
+    for element in [root] if root.tag in schema["roots"] else root:
+        if element.tag in schema["roots"]:
+            problems.update(check_element(element, schema))
+    return problems
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compiles the XML tag glossary into a JSON schema and checks files against it.")
+    arg_parser.add_argument("files", nargs="*", help="XML files to check against the schema (none: just build it).")
+    arg_parser.add_argument("--glossary", default=DEFAULT_GLOSSARY_FILE, help=f"Glossary markdown (default: {DEFAULT_GLOSSARY_FILE}).")
+    arg_parser.add_argument("--schema", help="Compiled schema path (default: the glossary path with .schema.json).")
+    arg_parser.add_argument("--rebuild", action="store_true", help="Recompile even if the glossary is unchanged.")
+    arg_parser.add_argument("--top", type=int, default=10, help="Distinct problems listed per file (default: 10).")
+    args = arg_parser.parse_args(argv)
+
+    try:
+        schema = load_glossary_schema(args.glossary, args.schema, rebuild=args.rebuild)
+    except FileNotFoundError:
+        print(f"Glossary file not found: {args.glossary}")
+        return
+    print(f"Schema: {len(schema['roots'])} root containers, {len(schema['elements'])} shared elements, "
+          f"{len(schema['tags'])} tags ({args.schema or schema_path_for(args.glossary)})")
+
+    for xml_file in args.files:
+        try:
+            problems = check_file(xml_file, schema)
+        except (ET.ParseError, OSError) as e:
+            print(f"Could not parse {xml_file}: {e}")
+            continue
+        if not problems:
+            print(f"{xml_file}: matches the glossary structure")
+            continue
+        print(f"{xml_file}: {sum(problems.values())} structural problems ({len(problems)} distinct)")
+        for (path, message), count in problems.most_common(args.top):
+            print(f"  {count:>5}x  {path}: {message}")
+
+if __name__ == "__main__":
+    main()
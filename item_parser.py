@@ -1,5 +1,11 @@
 import xml.etree.ElementTree as ET
+import argparse
+import glob
+import os
 import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Helper to create a sub_element if text is not None and not empty
 def sub_element_if_text(parent, tag, text=None, attributes=None):
@@ -40,6 +46,15 @@ PROPERTY_TEXT_PATTERNS = {
     "Heavy": re.compile(r"Heavy:\s*You have Disadvantage on attack rolls.*?isn't at least \d+\.\s*\n?", re.IGNORECASE | re.DOTALL),
     "Reach": re.compile(r"Reach:\s*A Reach weapon adds 5 feet.*?with it\.\s*\n?", re.IGNORECASE | re.DOTALL)
 }
+# The same patterns as one alternation of named groups, so all property boilerplate is found in a single scan of the text.
+# The lookahead (first letter of some property name, then "Word:") rejects almost every position before any branch is tried.
+PROPERTY_TEXT_PREFIX = "(?=[%s][\\w-]*:)" % "".join(sorted({pattern.pattern[0].lower() for pattern in PROPERTY_TEXT_PATTERNS.values()}))
+PROPERTY_TEXT_PATTERN = re.compile(PROPERTY_TEXT_PREFIX + "(?:" + "|".join(f"(?P<{prop_name}>{pattern.pattern})" for prop_name, pattern in PROPERTY_TEXT_PATTERNS.items()) + ")", re.IGNORECASE | re.DOTALL)
+
+def strip_property_text(text_content, prop_names=None):
+    """Removes property descriptions (only those of prop_names, if given) in one pass over text_content."""
+    if prop_names is None: return PROPERTY_TEXT_PATTERN.sub("", text_content).strip()
+    return PROPERTY_TEXT_PATTERN.sub(lambda m: "" if m.lastgroup in prop_names else m.group(0), text_content).strip()
 
 def parse_source(text_content, new_item_element): # Unchanged
     if not text_content: return ""
@@ -140,6 +155,7 @@ def parse_weapon_details(source_item, text_content, new_item_element, weapon_sub
     if dmg_attrs["dice"]: ET.SubElement(weapon_details_el, "damage", attrib=dmg_attrs)
 
     properties_el = ET.SubElement(weapon_details_el, "properties")
+    described_props = set()
     prop_tag_text = source_item.findtext("property", "")
     if prop_tag_text:
         for prop_abbr in prop_tag_text.split(','):
@@ -161,9 +177,9 @@ def parse_weapon_details(source_item, text_content, new_item_element, weapon_sub
                     if heavy_req_match: prop_attrs["strength_requirement"] = heavy_req_match.group(1) # Storing as strength_requirement as per glossary for weapon property
 
                 ET.SubElement(properties_el, "property", attrib=prop_attrs)
-                # Remove property description text after processing the property
-                if prop_name in PROPERTY_TEXT_PATTERNS:
-                    text_content = PROPERTY_TEXT_PATTERNS[prop_name].sub("", text_content).strip()
+                if prop_name in PROPERTY_TEXT_PATTERNS: described_props.add(prop_name)
+        # Remove the description text of every processed property at once
+        if described_props: text_content = strip_property_text(text_content, described_props)
 
     mastery_matches = MASTERY_PATTERN.findall(text_content)
     if mastery_matches:
@@ -298,77 +314,193 @@ def parse_consumable_effects(source_item, text_content, new_item_element, item_m
         fully_parsed = True
     return "" if fully_parsed else text_content
 
-def parse_xml_items(source_file_path, output_file_path): # Minor changes to main loop text handling
-    try: tree = ET.parse(source_file_path)
-    except Exception as e: print(f"Error parsing {source_file_path}: {e}"); return
-    root = tree.getroot()
-    new_root = ET.Element("compendium", version="1.0")
-
-    for source_item in root.findall("item"):
-        new_item_el = ET.SubElement(new_root, "item")
-        name = parse_item_name(source_item, new_item_el)
-        text = source_item.findtext("text","").strip()
-        text = parse_source(text, new_item_el)
-        main_type, sub_type, orig_abbr = parse_item_type_and_rarity(source_item, new_item_el, name)
-        parse_weight_value(source_item, new_item_el)
-
-        if source_item.findtext("magic","").strip().upper() == "YES":
-            if new_item_el.find("rarity") is None: ET.SubElement(new_item_el, "rarity", type="Common")
-            if new_item_el.find("attunement") is None: ET.SubElement(new_item_el, "attunement", required="false")
-
-        is_weapon = (source_item.find("dmg1") is not None) or (main_type == "Weapon")
-        is_armor_shield = (source_item.find("ac") is not None) or (main_type == "Armor") or (main_type == "Shield")
-
-        if is_weapon:
-            weapon_sub = "Melee" if orig_abbr == "M" else "Ranged" if orig_abbr == "R" else sub_type
-            if name.lower() in ["staff [2024]", "wooden staff [2024]"]: weapon_sub = "Melee"
-            text = parse_weapon_details(source_item, text, new_item_el, weapon_sub, name)
-        if is_armor_shield: text = parse_armor_details(source_item, text, new_item_el, sub_type)
-        if main_type == "Tool": text = parse_tool_details(source_item, text, new_item_el, sub_type)
-        text = parse_consumable_effects(source_item, text, new_item_el, main_type, name)
-
-        if "Trinket [2024]" in name:
+def parse_item(source_item): # Per-item body of the old parse_xml_items loop
+    """Builds the structured <item> element for one source <item> element."""
+    new_item_el = ET.Element("item")
+    name = parse_item_name(source_item, new_item_el)
+    text = source_item.findtext("text","").strip()
+    text = parse_source(text, new_item_el)
+    main_type, sub_type, orig_abbr = parse_item_type_and_rarity(source_item, new_item_el, name)
+    parse_weight_value(source_item, new_item_el)
+
+    if source_item.findtext("magic","").strip().upper() == "YES":
+        if new_item_el.find("rarity") is None: ET.SubElement(new_item_el, "rarity", type="Common")
+        if new_item_el.find("attunement") is None: ET.SubElement(new_item_el, "attunement", required="false")
+
+    is_weapon = (source_item.find("dmg1") is not None) or (main_type == "Weapon")
+    is_armor_shield = (source_item.find("ac") is not None) or (main_type == "Armor") or (main_type == "Shield")
+
+    if is_weapon:
+        weapon_sub = "Melee" if orig_abbr == "M" else "Ranged" if orig_abbr == "R" else sub_type
+        if name.lower() in ["staff [2024]", "wooden staff [2024]"]: weapon_sub = "Melee"
+        text = parse_weapon_details(source_item, text, new_item_el, weapon_sub, name)
+    if is_armor_shield: text = parse_armor_details(source_item, text, new_item_el, sub_type)
+    if main_type == "Tool": text = parse_tool_details(source_item, text, new_item_el, sub_type)
+    text = parse_consumable_effects(source_item, text, new_item_el, main_type, name)
+
+    if "Trinket [2024]" in name:
+        desc_el = ET.SubElement(new_item_el, "description_text")
+        intro_text, _, table_content_text = text.partition("Trinkets:\n")
+        if intro_text.strip(): sub_element_if_text(desc_el, "p", text=intro_text.strip())
+        if table_content_text:
+            table_el = ET.SubElement(desc_el, "table")
+            header_el = ET.SubElement(table_el, "header")
+            sub_element_if_text(header_el, "col", attributes={"label":"1d100"})
+            sub_element_if_text(header_el, "col", attributes={"label":"Trinket"})
+            for line in table_content_text.splitlines():
+                line = line.strip()
+                if "|" in line:
+                    roll_parts = line.split("|",1)
+                    if len(roll_parts) == 2:
+                        roll, desc_cell = roll_parts[0].strip(), roll_parts[1].strip()
+                        if roll.replace("0","").isdigit() or roll == "100":
+                            row = ET.SubElement(table_el, "row")
+                            sub_element_if_text(row, "cell", text=roll); sub_element_if_text(row, "cell", text=desc_cell)
+            text = "" # Trinket table text is now fully structured or part of intro.
+
+    # Final cleanup for any remaining general property descriptions not caught earlier
+    # This should be less necessary now that parse_weapon_details handles its own property text.
+    if text.strip():
+        # Check if it's just leftover from a property that wasn't fully cleaned by parse_weapon_details
+        # (e.g. if a property name was in text but not in the <property> tag)
+        # This is a bit broad; ideally, all structured text is removed by the specific parsers.
+        temp_text = strip_property_text(text)
+
+        if temp_text.strip(): # If text still remains after this additional check
             desc_el = ET.SubElement(new_item_el, "description_text")
-            intro_text, _, table_content_text = text.partition("Trinkets:\n")
-            if intro_text.strip(): sub_element_if_text(desc_el, "p", text=intro_text.strip())
-            if table_content_text:
-                table_el = ET.SubElement(desc_el, "table")
-                header_el = ET.SubElement(table_el, "header")
-                sub_element_if_text(header_el, "col", attributes={"label":"1d100"})
-                sub_element_if_text(header_el, "col", attributes={"label":"Trinket"})
-                for line in table_content_text.splitlines():
-                    line = line.strip()
-                    if "|" in line:
-                        roll_parts = line.split("|",1)
-                        if len(roll_parts) == 2:
-                            roll, desc_cell = roll_parts[0].strip(), roll_parts[1].strip()
-                            if roll.replace("0","").isdigit() or roll == "100":
-                                row = ET.SubElement(table_el, "row")
-                                sub_element_if_text(row, "cell", text=roll); sub_element_if_text(row, "cell", text=desc_cell)
-                text = "" # Trinket table text is now fully structured or part of intro.
-
-        # Final cleanup for any remaining general property descriptions not caught earlier
-        # This should be less necessary now that parse_weapon_details handles its own property text.
-        if text.strip():
-            # Check if it's just leftover from a property that wasn't fully cleaned by parse_weapon_details
-            # (e.g. if a property name was in text but not in the <property> tag)
-            # This is a bit broad; ideally, all structured text is removed by the specific parsers.
-            temp_text = text
-            for prop_key_abbr, prop_mapped_name in WEAPON_PROPERTY_MAP.items():
-                 if prop_mapped_name in PROPERTY_TEXT_PATTERNS:
-                     temp_text = PROPERTY_TEXT_PATTERNS[prop_mapped_name].sub("", temp_text).strip()
-
-            if temp_text.strip(): # If text still remains after this additional check
-                desc_el = ET.SubElement(new_item_el, "description_text")
-                for para in temp_text.split('\n\n'):
-                    if para.strip(): sub_element_if_text(desc_el, "p", text=para.strip())
-            elif not temp_text.strip() and text.strip(): # If temp_text is empty, it means text was only property descriptions
-                pass # Do not add empty description_text
-
-    new_tree = ET.ElementTree(new_root)
-    ET.indent(new_tree, space="  ")
-    new_tree.write(output_file_path, encoding="UTF-8", xml_declaration=True)
+            for para in temp_text.split('\n\n'):
+                if para.strip(): sub_element_if_text(desc_el, "p", text=para.strip())
+        elif not temp_text.strip() and text.strip(): # If temp_text is empty, it means text was only property descriptions
+            pass # Do not add empty description_text
+    return new_item_el
+
+def iter_source_items(source_file_path):
+    """
+    Streams the top-level <item> elements of a source file, releasing each one once it has been used.
+    Raises ET.ParseError / FileNotFoundError like ET.parse, so callers can drop what they wrote so far.
+    """
+    context = ET.iterparse(source_file_path, events=("start", "end"))
+    _, root = next(context)
+    depth = 0
+    for event, elem in context:
+        if event == "start": depth += 1; continue
+        depth -= 1
+        if depth == 0 and elem.tag == "item":
+            yield elem
+            elem.clear(); root.remove(elem)
+
+def build_item_xml_batch(serialized_items):
+    """Worker side: parses a batch of serialized source <item>s and returns the indented structured XML of each."""
+    results = []
+    for serialized_item in serialized_items:
+        new_item_el = parse_item(ET.fromstring(serialized_item))
+        ET.indent(new_item_el, space="  ", level=1) # Same indentation as a child of <compendium>
+        results.append(ET.tostring(new_item_el, encoding="unicode"))
+    return results
+
+class StructuredItemWriter:
+    """
+    Writes a structured items file one <item> at a time; the bytes match indenting and writing the whole tree.
+    Items go to <output>.tmp; commit() renames it into place, discard() drops it and leaves any old output alone.
+    """
+    def __init__(self, output_file_path):
+        self.output_file_path = output_file_path
+        self.temp_path = f"{output_file_path}.tmp"
+        self.count = 0
+        self._file = open(self.temp_path, "w", encoding="utf-8")
+        self._file.write("<?xml version='1.0' encoding='UTF-8'?>\n<compendium version=\"1.0\"")
+
+    def write(self, item_xml_text):
+        self._file.write(">" if self.count == 0 else "")
+        self._file.write("\n  " + item_xml_text)
+        self.count += 1
+
+    def commit(self):
+        self._file.write("\n</compendium>" if self.count else " />")
+        self._file.close()
+        os.replace(self.temp_path, self.output_file_path)
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.temp_path): os.remove(self.temp_path)
+
+def _iter_item_batches(source_file_path, batch_size):
+    batch = []
+    for source_item in iter_source_items(source_file_path):
+        batch.append(ET.tostring(source_item, encoding="unicode"))
+        if len(batch) >= batch_size: yield batch; batch = []
+    if batch: yield batch
+
+def structured_output_path(source_file_path, output_dir):
+    stem = os.path.splitext(os.path.basename(source_file_path))[0]
+    return os.path.join(output_dir, f"{stem}-structured.xml")
+
+def _write_item_file(source_file_path, output_file_path, executor=None, jobs=1, batch_size=32):
+    """
+    Streams one source file into output_file_path and returns the item count. The output is only
+    replaced once every item was parsed; on any error the partial file is dropped and the error raised.
+    """
+    writer = StructuredItemWriter(output_file_path)
+    try:
+        batches = _iter_item_batches(source_file_path, batch_size)
+        if executor is None:
+            for batch in batches:
+                for item_xml_text in build_item_xml_batch(batch): writer.write(item_xml_text)
+        else:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(build_item_xml_batch, batch))
+                if len(pending) >= jobs * 2:
+                    for item_xml_text in pending.popleft().result(): writer.write(item_xml_text)
+            while pending:
+                for item_xml_text in pending.popleft().result(): writer.write(item_xml_text)
+    except BaseException:
+        writer.discard()
+        raise
+    writer.commit()
+    return writer.count
+
+def parse_item_files(source_file_paths, output_dir=".", jobs=1, batch_size=32):
+    """
+    Batch mode: streams the <item>s of every source file, in batches, through a ProcessPoolExecutor
+    (jobs > 1) or in-process, and writes each file's <stem>-structured.xml incrementally as results
+    come back in order. At most jobs * 2 batches are in flight. A source that fails to parse is
+    reported and leaves its existing output untouched. Returns {output path: item count} of the
+    files written.
+    """
+    if output_dir and not os.path.exists(output_dir): os.makedirs(output_dir)
+    counts = {}
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        for source_file_path in source_file_paths:
+            output_file_path = structured_output_path(source_file_path, output_dir)
+            try:
+                counts[output_file_path] = _write_item_file(source_file_path, output_file_path, executor, jobs, batch_size)
+            except Exception as e:
+                print(f"Error parsing {source_file_path}: {e}")
+                continue
+            print(f"Parsing complete. {counts[output_file_path]} items from {source_file_path}. Output at {output_file_path}")
+    finally:
+        if executor is not None: executor.shutdown()
+    return counts
+
+def parse_xml_items(source_file_path, output_file_path): # Now streams through parse_item; output unchanged
+    try: _write_item_file(source_file_path, output_file_path)
+    except Exception as e: print(f"Error parsing {source_file_path}: {e}"); return
     print(f"Parsing complete. Output at {output_file_path}")
 
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Parses item source files into <stem>-structured.xml files.")
+    arg_parser.add_argument("inputs", nargs="*", default=sorted(glob.glob("01_Core/items/items-*.xml")),
+                            help="Item source files (default: 01_Core/items/items-*.xml).")
+    arg_parser.add_argument("--output-dir", default=".", help="Directory for the structured files (default: current directory).")
+    arg_parser.add_argument("--jobs", type=int, default=1, help="Worker processes for parsing items (default: 1, serial).")
+    args = arg_parser.parse_args(argv)
+    if not args.inputs: print("Error: no item source files given or found in 01_Core/items/"); return
+    counts = parse_item_files(args.inputs, args.output_dir, jobs=args.jobs)
+    if len(counts) < len(args.inputs):
+        print(f"Error: {len(args.inputs) - len(counts)} of {len(args.inputs)} item files could not be parsed.")
+        sys.exit(1)
+
 if __name__ == '__main__':
-    parse_xml_items("01_Core/01_Players_Handbook_2024/items-phb24.xml", "items-phb24-structured.xml")
+    main()
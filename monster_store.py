@@ -0,0 +1,185 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from parse_bestiary import iter_bestiary_jsonl
+
+DEFAULT_STORE_PREFIX = "bestiario_estructurado"
+DATA_SUFFIX = ".dat"
+INDEX_SUFFIX = ".idx"
+
+# Index layout: a header followed by an open-addressing hash table of fixed-width slots,
+# so a lookup reads one header and a handful of slots no matter how many monsters there are.
+INDEX_MAGIC = b"BSTIDX01"
+INDEX_HEADER = struct.Struct("<8sQQ")  # magic, slot count, record count
+INDEX_SLOT = struct.Struct("<QQI4x")   # name hash (0 = empty), data offset, data length
+
+def normalize_monster_name(name):
+    """Case- and whitespace-insensitive key: 'Goblin  Warrior [2024]' -> 'goblin warrior [2024]'."""
+    return " ".join(name.split()).casefold()
+
+def _name_hash(normalized_name):
+    # Stable across processes (unlike hash()); 0 is reserved for empty slots.
+    digest = hashlib.blake2b(normalized_name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+def store_paths(prefix):
+    return prefix + DATA_SUFFIX, prefix + INDEX_SUFFIX
+
+def build_monster_store(monsters, prefix=DEFAULT_STORE_PREFIX):
+    """
+    Writes each monster as one compact JSON record into <prefix>.dat and a hash-table
+    index of (offset, length) keyed by normalized name into <prefix>.idx.
+    The first monster wins when two normalize to the same name. Both files are written to .tmp
+    files first, which are removed if the build fails, so the old store stays intact.
+    Returns the record count.
+    """
+    data_path, index_path = store_paths(prefix)
+    entries = {}
+    offset = 0
+    try:
+        with open(data_path + ".tmp", 'wb') as data_file:
+            for monster in monsters:
+                key = normalize_monster_name(monster.get('name', ''))
+                if not key:
+                    continue
+                if key in entries:
+                    print(f"Warning: duplicate monster name '{monster.get('name')}' skipped in {data_path}")
+                    continue
+                record = json.dumps(monster, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+                data_file.write(record)
+                entries[key] = (offset, len(record) - 1)
+                offset += len(record)
+
+        slot_count = 8
+        while slot_count < len(entries) * 2:  # load factor <= 0.5 keeps probe chains short
+            slot_count *= 2
+        slots = bytearray(INDEX_SLOT.size * slot_count)
+        for key, (record_offset, record_length) in entries.items():
+            name_hash = _name_hash(key)
+            slot = name_hash & (slot_count - 1)
+            while INDEX_SLOT.unpack_from(slots, slot * INDEX_SLOT.size)[0]:
+                slot = (slot + 1) & (slot_count - 1)
+            INDEX_SLOT.pack_into(slots, slot * INDEX_SLOT.size, name_hash, record_offset, record_length)
+
+        with open(index_path + ".tmp", 'wb') as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, slot_count, len(entries)))
+            index_file.write(slots)
+    except BaseException:
+        for temp_path in (data_path + ".tmp", index_path + ".tmp"):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(index_path + ".tmp", index_path)
+    return len(entries)
+
+class MonsterStore:
+    """
+    Read-only, mmap-backed view of a store written by build_monster_store.
+
+    get() hashes the name, probes the index and decodes only the matching record, so a cold
+    lookup touches a few pages of each file rather than the whole bestiary.
+    """
+
+    def __init__(self, prefix=DEFAULT_STORE_PREFIX):
+        data_path, index_path = store_paths(prefix)
+        self._data_file = open(data_path, 'rb')
+        self._index_file = open(index_path, 'rb')
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(data_path) else b""
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._slot_count, self._record_count = INDEX_HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"{index_path} is not a monster store index")
+
+    def __len__(self):
+        return self._record_count
+
+    def __contains__(self, name):
+        return self._locate(name) is not None
+
+    def _locate(self, name):
+        key = normalize_monster_name(name)
+        name_hash = _name_hash(key)
+        mask = self._slot_count - 1
+        slot = name_hash & mask
+        for _ in range(self._slot_count):
+            slot_hash, offset, length = INDEX_SLOT.unpack_from(self._index, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == name_hash:
+                record = json.loads(self._data[offset:offset + length])
+                # Guard against 64-bit hash collisions between different names.
+                if normalize_monster_name(record.get('name', '')) == key:
+                    return record
+            slot = (slot + 1) & mask
+        return None
+
+    def get(self, name, default=None):
+        record = self._locate(name)
+        return default if record is None else record
+
+    def close(self):
+        for handle in (self._data, self._index, self._data_file, self._index_file):
+            if hasattr(handle, 'close'):
+                handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _iter_structured_bestiary(input_path):
+    if input_path.endswith('.jsonl'):
+        return iter_bestiary_jsonl(input_path)
+    with open(input_path, 'r', encoding='utf-8') as f:
+        return iter(json.load(f))
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Builds or queries the mmap-backed monster store.")
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Write <prefix>.dat and <prefix>.idx from the structured bestiary.")
+    build_parser.add_argument("--input", default="bestiario_estructurado.json", help="Structured bestiary (.json or .jsonl).")
+    build_parser.add_argument("--prefix", default=DEFAULT_STORE_PREFIX)
+    get_parser = subparsers.add_parser("get", help="Print one monster record by name.")
+    get_parser.add_argument("name")
+    get_parser.add_argument("--prefix", default=DEFAULT_STORE_PREFIX)
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "build":
+        try:
+            count = build_monster_store(_iter_structured_bestiary(args.input), args.prefix)
+        except FileNotFoundError:
+            print(f"Error: Input file not found {args.input}")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error decoding JSON from {args.input}: {e}")
+            sys.exit(1)
+        data_path, index_path = store_paths(args.prefix)
+        print(f"Stored {count} monsters in {data_path} (index: {index_path})")
+        return
+
+    try:
+        store = MonsterStore(args.prefix)
+    except FileNotFoundError:
+        print(f"Error: monster store not found for prefix {args.prefix}; run the 'build' command first")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    with store:
+        monster = store.get(args.name)
+    if monster is None:
+        print(f"No monster named '{args.name}'")
+    else:
+        print(json.dumps(monster, indent=4, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
-import xml.etree.ElementTree as ET
+import argparse
+import glob
+import hashlib
+import heapq
 import json
+import os
+import pickle
 import re
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
 
 # Glossary-aligned monster template
 monster_glossary_template = {
@@ -116,12 +125,221 @@ monster_glossary_template = {
     "source_file": ""
 }
 
+def build_record_factory(template, name="new_record"):
+    """
+    Compiles a zero-argument function that returns a fresh deep copy of `template`.
+
+    The template is rendered as a nested dict/list literal, so every call builds brand-new
+    containers straight from bytecode instead of serializing and re-parsing the template
+    (json.loads(json.dumps(...))) or walking it with copy.deepcopy. Only JSON-style values
+    (dict, list, str, int, float, bool, None) are supported.
+    """
+    source = f"def {name}():\n    return {template!r}\n"
+    namespace = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    factory = namespace[name]
+    if factory() != template:
+        raise ValueError(f"Template for {name} is not made only of literal JSON values")
+    return factory
+
+new_monster_record = build_record_factory(monster_glossary_template, "new_monster_record")
+
+class TrackedPattern:
+    """
+    A precompiled regex registered under a name. Exposes the usual pattern methods
+    (search, match, findall, split...). While tracking is off they are the compiled
+    pattern's own bound methods, so there is no overhead; when tracking is on every call
+    records its count, hits (calls that found something) and time spent. sub is run as subn
+    to count substitutions, and finditer's iterator is timed and checked as it is consumed.
+    """
+    _METHODS = ("search", "match", "fullmatch", "findall", "finditer", "split", "sub")
+
+    def __init__(self, name, compiled):
+        self.name = name
+        self.pattern = compiled
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+        self.set_tracking(False)
+
+    def set_tracking(self, enabled):
+        for method_name in self._METHODS:
+            raw_method = getattr(self.pattern, method_name)
+            setattr(self, method_name, self._timed(method_name, raw_method) if enabled else raw_method)
+
+    def _timed(self, method_name, raw_method):
+        if method_name == "sub":
+            # subn does the same work and also says how many substitutions were made
+            raw_method = self.pattern.subn
+        def timed_call(*args, **kwargs):
+            start = perf_counter()
+            result = raw_method(*args, **kwargs)
+            self.seconds += perf_counter() - start
+            self.calls += 1
+            if method_name == "finditer":
+                return self._tracked_matches(result)
+            if method_name == "sub":
+                result, found = result
+            elif method_name == "split":
+                found = len(result) > 1
+            else:
+                found = bool(result)
+            if found:
+                self.hits += 1
+            return result
+        return timed_call
+
+    def _tracked_matches(self, matches):
+        """finditer's iterator, timing each step and counting a hit once the first match is found."""
+        found = False
+        while True:
+            start = perf_counter()
+            match = next(matches, None)
+            self.seconds += perf_counter() - start
+            if match is None:
+                return
+            if not found:
+                found = True
+                self.hits += 1
+            yield match
+
+    def reset_stats(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+
+class PatternRegistry:
+    """Module-level registry of the compiled patterns shared by all section parsers."""
+
+    def __init__(self):
+        self._patterns = {}
+        self.tracking = False
+
+    def register(self, name, pattern, flags=0):
+        if name in self._patterns:
+            raise ValueError(f"Pattern '{name}' is already registered")
+        tracked = TrackedPattern(name, re.compile(pattern, flags))
+        tracked.set_tracking(self.tracking)
+        self._patterns[name] = tracked
+        return tracked
+
+    def __getitem__(self, name):
+        return self._patterns[name]
+
+    def __iter__(self):
+        return iter(self._patterns.values())
+
+    def enable_stats(self, enabled=True):
+        self.tracking = enabled
+        for tracked in self._patterns.values():
+            tracked.set_tracking(enabled)
+
+    def reset_stats(self):
+        for tracked in self._patterns.values():
+            tracked.reset_stats()
+
+    def snapshot(self):
+        """Returns {name: {"calls", "hits", "seconds"}} so stats can travel back from worker processes."""
+        return {t.name: {"calls": t.calls, "hits": t.hits, "seconds": t.seconds} for t in self._patterns.values()}
+
+    def merge(self, snapshot):
+        for name, counts in snapshot.items():
+            tracked = self._patterns.get(name)
+            if tracked is None:
+                continue
+            tracked.calls += counts["calls"]
+            tracked.hits += counts["hits"]
+            tracked.seconds += counts["seconds"]
+
+    def stats(self):
+        """Per-pattern stats for patterns that were called, most expensive first."""
+        rows = [{"name": t.name, "calls": t.calls, "hits": t.hits, "seconds": t.seconds}
+                for t in self._patterns.values() if t.calls]
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def format_stats(self):
+        rows = self.stats()
+        if not rows:
+            return "No regex calls recorded."
+        name_width = max(len("pattern"), max(len(row["name"]) for row in rows))
+        lines = [f"{'pattern':<{name_width}}  {'calls':>9}  {'hits':>9}  {'total ms':>10}  {'us/call':>8}"]
+        for row in rows:
+            per_call_us = row["seconds"] * 1e6 / row["calls"]
+            lines.append(f"{row['name']:<{name_width}}  {row['calls']:>9}  {row['hits']:>9}  {row['seconds'] * 1000:>10.2f}  {per_call_us:>8.2f}")
+        return "\n".join(lines)
+
+
+PATTERNS = PatternRegistry()
+
+# Core details, statistics and defenses
+CREATURE_TYPE_PATTERN = PATTERNS.register("creature_type", r"([\w\s]+)(?:\s*\((.*?)\))?")
+ARMOR_CLASS_PATTERN = PATTERNS.register("armor_class", r"(\d+)(?:\s*\((.*?)\))?")
+HIT_POINTS_PATTERN = PATTERNS.register("hit_points", r"(\d+)\s*\((.*?)\)")
+SAVING_THROW_PATTERN = PATTERNS.register("saving_throw", r"\s*(\w+)\s*([+-]\d+)\s*")
+DEFENSE_COMMON_NOTE_PATTERN = PATTERNS.register("defense_common_note", r"(\bfrom\b .*|\bexcept\b .*|\bwhile\b .*|\bbut not from\b .*|\bonly\b)$", re.IGNORECASE)
+DEFENSE_SPECIFIC_NOTE_PATTERN = PATTERNS.register("defense_specific_note", r"([\w\s\-\/]+)\s+\((.*?)\)$")
+SKILL_PATTERN = PATTERNS.register("skill", r"(.+?)\s*([+-]\d+)")
+
+# Speed, senses and languages
+SPEED_FLY_PATTERN = PATTERNS.register("speed_fly", r"fly\s*(\d+\s*ft\.?)(?:\s*\(hover\))?(?:\s*\((.*?)\))?", re.IGNORECASE)
+SPEED_SWIM_PATTERN = PATTERNS.register("speed_swim", r"swim\s*(\d+\s*ft\.?)(?:\s*\((.*?)\))?", re.IGNORECASE)
+SPEED_BURROW_PATTERN = PATTERNS.register("speed_burrow", r"burrow\s*(\d+\s*ft\.?)(?:\s*\((.*?)\))?", re.IGNORECASE)
+SPEED_CLIMB_PATTERN = PATTERNS.register("speed_climb", r"climb\s*(\d+\s*ft\.?)(?:\s*\((.*?)\))?", re.IGNORECASE)
+SPEED_WALK_PATTERN = PATTERNS.register("speed_walk", r"(\d+\s*ft\.?)(?:\s*\((.*?)\))?")
+SENSE_PATTERN = PATTERNS.register("sense", r"(darkvision|blindsight|tremorsense|truesight)\s*(\d+\s*ft\.?)", re.IGNORECASE)
+TELEPATHY_PATTERN = PATTERNS.register("telepathy", r"telepathy\s+(\d+\s*(?:ft\.?|feet|mile|miles))(?:\s*\((.*?)\))?", re.IGNORECASE)
+UNDERSTANDS_PATTERN = PATTERNS.register("understands", r"understands\s+(.+?)(?:\s+but\s+(?:can't|cannot)\s+speak(?:\s+(?:it|them))?)?(\s*\(.*\))?$", re.IGNORECASE)
+LANGUAGE_SPLIT_PATTERN = PATTERNS.register("language_split", r'\s+and\s+|\s*,\s*')
+ALPHANUMERIC_PATTERN = PATTERNS.register("alphanumeric", r"[a-zA-Z0-9]")
+
+# Description and source
+SOURCE_TAG_PATTERN = PATTERNS.register("source_tag", r"(.*?)(?:,?\s*p(?:g|age)?\.?\s*(\d+))?$", re.IGNORECASE)
+DESCRIPTION_SOURCE_PATTERN = PATTERNS.register("description_source", r"Source:\s*(.*?)(?:p\.\s*(\d+))?(?:,\s*(.*))?$", re.IGNORECASE | re.MULTILINE)
+PROFICIENCY_BONUS_PATTERN = PATTERNS.register("proficiency_bonus", r"([+-]?\d+)")
+
+# Traits and actions
+RECHARGE_PATTERN = PATTERNS.register("recharge", r"\((Recharge\s*([\d\-\–]+(?:–[\d]+)?(?:-[\d]+)?|[\d\–]+))\)", re.IGNORECASE)
+LIMITED_USE_PATTERN = PATTERNS.register("limited_use", r"\((\d+)/([a-zA-Z]+)\)", re.IGNORECASE)
+ATTACK_ROLL_PATTERN = PATTERNS.register("attack_roll", r"(Melee|Ranged)\s*(?:Weapon|Spell)?\s*Attack Roll:\s*([+-]?\d+)\s*(?:to hit)?(?:,\s*reach\s*([\d\s]+ft\.?))?(?:,\s*range\s*([\d\s\/]+ft\.?))?", re.IGNORECASE)
+HIT_PATTERN = PATTERNS.register("hit", r"Hit:\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?))(?:plus\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?)))?(?:,\s*and\s*(.*?))?\.", re.IGNORECASE)
+ACTION_SAVE_PATTERN = PATTERNS.register("action_save", r"(Strength|Dexterity|Constitution|Intelligence|Wisdom|Charisma)\s*Saving Throw:\s*DC\s*(\d+)", re.IGNORECASE)
+FAILURE_PATTERN = PATTERNS.register("failure", r"Failure:\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?))(?:plus\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?)))?(?:,\s*and\s*(.*?))?\.", re.IGNORECASE)
+SUCCESS_PATTERN = PATTERNS.register("success", r"Success:\s*(Half damage only|Half damage|No damage|.*?)\.", re.IGNORECASE)
+DAMAGE_PATTERN = PATTERNS.register("damage", r"(?:.*?\(?([ \d\w\+\-\–d]+)\)?\s*)?([\w\s]+(?:damage)?)")
+ATTACK_TARGET_PATTERN = PATTERNS.register("attack_target", r"(?:reach|range)\s*[\d\s\w\/\.]+\.?\s*(.*?)(?:Hit:|$)", re.IGNORECASE | re.DOTALL)
+SAVE_TARGET_PATTERN = PATTERNS.register("save_target", r"DC\s*\d+,\s*(.*?)(?:\.\s*Failure:|$)", re.IGNORECASE | re.DOTALL)
+MULTIATTACK_MAKES_PATTERN = PATTERNS.register("multiattack_makes", r"makes (?:one|two|three|four|five|six|\d+)\s+([\w\s]+?)\s+attacks", re.IGNORECASE)
+MULTIATTACK_USES_PATTERN = PATTERNS.register("multiattack_uses", r"uses\s+([\w\s]+?)(?:\s+and\s+([\w\s]+?))?(?:\s+if available|\.)", re.IGNORECASE)
+MULTIATTACK_REPLACE_PATTERN = PATTERNS.register("multiattack_replace", r"replace (?:any|one|two)\s+attack(?:s)?\s+with\s+(?:a use of )?([\w\s\(\)]+?)(?:\.|$|,)", re.IGNORECASE)
+
+# Legendary, lair and regional
+LEGENDARY_PER_TURN_PATTERN = PATTERNS.register("legendary_per_turn", r"\((\d+)/Turn\)", re.IGNORECASE)
+LEGENDARY_RECHARGE_PATTERN = PATTERNS.register("legendary_recharge", r"(\d+)/TURN", re.IGNORECASE)
+LEGENDARY_COST_PATTERN = PATTERNS.register("legendary_cost", r"\(Costs\s*(\d+)\s*Actions?\)", re.IGNORECASE)
+LAIR_ACTION_INTRO_PATTERN = PATTERNS.register("lair_action_intro", r"takes a lair action to cause one of the following", re.IGNORECASE)
+REGIONAL_EFFECT_INTRO_PATTERN = PATTERNS.register("regional_effect_intro", r"region containing .*? lair is warped .*? creating the following effects:", re.IGNORECASE)
+REGIONAL_EFFECTS_LEAD_PATTERN = PATTERNS.register("regional_effects_lead", r"(creating the following effects:)", re.IGNORECASE)
+REGIONAL_EFFECTS_TAIL_PATTERN = PATTERNS.register("regional_effects_tail", r"(If the (?:dragon|hag|creature) (?:dies|is destroyed|moves its lair elsewhere), these effects end .*?\.)$", re.IGNORECASE | re.DOTALL)
+REGIONAL_EFFECT_NAME_PATTERN = PATTERNS.register("regional_effect_name", r"([\w\s\-\'\u2019]+?):\s*(.*)")
+LAIR_ACTION_SPLIT_PATTERN = PATTERNS.register("lair_action_split", r'\n\s*•\s*|\n\n')
+LAIR_ACTION_NAME_PATTERN = PATTERNS.register("lair_action_name", r"([\w\s\-\'\u2019]+)\.\s*(.*)")
+
+# Spellcasting
+SPELLCASTING_ABILITY_PATTERN = PATTERNS.register("spellcasting_ability", r"using\s+(Wisdom|Intelligence|Charisma|Con|Str|Dex)\s+as\s+the\s+spellcasting\s+ability", re.IGNORECASE)
+SPELL_SAVE_DC_PATTERN = PATTERNS.register("spell_save_dc", r"spell\s+save\s+DC\s*(\d+)", re.IGNORECASE)
+SPELL_ATTACK_BONUS_PATTERN = PATTERNS.register("spell_attack_bonus", r"([+-]\d+)\s+to\s+hit\s+with\s+spell\s+attacks", re.IGNORECASE)
+AT_WILL_PATTERN = PATTERNS.register("at_will", r"At\s+will:\s*(.*?)(?:\n|\d+/Day|•|$)", re.IGNORECASE | re.DOTALL)
+PER_DAY_PATTERN = PATTERNS.register("per_day", r"(\d+)/Day\s*(?:each)?:\s*(.*?)(?:\n|\d+/Day|•|$)", re.IGNORECASE | re.DOTALL)
+SPELL_LEVEL_VERSION_PATTERN = PATTERNS.register("spell_level_version", r"\(level\s*(\d+)\s*version\)", re.IGNORECASE)
+SPELL_SLOTS_PATTERN = PATTERNS.register("spell_slots", r"(\d+)(?:st|nd|rd|th)\s+level\s*\((\d+)\s+slots?\):\s*(.*?)(?:\n|Cantrips|\d+(?:st|nd|rd|th)\s+level|$)", re.IGNORECASE | re.DOTALL)
+
 def get_monster_name(monster_element):
     name_tag = monster_element.find('name')
     return name_tag.text.strip() if name_tag is not None and name_tag.text else "Unnamed Monster"
 
 def initialize_monster_data(monster_element, filename):
-    new_monster_data = json.loads(json.dumps(monster_glossary_template))
+    new_monster_data = new_monster_record()
     new_monster_data["name"] = get_monster_name(monster_element)
     new_monster_data["source_file"] = filename
     return new_monster_data
@@ -149,7 +367,7 @@ def parse_core_details(monster_element, monster_data):
     monster_data['size']['full_name'] = size_map.get(size_code, size_code)
 
     type_text = get_text(monster_element, 'type')
-    type_match = re.match(r"([\w\s]+)(?:\s*\((.*?)\))?", type_text)
+    type_match = CREATURE_TYPE_PATTERN.match(type_text)
     if type_match:
         monster_data['creature_type']['type'] = type_match.group(1).strip().lower() # Standardize to lowercase
         if type_match.group(2):
@@ -192,7 +410,7 @@ def parse_defenses(monster_element, monster_data):
     defenses = monster_data['defenses']
 
     ac_text = get_text(monster_element, 'ac')
-    ac_match = re.match(r"(\d+)(?:\s*\((.*?)\))?", ac_text)
+    ac_match = ARMOR_CLASS_PATTERN.match(ac_text)
     if ac_match:
         defenses['armor_class']['value'] = int(ac_match.group(1))
         if ac_match.group(2):
@@ -203,7 +421,7 @@ def parse_defenses(monster_element, monster_data):
         defenses['armor_class']['description'] = ac_text
 
     hp_text = get_text(monster_element, 'hp')
-    hp_match = re.match(r"(\d+)\s*\((.*?)\)", hp_text)
+    hp_match = HIT_POINTS_PATTERN.match(hp_text)
     if hp_match:
         defenses['hit_points']['average'] = int(hp_match.group(1))
         defenses['hit_points']['formula'] = hp_match.group(2)
@@ -217,7 +435,7 @@ def parse_defenses(monster_element, monster_data):
     if save_text:
         saves = save_text.split(',')
         for s in saves:
-            s_match = re.match(r"\s*(\w+)\s*([+-]\d+)\s*", s.strip())
+            s_match = SAVING_THROW_PATTERN.match(s.strip())
             if s_match:
                 defenses['saving_throw_proficiencies'].append({
                     "name": s_match.group(1).strip(), # Keep original case for now
@@ -232,7 +450,7 @@ def parse_defenses(monster_element, monster_data):
         for group_text in groups:
             group_text = group_text.strip()
             if not group_text: continue
-            common_note_match = re.search(r"(\bfrom\b .*|\bexcept\b .*|\bwhile\b .*|\bbut not from\b .*|\bonly\b)$", group_text, re.IGNORECASE)
+            common_note_match = DEFENSE_COMMON_NOTE_PATTERN.search(group_text)
             common_note = common_note_match.group(1).strip() if common_note_match else ""
             current_types_text = group_text[:common_note_match.start()].strip() if common_note_match else group_text
 
@@ -242,7 +460,7 @@ def parse_defenses(monster_element, monster_data):
                 type_candidate_text = type_candidate_text.replace("and ", "").strip()
                 if not type_candidate_text: continue
                 parsed_types_in_this_group = True
-                specific_note_match = re.match(r"([\w\s\-\/]+)\s+\((.*?)\)$", type_candidate_text)
+                specific_note_match = DEFENSE_SPECIFIC_NOTE_PATTERN.match(type_candidate_text)
                 final_type_name = type_candidate_text
                 final_note = common_note
                 if specific_note_match:
@@ -267,7 +485,7 @@ def parse_defenses(monster_element, monster_data):
         if raw_skills_text:
             for skill_entry in raw_skills_text.split(','):
                 skill_entry = skill_entry.strip()
-                match = re.match(r"(.+?)\s*([+-]\d+)", skill_entry)
+                match = SKILL_PATTERN.match(skill_entry)
                 if match:
                     skill_name = match.group(1).strip()
                     bonus = match.group(2).strip()
@@ -280,12 +498,12 @@ def parse_speed(monster_element, monster_data):
     general_speed_notes = []
     for part in parts:
         part = part.strip()
-        fly_match = re.match(r"fly\s*(\d+\s*ft\.?)(?:\s*\(hover\))?(?:\s*\((.*?)\))?", part, re.IGNORECASE)
-        swim_match = re.match(r"swim\s*(\d+\s*ft\.?)(?:\s*\((.*?)\))?", part, re.IGNORECASE)
-        burrow_match = re.match(r"burrow\s*(\d+\s*ft\.?)(?:\s*\((.*?)\))?", part, re.IGNORECASE)
-        climb_match = re.match(r"climb\s*(\d+\s*ft\.?)(?:\s*\((.*?)\))?", part, re.IGNORECASE)
+        fly_match = SPEED_FLY_PATTERN.match(part)
+        swim_match = SPEED_SWIM_PATTERN.match(part)
+        burrow_match = SPEED_BURROW_PATTERN.match(part)
+        climb_match = SPEED_CLIMB_PATTERN.match(part)
         # General walk, potentially with a note. Example "30 ft. (40 ft. in tiger form)"
-        walk_match = re.match(r"(\d+\s*ft\.?)(?:\s*\((.*?)\))?", part)
+        walk_match = SPEED_WALK_PATTERN.match(part)
 
         if fly_match:
             speeds['fly']['value'] = fly_match.group(1).strip()
@@ -315,7 +533,7 @@ def parse_senses_languages_cr(monster_element, monster_data):
         parts = senses_text.split(',')
         for part in parts:
             part = part.strip()
-            sense_match = re.match(r"(darkvision|blindsight|tremorsense|truesight)\s*(\d+\s*ft\.?)", part, re.IGNORECASE)
+            sense_match = SENSE_PATTERN.match(part)
             if sense_match:
                 monster_data['senses']['sense_list'].append({
                     "name": sense_match.group(1).capitalize(),
@@ -335,7 +553,7 @@ def parse_senses_languages_cr(monster_element, monster_data):
         for part_content in lang_parts:
             part_content = part_content.strip()
             if not part_content: continue
-            telepathy_full_match = re.search(r"telepathy\s+(\d+\s*(?:ft\.?|feet|mile|miles))(?:\s*\((.*?)\))?", part_content, re.IGNORECASE)
+            telepathy_full_match = TELEPATHY_PATTERN.search(part_content)
             if telepathy_full_match:
                 monster_data['languages']['telepathy']['range'] = telepathy_full_match.group(1).strip()
                 if telepathy_full_match.group(2): additional_notes.append(telepathy_full_match.group(2).strip())
@@ -348,14 +566,14 @@ def parse_senses_languages_cr(monster_element, monster_data):
             for sub_part_raw in sub_parts:
                 sub_part = sub_part_raw.strip()
                 if not sub_part: continue
-                understands_match = re.search(r"understands\s+(.+?)(?:\s+but\s+(?:can't|cannot)\s+speak(?:\s+(?:it|them))?)?(\s*\(.*\))?$", sub_part, re.IGNORECASE)
+                understands_match = UNDERSTANDS_PATTERN.search(sub_part)
                 if understands_match:
                     understood_langs_text = understands_match.group(1).strip()
-                    understood_list = [l.strip() for l in re.split(r'\s+and\s+|\s*,\s*', understood_langs_text) if l.strip()]
+                    understood_list = [l.strip() for l in LANGUAGE_SPLIT_PATTERN.split(understood_langs_text) if l.strip()]
                     monster_data['languages']['understands_but_cant_speak']['list'].extend(understood_list)
                     if understands_match.group(2): current_segment_notes.append(understands_match.group(2)[1:-1].strip())
                 else:
-                    embedded_telepathy_match = re.search(r"telepathy\s+(\d+\s*(?:ft\.?|feet|mile|miles))(?:\s*\((.*?)\))?", sub_part, re.IGNORECASE)
+                    embedded_telepathy_match = TELEPATHY_PATTERN.search(sub_part)
                     if embedded_telepathy_match:
                         if not monster_data['languages']['telepathy']['range']:
                             monster_data['languages']['telepathy']['range'] = embedded_telepathy_match.group(1).strip()
@@ -375,7 +593,7 @@ def parse_senses_languages_cr(monster_element, monster_data):
             note_telepathy_pattern = rf"\btelepathy\s+{telepathy_range_cleaned}(?:\s*\([^)]*\))?\b"
             temp_notes = monster_data['languages']['notes']
             temp_notes = re.sub(note_telepathy_pattern, "", temp_notes, flags=re.IGNORECASE).strip(" ;,()")
-            monster_data['languages']['notes'] = temp_notes if re.search(r"[a-zA-Z0-9]", temp_notes) else ""
+            monster_data['languages']['notes'] = temp_notes if ALPHANUMERIC_PATTERN.search(temp_notes) else ""
 
     cr_text = get_text(monster_element, 'cr')
     monster_data['challenge_rating']['value'] = cr_text
@@ -398,7 +616,7 @@ def parse_description_and_source(monster_element, monster_data):
     if source_tag_element is not None and source_tag_element.text:
         raw_source_text = source_tag_element.text.strip()
         source_info['other_sources'] = raw_source_text # Default assignment
-        source_match = re.match(r"(.*?)(?:,?\s*p(?:g|age)?\.?\s*(\d+))?$", raw_source_text, re.IGNORECASE)
+        source_match = SOURCE_TAG_PATTERN.match(raw_source_text)
         if source_match:
             book_candidate = source_match.group(1).strip()
             page_candidate = source_match.group(2)
@@ -450,9 +668,8 @@ def parse_description_and_source(monster_element, monster_data):
             # Check for source line within this general <description> content
             # Only do this if a dedicated <source> tag wasn't already successfully parsed
             if not source_info['book'] and not source_info['page'] and not source_info['other_sources']:
-                source_pattern = r"Source:\s*(.*?)(?:p\.\s*(\d+))?(?:,\s*(.*))?$"
                 # Try to find source at the very end of the combined text
-                match_source_in_desc = re.search(source_pattern, full_desc_from_general_tag, re.IGNORECASE | re.MULTILINE)
+                match_source_in_desc = DESCRIPTION_SOURCE_PATTERN.search(full_desc_from_general_tag)
 
                 if match_source_in_desc and full_desc_from_general_tag.strip().endswith(match_source_in_desc.group(0).strip()):
                     potential_source_line = match_source_in_desc.group(0).strip()
@@ -613,9 +830,9 @@ def parse_traits(monster_element, monster_data):
         specific_text_content = "\n".join(texts).strip()
 
         recharge_text = "" # Placeholder for recharge if it's ever directly in a simple trait
-        recharge_match = re.search(r"\((Recharge\s*([\d\-\–]+(?:–[\d]+)?(?:-[\d]+)?|[\d\–]+))\)", name, re.IGNORECASE)
+        recharge_match = RECHARGE_PATTERN.search(name)
         if not recharge_match: # Check text if not in name
-            recharge_match = re.search(r"\((Recharge\s*([\d\-\–]+(?:–[\d]+)?(?:-[\d]+)?|[\d\–]+))\)", specific_text_content, re.IGNORECASE)
+            recharge_match = RECHARGE_PATTERN.search(specific_text_content)
 
         if recharge_match:
             recharge_value = recharge_match.group(2).strip()
@@ -632,9 +849,9 @@ def parse_traits(monster_element, monster_data):
             "limited_uses": {"count": 0, "per": ""}
         }
         # Basic limited use parsing (e.g. "3/Day")
-        limited_use_match = re.search(r"\((\d+)/([a-zA-Z]+)\)", name, re.IGNORECASE)
+        limited_use_match = LIMITED_USE_PATTERN.search(name)
         if not limited_use_match:
-             limited_use_match = re.search(r"\((\d+)/([a-zA-Z]+)\)", specific_text_content, re.IGNORECASE)
+             limited_use_match = LIMITED_USE_PATTERN.search(specific_text_content)
 
         if limited_use_match:
             trait_obj["limited_uses"]["count"] = int(limited_use_match.group(1))
@@ -669,14 +886,7 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
     # Ranged Attack Roll: +7, range 80/320 ft. Hit: 8 (1d8 + 4) Piercing damage plus 21 (6d6) Poison damage.
     # Special "attacks" like breaths: Dexterity Saving Throw: DC 18... Failure: 54 (12d8) Acid damage.
 
-    # Regex to find attack roll details
-    attack_roll_pattern = r"(Melee|Ranged)\s*(?:Weapon|Spell)?\s*Attack Roll:\s*([+-]?\d+)\s*(?:to hit)?(?:,\s*reach\s*([\d\s]+ft\.?))?(?:,\s*range\s*([\d\s\/]+ft\.?))?"
-    # Regex to find "Hit:" details
-    hit_pattern = r"Hit:\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?))(?:plus\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?)))?(?:,\s*and\s*(.*?))?\."
-    # Regex for save-based attacks/actions
-    save_pattern = r"(Strength|Dexterity|Constitution|Intelligence|Wisdom|Charisma)\s*Saving Throw:\s*DC\s*(\d+)"
-    failure_pattern = r"Failure:\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?))(?:plus\s*([\d\s\(\)\w\+\-\–\.]+(?:damage)?(?:[\s\w\(\)]*?)))?(?:,\s*and\s*(.*?))?\."
-    success_pattern = r"Success:\s*(Half damage only|Half damage|No damage|.*?)\."
+    # Patterns: ATTACK_ROLL_PATTERN, HIT_PATTERN, ACTION_SAVE_PATTERN, FAILURE_PATTERN and SUCCESS_PATTERN in the registry above
 
 
     main_attack_parsed = False
@@ -693,7 +903,7 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
     }
 
     # Check for attack roll style
-    attack_roll_match = re.search(attack_roll_pattern, full_action_text, re.IGNORECASE)
+    attack_roll_match = ATTACK_ROLL_PATTERN.search(full_action_text)
     if attack_roll_match:
         main_attack_parsed = True
         attack_detail["type"] = attack_roll_match.group(1).lower()
@@ -703,7 +913,7 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
         if attack_roll_match.group(4): # range
             attack_detail["range"] = attack_roll_match.group(4).strip()
 
-        hit_match = re.search(hit_pattern, full_action_text, re.IGNORECASE)
+        hit_match = HIT_PATTERN.search(full_action_text)
         if hit_match:
             primary_damage_text = hit_match.group(1).strip()
             secondary_damage_text = hit_match.group(2).strip() if hit_match.group(2) else ""
@@ -711,7 +921,7 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
 
             # Parse primary damage
             # e.g., "13 (2d6 + 6) Slashing damage" or "7 (1d8 + 3) Bludgeoning damage"
-            damage_match = re.match(r"(?:.*?\(?([ \d\w\+\-\–d]+)\)?\s*)?([\w\s]+(?:damage)?)", primary_damage_text)
+            damage_match = DAMAGE_PATTERN.match(primary_damage_text)
             if damage_match:
                 dmg_dice = damage_match.group(1).strip() if damage_match.group(1) else ""
                 dmg_type = damage_match.group(2).replace("damage","").strip()
@@ -719,7 +929,7 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
 
             # Parse secondary damage if present
             if secondary_damage_text:
-                damage_match_sec = re.match(r"(?:.*?\(?([ \d\w\+\-\–d]+)\)?\s*)?([\w\s]+(?:damage)?)", secondary_damage_text)
+                damage_match_sec = DAMAGE_PATTERN.match(secondary_damage_text)
                 if damage_match_sec:
                     dmg_dice_sec = damage_match_sec.group(1).strip() if damage_match_sec.group(1) else ""
                     dmg_type_sec = damage_match_sec.group(2).replace("damage","").strip()
@@ -729,27 +939,27 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
                 attack_detail["on_hit_effects"].append(other_effects_text)
 
         # Extract target from text before "Hit:"
-        target_text_match = re.search(r"(?:reach|range)\s*[\d\s\w\/\.]+\.?\s*(.*?)(?:Hit:|$)", full_action_text, re.IGNORECASE | re.DOTALL)
+        target_text_match = ATTACK_TARGET_PATTERN.search(full_action_text)
         if target_text_match and target_text_match.group(1).strip():
              attack_detail["target"] = target_text_match.group(1).strip().rstrip(',')
         elif not attack_detail["target"]:
              attack_detail["target"] = "one target" # Default if not specified
 
     # Check for save-based style (often for breaths or special abilities)
-    save_match = re.search(save_pattern, full_action_text, re.IGNORECASE)
+    save_match = ACTION_SAVE_PATTERN.search(full_action_text)
     if save_match:
         main_attack_parsed = True
         attack_detail["type"] = "special" # Or determine more specifically if possible
         attack_detail["save_details"]["ability"] = save_match.group(1).lower()
         attack_detail["save_details"]["dc"] = save_match.group(2)
 
-        failure_match = re.search(failure_pattern, full_action_text, re.IGNORECASE)
+        failure_match = FAILURE_PATTERN.search(full_action_text)
         if failure_match:
             primary_damage_text_fail = failure_match.group(1).strip()
             # secondary_damage_text_fail = failure_match.group(2).strip() if failure_match.group(2) else "" # Not common for saves
             other_effects_text_fail = failure_match.group(3).strip() if failure_match.group(3) else ""
 
-            damage_match_fail = re.match(r"(?:.*?\(?([ \d\w\+\-\–d]+)\)?\s*)?([\w\s]+(?:damage)?)", primary_damage_text_fail)
+            damage_match_fail = DAMAGE_PATTERN.match(primary_damage_text_fail)
             if damage_match_fail:
                 dmg_dice_fail = damage_match_fail.group(1).strip() if damage_match_fail.group(1) else ""
                 dmg_type_fail = damage_match_fail.group(2).replace("damage","").strip()
@@ -760,13 +970,13 @@ def parse_melee_ranged_attacks(action_elem, action_obj):
                  attack_detail["save_details"]["failure_effect"] += f", and {other_effects_text_fail}"
 
 
-        success_match = re.search(success_pattern, full_action_text, re.IGNORECASE)
+        success_match = SUCCESS_PATTERN.search(full_action_text)
         if success_match:
             attack_detail["save_details"]["success_effect"] = success_match.group(1).strip()
 
         # Extract target/area for save-based effects
         # e.g., "each creature in a 60-foot-long, 5-foot-wide Line"
-        target_save_match = re.search(r"DC\s*\d+,\s*(.*?)(?:\.\s*Failure:|$)", full_action_text, re.IGNORECASE | re.DOTALL)
+        target_save_match = SAVE_TARGET_PATTERN.search(full_action_text)
         if target_save_match and target_save_match.group(1).strip():
             attack_detail["target"] = target_save_match.group(1).strip().rstrip('.')
         elif not attack_detail["target"]:
@@ -885,8 +1095,8 @@ def parse_actions_section(monster_element, monster_data, action_type_tag, target
 
         recharge_val_from_tag = get_text(action_elem, 'recharge') # e.g. D5, 1/DAY
 
-        recharge_match_name = re.search(r"\((Recharge\s*([\d\-\–]+(?:–[\d]+)?(?:-[\d]+)?|[\d\–]+))\)", name, re.IGNORECASE)
-        recharge_match_text = re.search(r"\((Recharge\s*([\d\-\–]+(?:–[\d]+)?(?:-[\d]+)?|[\d\–]+))\)", recharge_text_content, re.IGNORECASE)
+        recharge_match_name = RECHARGE_PATTERN.search(name)
+        recharge_match_text = RECHARGE_PATTERN.search(recharge_text_content)
 
         final_recharge_value = ""
         if recharge_val_from_tag:
@@ -910,8 +1120,8 @@ def parse_actions_section(monster_element, monster_data, action_type_tag, target
 
 
         # Parse limited uses (e.g., " (2/Day)")
-        limited_use_match_name = re.search(r"\((\d+)/([a-zA-Z]+)\)", name, re.IGNORECASE)
-        limited_use_match_text = re.search(r"\((\d+)/([a-zA-Z]+)\)", recharge_text_content, re.IGNORECASE) # Check text too
+        limited_use_match_name = LIMITED_USE_PATTERN.search(name)
+        limited_use_match_text = LIMITED_USE_PATTERN.search(recharge_text_content) # Check text too
 
         if recharge_val_from_tag and "/" in recharge_val_from_tag: # Treat "2/DAY" from <recharge> as limited use
             parts = recharge_val_from_tag.split('/')
@@ -951,13 +1161,13 @@ def parse_actions_section(monster_element, monster_data, action_type_tag, target
             # Simple regex, might need refinement
             # "makes X Y attacks" or "uses X and Y"
             # This is very basic, real multiattack descriptions can be complex
-            attack_mentions = re.findall(r"makes (?:one|two|three|four|five|six|\d+)\s+([\w\s]+?)\s+attacks", multi_desc, re.IGNORECASE)
+            attack_mentions = MULTIATTACK_MAKES_PATTERN.findall(multi_desc)
             components.extend(attack_mentions)
-            use_mentions = re.findall(r"uses\s+([\w\s]+?)(?:\s+and\s+([\w\s]+?))?(?:\s+if available|\.)", multi_desc, re.IGNORECASE)
+            use_mentions = MULTIATTACK_USES_PATTERN.findall(multi_desc)
             for um in use_mentions:
                 components.extend(u.strip() for u in um if u.strip())
 
-            replace_mentions = re.findall(r"replace (?:any|one|two)\s+attack(?:s)?\s+with\s+(?:a use of )?([\w\s\(\)]+?)(?:\.|$|,)", multi_desc, re.IGNORECASE)
+            replace_mentions = MULTIATTACK_REPLACE_PATTERN.findall(multi_desc)
             if replace_mentions:
                 components.extend([f"(can replace with) {r.strip()}" for r in replace_mentions])
 
@@ -988,9 +1198,9 @@ def parse_legendary_actions(monster_element, monster_data):
         name_text = get_text(intro_legendary_elem, 'name', "")
         recharge_text = get_text(intro_legendary_elem, 'recharge', "") # e.g., "3/TURN"
 
-        per_turn_match = re.search(r"\((\d+)/Turn\)", name_text, re.IGNORECASE)
+        per_turn_match = LEGENDARY_PER_TURN_PATTERN.search(name_text)
         if not per_turn_match and recharge_text:
-            per_turn_match_recharge = re.match(r"(\d+)/TURN", recharge_text, re.IGNORECASE)
+            per_turn_match_recharge = LEGENDARY_RECHARGE_PATTERN.match(recharge_text)
             if per_turn_match_recharge:
                 legendary_section['per_turn'] = int(per_turn_match_recharge.group(1))
 
@@ -1009,7 +1219,7 @@ def parse_legendary_actions(monster_element, monster_data):
         if "legendary actions" in name.lower() and legendary_elem.find('recharge') is not None : # Heuristic
             if legendary_section['per_turn'] == 0 and legendary_elem.find('recharge') is not None: # Try to get per_turn if not already set
                 recharge_text_val = get_text(legendary_elem, 'recharge', "")
-                per_turn_match_recharge = re.match(r"(\d+)/TURN", recharge_text_val, re.IGNORECASE)
+                per_turn_match_recharge = LEGENDARY_RECHARGE_PATTERN.match(recharge_text_val)
                 if per_turn_match_recharge:
                     legendary_section['per_turn'] = int(per_turn_match_recharge.group(1))
             continue
@@ -1026,7 +1236,7 @@ def parse_legendary_actions(monster_element, monster_data):
         }
 
         # Try to parse cost from name, e.g. "Wing Attack (Costs 2 Actions)"
-        cost_match = re.search(r"\(Costs\s*(\d+)\s*Actions?\)", name, re.IGNORECASE)
+        cost_match = LEGENDARY_COST_PATTERN.search(name)
         if cost_match:
             action_obj['cost'] = int(cost_match.group(1))
             name = name.replace(cost_match.group(0), "").strip() # Clean name
@@ -1134,15 +1344,12 @@ def parse_lair_actions_and_regional_effects(monster_element, monster_data):
             # "The region containing an X's lair is warped by it, creating the following effects:"
             # "On initiative count 20 (losing initiative ties), the X takes a lair action to cause one of the following effects:"
 
-            lair_action_intro_keyword = "takes a lair action to cause one of the following"
-            regional_effect_intro_keyword = "region containing .*? lair is warped .*? creating the following effects:"
-
             lair_actions_text_block = ""
             regional_effects_text_block = ""
 
             # Try to find a split point
-            lair_match = re.search(lair_action_intro_keyword, full_text_content, re.IGNORECASE)
-            regional_match = re.search(regional_effect_intro_keyword, full_text_content, re.IGNORECASE)
+            lair_match = LAIR_ACTION_INTRO_PATTERN.search(full_text_content)
+            regional_match = REGIONAL_EFFECT_INTRO_PATTERN.search(full_text_content)
 
             if lair_match and regional_match:
                 if lair_match.start() < regional_match.start():
@@ -1188,12 +1395,12 @@ def parse_lair_actions_and_regional_effects(monster_element, monster_data):
                     current_effect_desc_parts = []
 
                     # Find the "creating the following effects:" part
-                    intro_re_match = re.search(r"(creating the following effects:)", full_text_content, re.IGNORECASE)
+                    intro_re_match = REGIONAL_EFFECTS_LEAD_PATTERN.search(full_text_content)
                     if intro_re_match:
                         text_after_intro = full_text_content[intro_re_match.end():].strip()
 
                         # Attempt to remove the "If the dragon dies..." tail part
-                        tail_re_match = re.search(r"(If the (?:dragon|hag|creature) (?:dies|is destroyed|moves its lair elsewhere), these effects end .*?\.)$", text_after_intro, re.IGNORECASE | re.DOTALL)
+                        tail_re_match = REGIONAL_EFFECTS_TAIL_PATTERN.search(text_after_intro)
                         if tail_re_match:
                             text_after_intro = text_after_intro[:tail_re_match.start()].strip()
 
@@ -1201,7 +1408,7 @@ def parse_lair_actions_and_regional_effects(monster_element, monster_data):
                         paragraphs = [p.strip() for p in text_after_intro.split('\n') if p.strip()]
                         for para_idx, para in enumerate(paragraphs):
                             # Check if para starts with something like "Effect Name:"
-                            name_match = re.match(r"([\w\s\-\'\u2019]+?):\s*(.*)", para) # Name: Description
+                            name_match = REGIONAL_EFFECT_NAME_PATTERN.match(para) # Name: Description
                             if name_match:
                                 if current_effect_name and current_effect_desc_parts: # Save previous
                                     regional_effects_list.append({
@@ -1237,12 +1444,12 @@ def parse_lair_actions_and_regional_effects(monster_element, monster_data):
             if lair_actions_text_block:
                 # Lair actions are often listed with bullet points or distinct paragraphs.
                 # "• Effect 1.\n• Effect 2."
-                action_descs = re.split(r'\n\s*•\s*|\n\n', lair_actions_text_block) # Split by bullets or double newlines
+                action_descs = LAIR_ACTION_SPLIT_PATTERN.split(lair_actions_text_block) # Split by bullets or double newlines
                 for i, desc_part in enumerate(action_descs):
                     desc_part = desc_part.strip("• ")
                     if desc_part:
                         # Try to find a name within the desc part, e.g. if it's "Grasping Roots. The ..."
-                        name_match = re.match(r"([\w\s\-\'\u2019]+)\.\s*(.*)", desc_part)
+                        name_match = LAIR_ACTION_NAME_PATTERN.match(desc_part)
                         action_name = f"Lair Action Option {i+1}"
                         action_text = desc_part
                         if name_match:
@@ -1266,6 +1473,25 @@ def parse_lair_actions_and_regional_effects(monster_element, monster_data):
             #             regional_effects_list.append({"name": effect_name, "text_description": effect_text})
 
 
+def split_spell_list(spells_str, strip_chars=" .,;"):
+    """
+    Splits a comma-separated spell list, ignoring commas inside parentheses, so
+    "Shapechange (Beast or Humanoid form only, no Temporary Hit Points...)" stays one entry.
+    """
+    names, current, depth = [], [], 0
+    for char in spells_str:
+        if char == ',' and depth == 0:
+            names.append("".join(current))
+            current = []
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')' and depth:
+            depth -= 1
+        current.append(char)
+    names.append("".join(current))
+    return [name.strip(strip_chars) for name in names if name.strip()]
+
 def parse_spellcasting(monster_element, monster_data):
     spell_section = monster_data['spellcasting']
 
@@ -1299,8 +1525,9 @@ def parse_spellcasting(monster_element, monster_data):
     # Option 2: Spellcasting described within an <action> block
     # <action><name>Spellcasting</name><text>The dragon casts... (spell save DC 17, +9 to hit...): At will: ... 1/Day each: ...</text></action>
     spellcasting_action_elem = monster_element.find("action[name='Spellcasting']")
-    if spellcasting_action_elem is None: # Try case-insensitive just in case
-        spellcasting_action_elem = monster_element.find("action[name[translate(text(), 'SPELLCASTING', 'spellcasting')='spellcasting']]")
+    if spellcasting_action_elem is None: # Try case-insensitive just in case (ElementPath has no translate())
+        spellcasting_action_elem = next((action_elem for action_elem in monster_element.findall('action')
+                                         if get_text(action_elem, 'name').lower() == 'spellcasting'), None)
 
     if spellcasting_action_elem is not None:
         text_elem = spellcasting_action_elem.find('text')
@@ -1317,42 +1544,42 @@ def parse_spellcasting(monster_element, monster_data):
             spell_section['type'] = "innate" # Default
 
         # Spellcasting ability
-        ability_match = re.search(r"using\s+(Wisdom|Intelligence|Charisma|Con|Str|Dex)\s+as\s+the\s+spellcasting\s+ability", full_text, re.IGNORECASE)
+        ability_match = SPELLCASTING_ABILITY_PATTERN.search(full_text)
         if ability_match:
             spell_section['ability'] = ability_match.group(1).capitalize()
 
         # Save DC and Attack Bonus
-        dc_match = re.search(r"spell\s+save\s+DC\s*(\d+)", full_text, re.IGNORECASE)
+        dc_match = SPELL_SAVE_DC_PATTERN.search(full_text)
         if dc_match:
             spell_section['spell_save_dc'] = dc_match.group(1)
 
-        attack_bonus_match = re.search(r"([+-]\d+)\s+to\s+hit\s+with\s+spell\s+attacks", full_text, re.IGNORECASE)
+        attack_bonus_match = SPELL_ATTACK_BONUS_PATTERN.search(full_text)
         if attack_bonus_match:
             spell_section['attack_bonus'] = attack_bonus_match.group(1)
 
         # At will spells
-        at_will_match = re.search(r"At\s+will:\s*(.*?)(?:\n|\d+/Day|•|$)", full_text, re.IGNORECASE | re.DOTALL)
+        at_will_match = AT_WILL_PATTERN.search(full_text)
         if at_will_match:
             spells_str = at_will_match.group(1).strip("• ")
-            spell_names = [s.strip(" .,;") for s in spells_str.split(',') if s.strip()]
+            spell_names = split_spell_list(spells_str)
             for sn in spell_names:
                 spell_detail = {"name": sn.replace(" (level 3 version)", "").strip(), "level": "", "school": "", "notes": ""} # Basic extraction
                 if "(level" in sn:
-                    lvl_match = re.search(r"\(level\s*(\d+)\s*version\)", sn, re.IGNORECASE)
+                    lvl_match = SPELL_LEVEL_VERSION_PATTERN.search(sn)
                     if lvl_match: spell_detail["notes"] = f"cast at level {lvl_match.group(1)}"
                 spell_section['at_will'].append(spell_detail)
 
         # Per day spells (e.g., "1/Day each: ...", "2/Day: ...")
-        per_day_matches = re.findall(r"(\d+)/Day\s*(?:each)?:\s*(.*?)(?:\n|\d+/Day|•|$)", full_text, re.IGNORECASE | re.DOTALL)
+        per_day_matches = PER_DAY_PATTERN.findall(full_text)
         for match in per_day_matches:
             count = match[0]
             spells_str = match[1].strip("• ")
-            spell_names = [s.strip(" .,;") for s in spells_str.split(',') if s.strip()]
+            spell_names = split_spell_list(spells_str)
             current_per_day_spells = []
             for sn in spell_names:
                 spell_detail = {"name": sn.replace(" (level 5 version)", "").strip(), "level": "", "school": "", "notes": ""}
                 if "(level" in sn:
-                    lvl_match = re.search(r"\(level\s*(\d+)\s*version\)", sn, re.IGNORECASE)
+                    lvl_match = SPELL_LEVEL_VERSION_PATTERN.search(sn)
                     if lvl_match: spell_detail["notes"] = f"cast at level {lvl_match.group(1)}"
                 current_per_day_spells.append(spell_detail)
             if current_per_day_spells:
@@ -1360,12 +1587,12 @@ def parse_spellcasting(monster_element, monster_data):
 
         # Spell Slots (e.g. "1st level (4 slots): shield, magic missile") - This is more complex
         # This regex is a basic attempt and might need significant refinement for complex slot descriptions
-        slot_matches = re.findall(r"(\d+)(?:st|nd|rd|th)\s+level\s*\((\d+)\s+slots?\):\s*(.*?)(?:\n|Cantrips|\d+(?:st|nd|rd|th)\s+level|$)", full_text, re.IGNORECASE | re.DOTALL)
+        slot_matches = SPELL_SLOTS_PATTERN.findall(full_text)
         for match in slot_matches:
             level = match[0]
             num_slots = match[1]
             spells_str = match[2].strip("• ")
-            spell_names = [s.strip(" .,;") for s in spells_str.split(',') if s.strip()] # These are usually known/prepared for that level
+            spell_names = split_spell_list(spells_str) # These are usually known/prepared for that level
 
             spell_section['spell_slots'].append({"level": level, "count": num_slots})
             for sn in spell_names:
@@ -1389,7 +1616,7 @@ def parse_spellcasting(monster_element, monster_data):
             if spells_tag_text:
                 # This is usually a flat list, hard to categorize without more context
                 # For now, put them all in 'known_spells' as a default if type is ambiguous
-                spell_names_flat = [s.strip() for s in spells_tag_text.split(',') if s.strip()]
+                spell_names_flat = split_spell_list(spells_tag_text, strip_chars=None)
                 for sn in spell_names_flat:
                     if not any(s['name'] == sn for s in spell_section['known_spells']): # Avoid duplicates if some were parsed
                         spell_section['known_spells'].append({"name": sn, "level": "", "school": "", "notes": ""})
@@ -1418,6 +1645,165 @@ def parse_equipment(monster_element, monster_data):
                     equipment_list.append(item)
 
 
+def parse_proficiency_bonus(monster_element, monster_data):
+    # Proficiency Bonus (example, might need refinement based on actual XML structure for this)
+    for trait_element in monster_element.findall('trait'): # Assuming PB might be in a trait
+        name_tag = trait_element.find('name')
+        text_tag = trait_element.find('text')
+        if name_tag is not None and name_tag.text and "Proficiency Bonus" in name_tag.text:
+            if text_tag is not None and text_tag.text:
+                # Extract numeric part if "equals your Proficiency Bonus" or similar
+                pb_match = PROFICIENCY_BONUS_PATTERN.search(text_tag.text.strip())
+                if "equals your proficiency bonus" in text_tag.text.strip().lower():
+                     monster_data['proficiency_bonus']['value'] = "equals your Proficiency Bonus"
+                elif pb_match:
+                     monster_data['proficiency_bonus']['value'] = pb_match.group(1)
+                else:
+                     monster_data['proficiency_bonus']['value'] = text_tag.text.strip()
+                break
+    if not monster_data['proficiency_bonus']['value'] and monster_data['challenge_rating']['value']:
+        # Fallback: Derive PB from CR if not explicitly found
+        # This is a simplified mapping. Official tables are more granular.
+        try:
+            cr_val_str = monster_data['challenge_rating']['value']
+            cr_val = 0
+            if '/' in cr_val_str: # Fractional CR
+                num, den = map(int, cr_val_str.split('/'))
+                cr_val = num / den
+            else:
+                cr_val = int(cr_val_str)
+
+            if cr_val < 1: pb_val = "+2"
+            elif cr_val < 5: pb_val = "+2"
+            elif cr_val < 9: pb_val = "+3"
+            elif cr_val < 13: pb_val = "+4"
+            elif cr_val < 17: pb_val = "+5"
+            elif cr_val < 21: pb_val = "+6"
+            elif cr_val < 25: pb_val = "+7"
+            elif cr_val < 29: pb_val = "+8"
+            else: pb_val = "+9"
+            monster_data['proficiency_bonus']['value'] = pb_val
+        except ValueError:
+            pass # Could not parse CR to int/float
+
+# Section parsers run for every monster, in this order.
+MONSTER_SECTION_PARSERS = (
+    parse_core_details,
+    parse_statistics,
+    parse_defenses, # Also handles skill proficiencies
+    parse_speed,
+    parse_senses_languages_cr,
+    # Description and Source are parsed together
+    parse_description_and_source,
+    # Flavor text is parsed separately
+    parse_flavor_text,
+    parse_proficiency_bonus, # Needs the challenge rating parsed above
+    parse_spellcasting, # Spell names only; spell_resolver fills their level and school
+)
+
+class SectionProfiler:
+    """
+    Opt-in timing of the per-monster section parsers. Records, for each section, the call
+    count, cumulative time and the slowest N monsters. Disabled by default, in which case
+    parse_monster calls the sections directly and pays nothing for it.
+    """
+
+    def __init__(self, top_n=5):
+        self.enabled = False
+        self.top_n = top_n
+        self.reset_stats()
+
+    def enable_stats(self, enabled=True, top_n=None):
+        self.enabled = enabled
+        if top_n is not None:
+            self.top_n = top_n
+
+    def reset_stats(self):
+        self.calls = {}
+        self.seconds = {}
+        self.slowest = {} # section -> min-heap of (seconds, monster name, source file)
+
+    def run_sections(self, section_parsers, monster_element, monster_data):
+        for section_parser in section_parsers:
+            start = perf_counter()
+            section_parser(monster_element, monster_data)
+            self.record(section_parser.__name__, perf_counter() - start, monster_data['name'], monster_data['source_file'])
+
+    def record(self, section, seconds, monster_name, source_file):
+        self.calls[section] = self.calls.get(section, 0) + 1
+        self.seconds[section] = self.seconds.get(section, 0.0) + seconds
+        heap = self.slowest.setdefault(section, [])
+        entry = (seconds, monster_name, source_file)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def snapshot(self):
+        """Plain-data copy of the stats so they can travel back from worker processes."""
+        return {"calls": dict(self.calls), "seconds": dict(self.seconds),
+                "slowest": {section: list(heap) for section, heap in self.slowest.items()}}
+
+    def merge(self, snapshot):
+        for section, calls in snapshot["calls"].items():
+            self.calls[section] = self.calls.get(section, 0) + calls
+            self.seconds[section] = self.seconds.get(section, 0.0) + snapshot["seconds"][section]
+        for section, entries in snapshot["slowest"].items():
+            for seconds, monster_name, source_file in entries:
+                heap = self.slowest.setdefault(section, [])
+                entry = (seconds, monster_name, source_file)
+                if len(heap) < self.top_n:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+    def stats(self):
+        """Per-section stats, most expensive first."""
+        rows = []
+        for section, calls in self.calls.items():
+            rows.append({
+                "section": section,
+                "calls": calls,
+                "seconds": self.seconds[section],
+                "slowest": [{"monster": name, "source_file": source_file, "seconds": seconds}
+                            for seconds, name, source_file in sorted(self.slowest.get(section, []), reverse=True)],
+            })
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def format_stats(self):
+        rows = self.stats()
+        if not rows:
+            return "No section timings recorded."
+        total_seconds = sum(row["seconds"] for row in rows) or 1.0
+        name_width = max(len("section"), max(len(row["section"]) for row in rows))
+        lines = [f"{'section':<{name_width}}  {'calls':>7}  {'total ms':>10}  {'share':>6}  {'us/call':>8}  slowest"]
+        for row in rows:
+            per_call_us = row["seconds"] * 1e6 / row["calls"]
+            slowest = ", ".join(f"{entry['monster']} ({entry['seconds'] * 1e6:.0f} us)" for entry in row["slowest"])
+            lines.append(f"{row['section']:<{name_width}}  {row['calls']:>7}  {row['seconds'] * 1000:>10.2f}  "
+                         f"{row['seconds'] / total_seconds:>6.1%}  {per_call_us:>8.1f}  {slowest}")
+        return "\n".join(lines)
+
+
+SECTION_STATS = SectionProfiler()
+
+def parse_monster(monster_element, filepath):
+    """Builds the glossary-aligned dict for a single, fully parsed <monster> element."""
+    monster_data = initialize_monster_data(monster_element, filepath)
+
+    if SECTION_STATS.enabled:
+        SECTION_STATS.run_sections(MONSTER_SECTION_PARSERS, monster_element, monster_data)
+    else:
+        for section_parser in MONSTER_SECTION_PARSERS:
+            section_parser(monster_element, monster_data)
+
+    # TODO: Implement detailed parsing for:
+    # parse_traits(monster_element, monster_data)
+    # parse_actions(monster_element, monster_data) # Needs to be updated for new structure
+    # Bonus Actions, Reactions, Legendary Actions, Mythic Actions, Lair Actions, Spellcasting, Equipment
+
+    return monster_data
+
 def parse_xml_file(filepath):
     try:
         tree = ET.parse(filepath)
@@ -1431,68 +1817,45 @@ def parse_xml_file(filepath):
 
     parsed_monsters = []
     for monster_element in root.findall('monster'):
-        monster_data = initialize_monster_data(monster_element, filepath)
-
-        parse_core_details(monster_element, monster_data)
-        parse_statistics(monster_element, monster_data)
-        parse_defenses(monster_element, monster_data) # Also handles skill proficiencies
-        parse_speed(monster_element, monster_data)
-        parse_senses_languages_cr(monster_element, monster_data)
-
-        # Description and Source are parsed together
-        parse_description_and_source(monster_element, monster_data)
-        # Flavor text is parsed separately
-        parse_flavor_text(monster_element, monster_data)
-
-        # Proficiency Bonus (example, might need refinement based on actual XML structure for this)
-        for trait_element in monster_element.findall('trait'): # Assuming PB might be in a trait
-            name_tag = trait_element.find('name')
-            text_tag = trait_element.find('text')
-            if name_tag is not None and name_tag.text and "Proficiency Bonus" in name_tag.text:
-                if text_tag is not None and text_tag.text:
-                    # Extract numeric part if "equals your Proficiency Bonus" or similar
-                    pb_match = re.search(r"([+-]?\d+)", text_tag.text.strip())
-                    if "equals your proficiency bonus" in text_tag.text.strip().lower():
-                         monster_data['proficiency_bonus']['value'] = "equals your Proficiency Bonus"
-                    elif pb_match:
-                         monster_data['proficiency_bonus']['value'] = pb_match.group(1)
-                    else:
-                         monster_data['proficiency_bonus']['value'] = text_tag.text.strip()
-                    break
-        if not monster_data['proficiency_bonus']['value'] and monster_data['challenge_rating']['value']:
-            # Fallback: Derive PB from CR if not explicitly found
-            # This is a simplified mapping. Official tables are more granular.
-            try:
-                cr_val_str = monster_data['challenge_rating']['value']
-                cr_val = 0
-                if '/' in cr_val_str: # Fractional CR
-                    num, den = map(int, cr_val_str.split('/'))
-                    cr_val = num / den
-                else:
-                    cr_val = int(cr_val_str)
-
-                if cr_val < 1: pb_val = "+2"
-                elif cr_val < 5: pb_val = "+2"
-                elif cr_val < 9: pb_val = "+3"
-                elif cr_val < 13: pb_val = "+4"
-                elif cr_val < 17: pb_val = "+5"
-                elif cr_val < 21: pb_val = "+6"
-                elif cr_val < 25: pb_val = "+7"
-                elif cr_val < 29: pb_val = "+8"
-                else: pb_val = "+9"
-                monster_data['proficiency_bonus']['value'] = pb_val
-            except ValueError:
-                pass # Could not parse CR to int/float
-
-
-        # TODO: Implement detailed parsing for:
-        # parse_traits(monster_element, monster_data)
-        # parse_actions(monster_element, monster_data) # Needs to be updated for new structure
-        # Bonus Actions, Reactions, Legendary Actions, Mythic Actions, Lair Actions, Spellcasting, Equipment
-
-        parsed_monsters.append(monster_data)
+        parsed_monsters.append(parse_monster(monster_element, filepath))
     return parsed_monsters
 
+def iter_xml_file(filepath):
+    """
+    Streaming counterpart of parse_xml_file: yields one finished monster dict at a time.
+
+    Built on ET.iterparse, so only the <monster> currently being parsed is kept in memory.
+    Each element is cleared and detached from the root once its dict has been yielded,
+    which keeps peak memory flat regardless of how many monsters the shard holds.
+    Only <monster> elements that are direct children of the root are parsed, matching
+    root.findall('monster') in parse_xml_file. A malformed or missing file is reported and the
+    ET.ParseError / FileNotFoundError re-raised, even after some monsters were yielded, so a
+    truncated shard is never mistaken for a short one.
+    """
+    root = None
+    depth = 0
+    try:
+        for event, elem in ET.iterparse(filepath, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1:
+                if elem.tag == 'monster':
+                    yield parse_monster(elem, filepath)
+                # Drop the finished element so the root never accumulates children
+                elem.clear()
+                root.remove(elem)
+    except ET.ParseError as e:
+        print(f"Error parsing XML file {filepath}: {e}")
+        raise
+    except FileNotFoundError:
+        print(f"Error: File not found {filepath}")
+        raise
+
 # --- Formula and Text Parsing Functions (Keep as is for now, or integrate if necessary) ---
 # standardize_formula, parse_ac_formula, parse_hp_formula,
 # parse_attack_bonus_formula_from_text, parse_damage_formula_from_text,
@@ -1514,35 +1877,327 @@ def parse_actions(monster_element, monster_data):
 
 # ... (other placeholder functions for traits, spellcasting etc. can be added here) ...
 
-import glob
+DEFAULT_CACHE_DIR = ".bestiary_cache"
+
+def _parser_fingerprint():
+    """Hash of this module's source, so editing the parser invalidates every cached shard."""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def shard_cache_key(xml_file, parser_fingerprint):
+    """Content hash of a shard (plus the parser version), or None if the file can't be read."""
+    try:
+        with open(xml_file, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+    digest = hashlib.sha256(parser_fingerprint.encode('ascii'))
+    digest.update(content)
+    return digest.hexdigest()
+
+def _shard_cache_path(cache_dir, xml_file):
+    # One entry per source path; it is overwritten whenever the shard's content changes.
+    path_digest = hashlib.sha256(os.path.normpath(xml_file).encode('utf-8')).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{path_digest}.pickle")
+
+def load_cached_shard(cache_dir, xml_file, cache_key):
+    """Returns the cached monster list for xml_file if it was built from the same content, else None."""
+    cache_path = _shard_cache_path(cache_dir, xml_file)
+    try:
+        with open(cache_path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if entry.get("key") != cache_key or entry.get("source_file") != xml_file:
+        return None
+    return entry["monsters"]
+
+def store_cached_shard(cache_dir, xml_file, cache_key, monsters):
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = _shard_cache_path(cache_dir, xml_file)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump({"key": cache_key, "source_file": xml_file, "monsters": monsters}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+
+def parse_shard(xml_file):
+    """Parses one bestiary shard into a list of monster dicts. Top-level so worker processes can pickle it."""
+    return list(iter_xml_file(xml_file))
+
+def parse_shard_with_stats(xml_file, regex_stats, section_stats_top_n):
+    """
+    Worker variant of parse_shard that also returns the regex and/or section stats recorded
+    while parsing this shard (None for whichever is not being collected).
+    """
+    PATTERNS.enable_stats(regex_stats)
+    PATTERNS.reset_stats()
+    SECTION_STATS.enable_stats(section_stats_top_n is not None, top_n=section_stats_top_n)
+    SECTION_STATS.reset_stats()
+    monsters = parse_shard(xml_file)
+    return (monsters,
+            PATTERNS.snapshot() if regex_stats else None,
+            SECTION_STATS.snapshot() if section_stats_top_n is not None else None)
+
+def _shard_size(xml_file):
+    try:
+        return os.path.getsize(xml_file)
+    except OSError:
+        return 0
 
-def main():
-    xml_files = [
-        "01_Core/01_Players_Handbook_2024/bestiary-phb24.xml",
-    ]
-    mm24_path_pattern = "01_Core/03_Monster_Manual_2024/bestiary_mm24_*.xml"
-    mm24_files = glob.glob(mm24_path_pattern)
-    if mm24_files:
-        xml_files.extend(sorted(mm24_files))
-        print(f"Found MM24 bestiary files: {mm24_files}")
+def parse_shards(xml_files, jobs=1, cache_dir=None, errors=None):
+    """
+    Parses every shard and returns [(xml_file, monsters), ...] in the order of xml_files.
+    A shard that fails to parse raises its ET.ParseError / FileNotFoundError, unless errors is
+    a dict: then the error is stored in errors[xml_file], the shard gets an empty list and the
+    other shards are still parsed.
+
+    With a cache_dir, shards whose content hash matches a cached entry are loaded from the
+    cache and only the changed (or new) shards are parsed; their results are then cached.
+    Shards that raised a parse error (even after yielding monsters) or yield no monsters are
+    never cached, so a broken file is re-parsed, and reported, on every run until it is fixed.
+
+    With jobs > 1 each shard is handed to a ProcessPoolExecutor worker. Shards are submitted
+    largest first so the big ones (e.g. bestiary_mm24_a.xml) don't end up running alone at the
+    tail, but results are always merged back in the original order, so the output matches a
+    serial run exactly. If regex or section stats are enabled, the workers' stats are merged
+    into PATTERNS / SECTION_STATS. Shards loaded from the cache are not re-parsed, so they
+    contribute no stats.
+    """
+    parsed = {}
+    cache_keys = {}
+    if cache_dir:
+        fingerprint = _parser_fingerprint()
+        for xml_file in xml_files:
+            cache_keys[xml_file] = shard_cache_key(xml_file, fingerprint)
+            if cache_keys[xml_file] is None:
+                continue
+            cached = load_cached_shard(cache_dir, xml_file, cache_keys[xml_file])
+            if cached is not None:
+                parsed[xml_file] = cached
+        if parsed:
+            print(f"Build cache: reusing {len(parsed)} of {len(xml_files)} shards from {cache_dir}")
+
+    pending = [xml_file for xml_file in xml_files if xml_file not in parsed]
+    parsed.update(_parse_pending_shards(pending, jobs, errors))
+
+    if cache_dir:
+        for xml_file in pending:
+            if parsed[xml_file] and cache_keys[xml_file] is not None and xml_file not in (errors or {}):
+                store_cached_shard(cache_dir, xml_file, cache_keys[xml_file], parsed[xml_file])
+
+    return [(xml_file, parsed[xml_file]) for xml_file in xml_files]
+
+def _shard_result(xml_file, parse, errors):
+    try:
+        return parse()
+    except (ET.ParseError, FileNotFoundError) as e:
+        if errors is None:
+            raise
+        errors[xml_file] = e
+        return []
+
+def _parse_pending_shards(xml_files, jobs, errors=None):
+    if jobs <= 1 or len(xml_files) <= 1:
+        return {xml_file: _shard_result(xml_file, lambda xml_file=xml_file: parse_shard(xml_file), errors)
+                for xml_file in xml_files}
+
+    collect_regex_stats = PATTERNS.tracking
+    section_stats_top_n = SECTION_STATS.top_n if SECTION_STATS.enabled else None
+    collect_stats = collect_regex_stats or section_stats_top_n is not None
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for xml_file in sorted(xml_files, key=_shard_size, reverse=True):
+            if collect_stats:
+                futures[xml_file] = executor.submit(parse_shard_with_stats, xml_file, collect_regex_stats, section_stats_top_n)
+            else:
+                futures[xml_file] = executor.submit(parse_shard, xml_file)
+
+        results = {}
+        for xml_file in xml_files:
+            result = _shard_result(xml_file, futures[xml_file].result, errors)
+            if collect_stats and xml_file not in (errors or {}):
+                result, regex_stats, section_stats = result
+                if regex_stats:
+                    PATTERNS.merge(regex_stats)
+                if section_stats:
+                    SECTION_STATS.merge(section_stats)
+            results[xml_file] = result
+        return results
+
+def iter_shard_monsters(xml_files, jobs=1, cache_dir=None, errors=None):
+    """
+    Yields (xml_file, monsters) per shard, in order. For a plain serial run `monsters` is the
+    lazy iter_xml_file generator, so each monster can be written out as soon as it is parsed
+    (and a parse error surfaces while iterating it); with --jobs or a build cache it is the
+    shard's finished list and failures go to errors as in parse_shards.
+    """
+    if jobs <= 1 and not cache_dir:
+        for xml_file in xml_files:
+            yield xml_file, iter_xml_file(xml_file)
     else:
-        print(f"Warning: No MM24 bestiary files found matching pattern {mm24_path_pattern}.")
-
-    all_monsters_data = []
-    for xml_file in xml_files:
-        print(f"Parsing {xml_file}...")
-        monsters_in_file = parse_xml_file(xml_file)
-        if monsters_in_file:
-            all_monsters_data.extend(monsters_in_file)
-            print(f"Successfully parsed {len(monsters_in_file)} monsters from {xml_file}.")
+        yield from parse_shards(xml_files, jobs=jobs, cache_dir=cache_dir, errors=errors)
+
+class StructuredBestiaryWriter:
+    """
+    Streams monster dicts to an open text file, one at a time.
+
+    "json" writes a single array, either indented exactly like json.dump(..., indent=indent)
+    (4 by default) or compact (no whitespace). "jsonl" writes one compact JSON object per line
+    (JSON Lines), which iter_bestiary_jsonl can read back without loading the whole file.
+    """
+    FORMATS = ("json", "jsonl")
+
+    def __init__(self, f, output_format="json", compact=False, indent=4):
+        if output_format not in self.FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}'")
+        self.f = f
+        self.output_format = output_format
+        self.compact = compact
+        self.indent = indent
+        self.count = 0
+
+    def encode(self, monster):
+        """One monster as this writer writes it (without the surrounding separators)."""
+        if self.output_format == "jsonl" or self.compact:
+            return json.dumps(monster, ensure_ascii=False, separators=(",", ":"))
+        # JSON strings never contain raw newlines, so re-indenting line by line is safe
+        return json.dumps(monster, indent=self.indent, ensure_ascii=False).replace("\n", "\n" + " " * self.indent)
+
+    def write(self, monster):
+        self.write_encoded(self.encode(monster))
+
+    def write_encoded(self, encoded_monster):
+        """Writes a monster already in this writer's encoding, e.g. copied verbatim from an existing file."""
+        if self.output_format == "jsonl":
+            self.f.write(encoded_monster)
+            self.f.write("\n")
+        elif self.compact:
+            self.f.write("[" if self.count == 0 else ",")
+            self.f.write(encoded_monster)
         else:
-            print(f"No monsters found or error in parsing {xml_file}.")
+            self.f.write(("[\n" if self.count == 0 else ",\n") + " " * self.indent)
+            self.f.write(encoded_monster)
+        self.count += 1
+
+    def close(self):
+        if self.output_format == "json":
+            if self.count == 0:
+                self.f.write("[]")
+            else:
+                self.f.write("]" if self.compact else "\n]")
 
-    output_filename = "bestiario_estructurado.json"
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        json.dump(all_monsters_data, f, indent=4, ensure_ascii=False)
+def iter_bestiary_jsonl(filepath):
+    """Generator over a JSON Lines bestiary written by StructuredBestiaryWriter; yields one monster dict at a time."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Error decoding JSON on line {line_number} of {filepath}: {e}")
+                    return
+    except FileNotFoundError:
+        print(f"Error: File not found {filepath}")
 
-    print(f"Processing complete. Parsed {len(all_monsters_data)} monsters into {output_filename}.")
+# PHB creatures plus the Monster Manual letter shards written by split_bestiary
+DEFAULT_BESTIARY_FILES = ["01_Core/bestiaries/bestiary-phb24.xml", "01_Core/bestiaries/bestiary_mm24_*.xml"]
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Parses the bestiary XML shards into bestiario_estructurado.json.")
+    arg_parser.add_argument("inputs", nargs="*", default=DEFAULT_BESTIARY_FILES,
+                            help=f"Bestiary XML files, globs allowed (default: {' '.join(DEFAULT_BESTIARY_FILES)}).")
+    arg_parser.add_argument("--jobs", type=int, default=1,
+                            help="Number of worker processes used to parse shards in parallel (default: 1, serial).")
+    arg_parser.add_argument("--regex-stats", action="store_true",
+                            help="Record per-pattern call counts, hits and time, and print them at the end.")
+    arg_parser.add_argument("--section-stats", action="store_true",
+                            help="Time each per-monster section parser and print a table at the end.")
+    arg_parser.add_argument("--section-stats-top", type=int, default=5,
+                            help="Number of slowest monsters kept per section (default: 5).")
+    arg_parser.add_argument("--section-stats-output", default="bestiary_section_stats.json",
+                            help="Where --section-stats also writes its results as JSON (default: bestiary_section_stats.json).")
+    arg_parser.add_argument("--cache", action="store_true",
+                            help=f"Reuse parsed shards whose content hash is unchanged (cache in {DEFAULT_CACHE_DIR}/).")
+    arg_parser.add_argument("--cache-dir", default=None,
+                            help="Build cache directory; implies --cache.")
+    arg_parser.add_argument("--format", choices=StructuredBestiaryWriter.FORMATS, default="json",
+                            help="json: a single array (default). jsonl: one monster per line, written as soon as it is parsed.")
+    arg_parser.add_argument("--compact", action="store_true",
+                            help="Write the JSON array without indentation (JSON Lines output is always compact).")
+    arg_parser.add_argument("--output", default=None,
+                            help="Output file (default: bestiario_estructurado.json, or .jsonl for --format jsonl).")
+    args = arg_parser.parse_args(argv)
+    cache_dir = args.cache_dir or (DEFAULT_CACHE_DIR if args.cache else None)
+
+    if args.regex_stats:
+        PATTERNS.enable_stats()
+    if args.section_stats:
+        SECTION_STATS.enable_stats(top_n=args.section_stats_top)
+
+    xml_files = []
+    for pattern in args.inputs:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            print(f"Error: No bestiary files found matching {pattern}")
+            sys.exit(1)
+        xml_files.extend(matches)
+    print(f"Found {len(xml_files)} bestiary files: {xml_files}")
+
+    if args.jobs > 1:
+        print(f"Parsing {len(xml_files)} files with {args.jobs} worker processes...")
+
+    output_filename = args.output or ("bestiario_estructurado.jsonl" if args.format == "jsonl" else "bestiario_estructurado.json")
+    # Written next to the output and renamed into place only if every shard parsed cleanly and
+    # produced monsters, so a failed run never replaces a good bestiary the other tools read
+    temp_filename = f"{output_filename}.{os.getpid()}.tmp"
+    failed_files = []
+    shard_errors = {}
+    try:
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            writer = StructuredBestiaryWriter(f, output_format=args.format, compact=args.compact)
+            for xml_file, monsters_in_file in iter_shard_monsters(xml_files, jobs=args.jobs, cache_dir=cache_dir, errors=shard_errors):
+                print(f"Parsing {xml_file}...")
+                count_in_file = 0
+                try:
+                    for monster in monsters_in_file:
+                        writer.write(monster)
+                        count_in_file += 1
+                except (ET.ParseError, FileNotFoundError) as e:
+                    shard_errors[xml_file] = e
+                if xml_file in shard_errors:
+                    print(f"Failed to parse {xml_file} after {count_in_file} monsters: {shard_errors[xml_file]}")
+                    failed_files.append(xml_file)
+                elif count_in_file:
+                    print(f"Successfully parsed {count_in_file} monsters from {xml_file}.")
+                else:
+                    print(f"No monsters found in {xml_file}.")
+                    failed_files.append(xml_file)
+            writer.close()
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+
+    if failed_files or writer.count == 0:
+        os.remove(temp_filename)
+        print(f"Error: {len(failed_files)} of {len(xml_files)} files failed to parse or produced no monsters; "
+              f"{output_filename} was left unchanged.")
+        sys.exit(1)
+    os.replace(temp_filename, output_filename)
+    print(f"Processing complete. Parsed {writer.count} monsters into {output_filename}.")
+
+    if args.regex_stats:
+        print("\nRegex pattern stats (most expensive first):")
+        print(PATTERNS.format_stats())
+
+    if args.section_stats:
+        print("\nSection parser stats (most expensive first):")
+        print(SECTION_STATS.format_stats())
+        with open(args.section_stats_output, 'w', encoding='utf-8') as f:
+            json.dump({"top_n": SECTION_STATS.top_n, "sections": SECTION_STATS.stats()}, f, indent=4, ensure_ascii=False)
+        print(f"Section stats written to {args.section_stats_output}")
 
 if __name__ == "__main__":
     main()
@@ -297,15 +297,15 @@ def parse_maneuver_description(maneuver_name, description):
     return parsed_data
 
 
-def main():
+def main(input_file="maneuvers.json", output_file="maneuvers.xml"):
     try:
-        with open("maneuvers.json", 'r') as f:
+        with open(input_file, 'r') as f:
             maneuvers_data = json.load(f)
     except FileNotFoundError:
-        print("Error: maneuvers.json not found.")
+        print(f"Error: {input_file} not found.")
         return
     except json.JSONDecodeError:
-        print("Error: maneuvers.json is not valid JSON.")
+        print(f"Error: {input_file} is not valid JSON.")
         return
 
     root = ET.Element("maneuvers_list")
@@ -415,11 +415,11 @@ def main():
     xml_string = prettify_xml(root)
 
     try:
-        with open("maneuvers.xml", 'w') as f:
+        with open(output_file, 'w') as f:
             f.write(xml_string)
-        print("Successfully generated maneuvers.xml (v2)")
+        print(f"Successfully generated {output_file} (v2)")
     except IOError:
-        print("Error: Could not write to maneuvers.xml")
+        print(f"Error: Could not write to {output_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,11 @@
 import xml.etree.ElementTree as ET
+import argparse
+import functools
 import os
 import re
+from types import MappingProxyType
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Mapeo de abreviaturas de escuelas a nombres completos y para nombres de archivo
 SCHOOL_MAP = {
@@ -26,6 +31,56 @@ SCHOOL_FILENAME_MAP = {
     "T": "transmutation",
 }
 
+# Normalizadores memoizados: las cadenas de duración, alcance, tiempo de lanzamiento y
+# componentes se repiten cientos de veces ("Instantaneous", "Self", "Action"...), así que cada
+# resultado se calcula una vez por cadena distinta y se comparte. Los resultados se congelan
+# (dict -> MappingProxyType, list -> tuple) para que compartirlos entre hechizos sea seguro.
+NORMALIZER_CACHE_SIZE = 4096
+MEMOIZED_NORMALIZERS = []
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def memoized_normalizer(func):
+    """
+    Envuelve un normalizador de una sola cadena con un lru_cache acotado. La función original
+    queda en .uncached y las estadísticas en .cache_info().
+    """
+    @functools.lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+    def cached(text):
+        return _freeze(func(text))
+
+    @functools.wraps(func)
+    def wrapper(text):
+        return cached(text)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.uncached = func
+    MEMOIZED_NORMALIZERS.append(wrapper)
+    return wrapper
+
+def normalizer_cache_stats():
+    """{nombre: {"hits", "misses", "size", "maxsize"}} de cada normalizador memoizado."""
+    stats = {}
+    for normalizer in MEMOIZED_NORMALIZERS:
+        info = normalizer.cache_info()
+        stats[normalizer.__name__] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+    return stats
+
+def format_normalizer_cache_stats(stats):
+    lines = [f"{'normalizador':<28}  {'aciertos':>9}  {'fallos':>9}  {'tasa':>6}  {'entradas':>8}"]
+    for name, counts in stats.items():
+        calls = counts["hits"] + counts["misses"]
+        hit_rate = counts["hits"] / calls if calls else 0.0
+        lines.append(f"{name:<28}  {counts['hits']:>9}  {counts['misses']:>9}  {hit_rate:>6.1%}  {counts['size']:>8}")
+    return "\n".join(lines)
+
+@memoized_normalizer
 def parse_material_components(components_str):
     """
     Parsea la cadena de componentes materiales para extraer descripción, costo y si se consume.
@@ -144,6 +199,7 @@ def parse_material_components(components_str):
             })
     return materials
 
+@memoized_normalizer
 def parse_duration(duration_str):
     """
     Parsea la cadena de duración para extraer valor, unidad y si es concentración.
@@ -192,6 +248,7 @@ def parse_duration(duration_str):
         "up_to": up_to
     }
 
+@memoized_normalizer
 def parse_casting_time(time_str):
     val = None
     unit = None
@@ -249,6 +306,7 @@ def parse_casting_time(time_str):
 
     return {"full_description": time_str, "value": val, "unit": unit, "condition": condition}
 
+@memoized_normalizer
 def parse_range(range_str):
     val = None
     unit = None
@@ -646,111 +704,240 @@ def create_spell_xml_element(spell_data, root_compendium):
 
     return spell_el
 
-def main():
-    input_file = "deprecated/spells-phb24.xml"
-    output_dir = "01_Core/01_Players_Handbook_2024/"
-
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+def extract_spell_data(spell_node):
+    """
+    Extrae los campos en bruto de un nodo <spell> del archivo fuente (formato antiguo) a un dict
+    listo para create_spell_xml_element.
+    """
+    data = {}
+    data["name"] = spell_node.find("name").text if spell_node.find("name") is not None else ""
+    data["level"] = spell_node.find("level").text if spell_node.find("level") is not None else ""
+    data["school_code"] = spell_node.find("school").text if spell_node.find("school") is not None else ""
+    data["ritual"] = spell_node.find("ritual").text if spell_node.find("ritual") is not None else "NO"
+    data["time"] = spell_node.find("time").text if spell_node.find("time") is not None else ""
+    data["range"] = spell_node.find("range").text if spell_node.find("range") is not None else ""
+    data["components"] = spell_node.find("components").text if spell_node.find("components") is not None else ""
+    data["duration"] = spell_node.find("duration").text if spell_node.find("duration") is not None else ""
+
+    full_text_orig = spell_node.find("text").text if spell_node.find("text") is not None else ""
+    data["text_for_ahl"] = full_text_orig # Guardar el texto original para parsear AHL
+
+    # Separar la información de la fuente y AHL del texto principal
+    source_info_match = re.search(r"Source:\s*(.*?)(?:\n|$)", full_text_orig, re.DOTALL)
+
+    text_to_parse_for_desc = full_text_orig
+    if source_info_match:
+        data["source_info"] = source_info_match.group(0).strip()
+        text_to_parse_for_desc = text_to_parse_for_desc.replace(data["source_info"], "").strip()
+    else:
+        data["source_info"] = ""
 
-    tree = ET.parse(input_file)
-    root = tree.getroot()
-
-    # Diccionario para almacenar hechizos por escuela
-    spells_by_school = {code: [] for code in SCHOOL_MAP.keys()}
-
-    for spell_node in root.findall("spell"):
-        data = {}
-        data["name"] = spell_node.find("name").text if spell_node.find("name") is not None else ""
-        data["level"] = spell_node.find("level").text if spell_node.find("level") is not None else ""
-        data["school_code"] = spell_node.find("school").text if spell_node.find("school") is not None else ""
-        data["ritual"] = spell_node.find("ritual").text if spell_node.find("ritual") is not None else "NO"
-        data["time"] = spell_node.find("time").text if spell_node.find("time") is not None else ""
-        data["range"] = spell_node.find("range").text if spell_node.find("range") is not None else ""
-        data["components"] = spell_node.find("components").text if spell_node.find("components") is not None else ""
-        data["duration"] = spell_node.find("duration").text if spell_node.find("duration") is not None else ""
-
-        full_text_orig = spell_node.find("text").text if spell_node.find("text") is not None else ""
-        data["text_for_ahl"] = full_text_orig # Guardar el texto original para parsear AHL
-
-        # Separar la información de la fuente y AHL del texto principal
-        source_info_match = re.search(r"Source:\s*(.*?)(?:\n|$)", full_text_orig, re.DOTALL)
-
-        text_to_parse_for_desc = full_text_orig
-        if source_info_match:
-            data["source_info"] = source_info_match.group(0).strip()
-            text_to_parse_for_desc = text_to_parse_for_desc.replace(data["source_info"], "").strip()
-        else:
-            data["source_info"] = ""
+    # Remover las secciones de AHL del texto que va a la descripción principal
+    text_to_parse_for_desc = re.sub(r"Cantrip Upgrade:.*?(?=\n\n|Source:|$)", "", text_to_parse_for_desc, flags=re.IGNORECASE | re.DOTALL).strip()
+    text_to_parse_for_desc = re.sub(r"Using a Higher-Level Spell Slot:.*?(?=\n\n|Source:|$)", "", text_to_parse_for_desc, flags=re.IGNORECASE | re.DOTALL).strip()
 
-        # Remover las secciones de AHL del texto que va a la descripción principal
-        text_to_parse_for_desc = re.sub(r"Cantrip Upgrade:.*?(?=\n\n|Source:|$)", "", text_to_parse_for_desc, flags=re.IGNORECASE | re.DOTALL).strip()
-        text_to_parse_for_desc = re.sub(r"Using a Higher-Level Spell Slot:.*?(?=\n\n|Source:|$)", "", text_to_parse_for_desc, flags=re.IGNORECASE | re.DOTALL).strip()
+    data["text"] = text_to_parse_for_desc.strip()
 
-        data["text"] = text_to_parse_for_desc.strip()
 
+    data["classes"] = spell_node.find("classes").text if spell_node.find("classes") is not None else ""
 
-        data["classes"] = spell_node.find("classes").text if spell_node.find("classes") is not None else ""
+    data["rolls"] = []
+    for roll_node in spell_node.findall("roll"):
+        roll_data = {"dice": roll_node.text}
+        if "description" in roll_node.attrib:
+            roll_data["description"] = roll_node.attrib["description"]
 
-        data["rolls"] = []
-        for roll_node in spell_node.findall("roll"):
-            roll_data = {"dice": roll_node.text}
-            if "description" in roll_node.attrib:
-                roll_data["description"] = roll_node.attrib["description"]
+        # Heurística simple para tipo de daño desde descripción
+        desc_lower = roll_data.get("description","").lower()
+        if "acid" in desc_lower: roll_data["damage_type"] = "Acid"
+        elif "cold" in desc_lower: roll_data["damage_type"] = "Cold"
+        elif "fire" in desc_lower: roll_data["damage_type"] = "Fire"
+        elif "force" in desc_lower: roll_data["damage_type"] = "Force"
+        elif "lightning" in desc_lower: roll_data["damage_type"] = "Lightning"
+        elif "necrotic" in desc_lower: roll_data["damage_type"] = "Necrotic"
+        elif "piercing" in desc_lower: roll_data["damage_type"] = "Piercing"
+        elif "poison" in desc_lower: roll_data["damage_type"] = "Poison"
+        elif "psychic" in desc_lower: roll_data["damage_type"] = "Psychic"
+        elif "radiant" in desc_lower: roll_data["damage_type"] = "Radiant"
+        elif "slashing" in desc_lower: roll_data["damage_type"] = "Slashing"
+        elif "thunder" in desc_lower: roll_data["damage_type"] = "Thunder"
+        elif "bludgeoning" in desc_lower: roll_data["damage_type"] = "Bludgeoning"
+        elif "elemental damage" in desc_lower: roll_data["damage_type"] = "Elemental (Choose)" # Para Chromatic Orb
 
-            # Heurística simple para tipo de daño desde descripción
-            desc_lower = roll_data.get("description","").lower()
-            if "acid" in desc_lower: roll_data["damage_type"] = "Acid"
-            elif "cold" in desc_lower: roll_data["damage_type"] = "Cold"
-            elif "fire" in desc_lower: roll_data["damage_type"] = "Fire"
-            elif "force" in desc_lower: roll_data["damage_type"] = "Force"
-            elif "lightning" in desc_lower: roll_data["damage_type"] = "Lightning"
-            elif "necrotic" in desc_lower: roll_data["damage_type"] = "Necrotic"
-            elif "piercing" in desc_lower: roll_data["damage_type"] = "Piercing"
-            elif "poison" in desc_lower: roll_data["damage_type"] = "Poison"
-            elif "psychic" in desc_lower: roll_data["damage_type"] = "Psychic"
-            elif "radiant" in desc_lower: roll_data["damage_type"] = "Radiant"
-            elif "slashing" in desc_lower: roll_data["damage_type"] = "Slashing"
-            elif "thunder" in desc_lower: roll_data["damage_type"] = "Thunder"
-            elif "bludgeoning" in desc_lower: roll_data["damage_type"] = "Bludgeoning"
-            elif "elemental damage" in desc_lower: roll_data["damage_type"] = "Elemental (Choose)" # Para Chromatic Orb
+        if "heal" in desc_lower: roll_data["type"] = "healing"
+        if "subtract from roll" in desc_lower: roll_data["type"] = "effect"
+        if "add to roll" in desc_lower: roll_data["type"] = "effect"
 
-            if "heal" in desc_lower: roll_data["type"] = "healing"
-            if "subtract from roll" in desc_lower: roll_data["type"] = "effect"
-            if "add to roll" in desc_lower: roll_data["type"] = "effect"
 
+        data["rolls"].append(roll_data)
 
-            data["rolls"].append(roll_data)
+    return data
 
-        if data["school_code"] in spells_by_school:
-            spells_by_school[data["school_code"]].append(data)
-        else:
-            print(f"Advertencia: Escuela desconocida '{data['school_code']}' para el hechizo '{data['name']}'. Se omitirá.")
+def iter_source_spells(input_file):
+    """
+    Recorre los <spell> de nivel superior de un archivo fuente con iterparse y devuelve sus datos
+    extraídos uno a uno, liberando cada nodo al terminar, así la memoria no crece con el archivo.
+    """
+    try:
+        context = ET.iterparse(input_file, events=("start", "end"))
+        _, root = next(context)
+        depth = 0
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0 and elem.tag == "spell":
+                yield extract_spell_data(elem)
+                elem.clear()
+                root.remove(elem)
+    except ET.ParseError as e:
+        print(f"Error al parsear el archivo XML {input_file}: {e}")
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {input_file}")
+
+def build_spell_xml_batch(spell_batch):
+    """
+    Construye y serializa el XML de un lote de hechizos. Se ejecuta en los procesos del pool:
+    devuelve [(código de escuela, texto XML del <spell> ya indentado)] para que el proceso
+    principal solo tenga que escribirlos.
+    """
+    results = []
+    for spell_data in spell_batch:
+        spell_xml_el = create_spell_xml_element(spell_data, None)
+        ET.indent(spell_xml_el, space="  ", level=1) # Misma indentación que un hijo del <compendium>
+        results.append((spell_data["school_code"], ET.tostring(spell_xml_el, encoding="unicode")))
+    return results
+
+def build_spell_xml_batch_with_stats(spell_batch):
+    """Variante de build_spell_xml_batch que también devuelve el pid y las estadísticas de caché del proceso."""
+    return build_spell_xml_batch(spell_batch), os.getpid(), normalizer_cache_stats()
+
+def _sum_cache_stats(stats_by_process):
+    totals = {}
+    for stats in stats_by_process:
+        for name, counts in stats.items():
+            total = totals.setdefault(name, {"hits": 0, "misses": 0, "size": 0, "maxsize": counts["maxsize"]})
+            for key in ("hits", "misses", "size"):
+                total[key] += counts[key]
+    return totals
+
+class SchoolFileWriter:
+    """
+    Escribe el archivo spells-<escuela>-<libro>.xml de una escuela a medida que llegan sus hechizos.
+    El archivo se abre con el primer hechizo (las escuelas sin hechizos no generan archivo) y el
+    resultado es idéntico al de indentar y escribir el árbol completo con ET.
+    """
 
-    # Crear archivos XML por escuela
-    for school_code, spell_list in spells_by_school.items():
-        if not spell_list:
-            continue
+    def __init__(self, output_filename):
+        self.output_filename = output_filename
+        self.count = 0
+        self._file = None
+
+    def write(self, spell_xml_text):
+        if self._file is None:
+            self._file = open(self.output_filename, "w", encoding="utf-8")
+            self._file.write("<?xml version='1.0' encoding='UTF-8'?>\n<compendium version=\"5\" auto_indent=\"NO\">")
+        self._file.write("\n  ")
+        self._file.write(spell_xml_text)
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.write("\n</compendium>")
+            self._file.close()
+            self._file = None
+
+def _iter_spell_batches(input_files, batch_size):
+    batch = []
+    for input_file in input_files:
+        for data in iter_source_spells(input_file):
+            if data["school_code"] not in SCHOOL_MAP:
+                print(f"Advertencia: Escuela desconocida '{data['school_code']}' para el hechizo '{data['name']}'. Se omitirá.")
+                continue
+            batch.append(data)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def parse_spell_files(input_files, output_dir, jobs=1, book_suffix="phb24", batch_size=64, cache_stats=False):
+    """
+    Pipeline de hechizos: lee los archivos fuente en streaming, construye los <spell> en lotes
+    (en un ProcessPoolExecutor si jobs > 1) y cada escuela escribe su propio archivo conforme
+    llegan los resultados. Los lotes se consumen en el orden de entrada, así que la salida es la
+    misma que en serie, y como mucho hay jobs * 2 lotes en vuelo, así que la memoria no depende
+    del tamaño de la fuente. Devuelve {código de escuela: número de hechizos escritos}.
+    Con cache_stats=True imprime al final las estadísticas de los normalizadores memoizados,
+    sumadas entre todos los procesos.
+    """
+    if isinstance(input_files, str):
+        input_files = [input_files]
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-        school_filename_part = SCHOOL_FILENAME_MAP.get(school_code)
-        if not school_filename_part:
-            print(f"Error: No se encontró mapeo de nombre de archivo para la escuela {school_code}")
-            continue
+    writers = {}
+    for school_code, school_filename_part in SCHOOL_FILENAME_MAP.items():
+        output_filename = os.path.join(output_dir, f"spells-{school_filename_part}-{book_suffix}.xml")
+        writers[school_code] = SchoolFileWriter(output_filename)
 
-        output_filename = os.path.join(output_dir, f"spells-{school_filename_part}-phb24.xml")
+    def write_results(results):
+        for school_code, spell_xml_text in results:
+            writers[school_code].write(spell_xml_text)
 
-        # Crear el elemento raíz del compendio para este archivo de escuela
-        school_compendium_root = ET.Element("compendium", version="5", auto_indent="NO")
+    worker_cache_stats = {} # pid -> últimas estadísticas (acumuladas) de ese proceso
 
-        for spell_data_item in spell_list:
-            spell_xml_el = create_spell_xml_element(spell_data_item, school_compendium_root)
-            school_compendium_root.append(spell_xml_el)
+    def collect(future):
+        if cache_stats:
+            results, pid, stats = future.result()
+            worker_cache_stats[pid] = stats
+            write_results(results)
+        else:
+            write_results(future.result())
 
-        # Escribir el árbol XML al archivo
-        tree_out = ET.ElementTree(school_compendium_root)
-        ET.indent(tree_out, space="  ", level=0) # Para indentación bonita
-        tree_out.write(output_filename, encoding="UTF-8", xml_declaration=True)
-        print(f"Archivo de hechizos creado: {output_filename}")
+    batches = _iter_spell_batches(input_files, batch_size)
+    try:
+        if jobs <= 1:
+            for batch in batches:
+                write_results(build_spell_xml_batch(batch))
+        else:
+            worker = build_spell_xml_batch_with_stats if cache_stats else build_spell_xml_batch
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                pending = deque()
+                for batch in batches:
+                    pending.append(executor.submit(worker, batch))
+                    if len(pending) >= jobs * 2:
+                        collect(pending.popleft())
+                while pending:
+                    collect(pending.popleft())
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    for writer in writers.values():
+        if writer.count:
+            print(f"Archivo de hechizos creado: {writer.output_filename}")
+    if cache_stats:
+        stats = _sum_cache_stats(worker_cache_stats.values()) if jobs > 1 else normalizer_cache_stats()
+        print("\nEstadísticas de caché de los normalizadores:")
+        print(format_normalizer_cache_stats(stats))
+    return {school_code: writer.count for school_code, writer in writers.items() if writer.count}
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Convierte el archivo de hechizos antiguo en un archivo XML por escuela.")
+    arg_parser.add_argument("inputs", nargs="*", default=["deprecated/spells-phb24.xml"],
+                            help="Archivos fuente de hechizos (por defecto: deprecated/spells-phb24.xml).")
+    arg_parser.add_argument("--output-dir", default="01_Core/01_Players_Handbook_2024/",
+                            help="Directorio de salida (por defecto: 01_Core/01_Players_Handbook_2024/).")
+    arg_parser.add_argument("--jobs", type=int, default=1,
+                            help="Procesos para construir los hechizos en paralelo (por defecto: 1, en serie).")
+    arg_parser.add_argument("--book-suffix", default="phb24",
+                            help="Sufijo de los archivos de salida, spells-<escuela>-<sufijo>.xml (por defecto: phb24).")
+    arg_parser.add_argument("--cache-stats", action="store_true",
+                            help="Muestra aciertos/fallos de la caché de duración, alcance, tiempo de lanzamiento y componentes.")
+    args = arg_parser.parse_args(argv)
+    parse_spell_files(args.inputs, args.output_dir, jobs=args.jobs, book_suffix=args.book_suffix, cache_stats=args.cache_stats)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,490 @@
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from heapq import nlargest
+from time import perf_counter
+
+from compendium_db import iter_entity_elements, iter_flavor_text
+
+DEFAULT_INDEX_DIR = ".rules_index"
+
+# kind -> default source files (globs allowed)
+DEFAULT_SOURCES = {
+    "monster": ["bestiario_estructurado.json"],
+    "spell": ["01_Core/spells/spells-*-phb24.xml"],
+    "item": ["items-phb24-structured.xml", "01_Core/items/items-dmg24.xml"],
+    # 01_Core/feats/feats-phb24.xml is not well-formed; the Players Handbook copy parses (102 feats)
+    "feat": ["01_Core/01_Players_Handbook_2024/feats-phb24.xml"],
+}
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:'[a-z]+)?")
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SEGMENT_MAGIC = b"RSEG1\n"
+MANIFEST_NAME = "manifest.json"
+
+def tokenize(text):
+    """Lower-cased word tokens with their character spans: [(token, start, end)]."""
+    return [(match.group(0), match.start(), match.end()) for match in TOKEN_PATTERN.finditer(text.lower())]
+
+# --- Varint (LEB128) encoding -------------------------------------------------
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def _encode_string(text, out):
+    raw = text.encode('utf-8')
+    encode_varint(len(raw), out)
+    out.extend(raw)
+
+def _decode_string(data, pos):
+    length, pos = decode_varint(data, pos)
+    return data[pos:pos + length].decode('utf-8'), pos + length
+
+# --- Document extraction ------------------------------------------------------
+
+def iter_monster_documents(filepath):
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            monsters = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: File not found {filepath}")
+        return
+    for monster in monsters:
+        parts = [monster.get('description_text', '')]
+        parts.extend(iter_flavor_text(monster))
+        for section in ('traits', 'actions', 'bonus_actions', 'reactions'):
+            for entry in monster.get(section, []):
+                parts.append(f"{entry.get('name', '')}. {entry.get('text_description', '')}")
+        for section in ('legendary_actions', 'mythic_actions', 'lair_actions'):
+            for entry in monster.get(section, {}).get('actions_list', []):
+                parts.append(f"{entry.get('name', '')}. {entry.get('text_description', '')}")
+        yield monster.get('name', ''), "\n".join(part for part in parts if part.strip())
+
+def _element_text(element):
+    return "\n".join(fragment.strip() for fragment in element.itertext() if fragment.strip()) if element is not None else ""
+
+def iter_spell_documents(filepath):
+    for spell in iter_entity_elements(filepath, 'spell', strict=True):
+        yield spell.findtext('name', '').strip(), _element_text(spell.find('description'))
+
+def iter_item_documents(filepath):
+    # item_parser output uses <description_text>; the raw compendium files keep it in <text>.
+    for item in iter_entity_elements(filepath, 'item', strict=True):
+        description = item.find('description_text')
+        if description is None:
+            description = item.find('text')
+        yield item.findtext('name', '').strip(), _element_text(description)
+
+def iter_feat_documents(filepath):
+    for feat in iter_entity_elements(filepath, 'feat', strict=True):
+        parts = []
+        for element in feat.iter():
+            if element.tag in ('name', 'source', 'level', 'prerequisite') and element is not feat:
+                continue
+            if element.get('description'):
+                parts.append(element.get('description'))
+            if element.text and element.text.strip():
+                parts.append(element.text.strip())
+        yield feat.findtext('name', '').strip(), "\n".join(parts)
+
+DOCUMENT_READERS = {
+    "monster": iter_monster_documents,
+    "spell": iter_spell_documents,
+    "item": iter_item_documents,
+    "feat": iter_feat_documents,
+}
+
+# --- Segments -----------------------------------------------------------------
+
+class Segment:
+    """
+    The documents of one source file and their positional postings.
+
+    A segment read from disk keeps each term's postings as an undecoded byte range and only
+    decodes the terms a query asks for.
+    """
+
+    def __init__(self, source_file, documents, postings=None, data=b"", term_blocks=None):
+        self.source_file = source_file
+        self.documents = documents              # [(kind, name, text, length)]
+        self._postings = postings or {}         # term -> [(local doc id, [positions])]
+        self._data = data
+        self._term_blocks = term_blocks or {}   # term -> (start, end) in data
+
+    @classmethod
+    def build(cls, kind, source_file):
+        documents = []
+        postings = defaultdict(list)
+        for name, body in DOCUMENT_READERS[kind](source_file):
+            if not name or not body.strip():
+                continue
+            text = f"{name}\n{body}"
+            doc_id = len(documents)
+            positions_by_term = defaultdict(list)
+            tokens = tokenize(text)
+            for position, (token, _, _) in enumerate(tokens):
+                positions_by_term[token].append(position)
+            for term, positions in positions_by_term.items():
+                postings[term].append((doc_id, positions))
+            documents.append((kind, name, text, len(tokens)))
+        return cls(source_file, documents, dict(postings))
+
+    def terms(self):
+        return self._postings.keys() | self._term_blocks.keys()
+
+    def postings_for(self, term):
+        entries = self._postings.get(term)
+        if entries is None and term in self._term_blocks:
+            entries = _decode_postings(self._data, *self._term_blocks[term])
+            self._postings[term] = entries
+        return entries or []
+
+    def to_bytes(self):
+        out = bytearray(SEGMENT_MAGIC)
+        _encode_string(self.source_file, out)
+        encode_varint(len(self.documents), out)
+        for kind, name, text, length in self.documents:
+            _encode_string(kind, out)
+            _encode_string(name, out)
+            _encode_string(text, out)
+            encode_varint(length, out)
+        terms = sorted(self.terms())
+        encode_varint(len(terms), out)
+        for term in terms:
+            block = bytearray()
+            entries = self.postings_for(term)
+            encode_varint(len(entries), block)
+            previous_doc = 0
+            for doc_id, positions in entries:
+                encode_varint(doc_id - previous_doc, block)  # doc ids ascend: store gaps
+                previous_doc = doc_id
+                encode_varint(len(positions), block)
+                previous_position = 0
+                for position in positions:
+                    encode_varint(position - previous_position, block)
+                    previous_position = position
+            _encode_string(term, out)
+            encode_varint(len(block), out)  # lets readers skip a term without decoding it
+            out.extend(block)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data.startswith(SEGMENT_MAGIC):
+            raise ValueError("not a rules index segment")
+        pos = len(SEGMENT_MAGIC)
+        source_file, pos = _decode_string(data, pos)
+        doc_count, pos = decode_varint(data, pos)
+        documents = []
+        for _ in range(doc_count):
+            kind, pos = _decode_string(data, pos)
+            name, pos = _decode_string(data, pos)
+            text, pos = _decode_string(data, pos)
+            length, pos = decode_varint(data, pos)
+            documents.append((kind, name, text, length))
+        term_count, pos = decode_varint(data, pos)
+        term_blocks = {}
+        for _ in range(term_count):
+            term, pos = _decode_string(data, pos)
+            block_length, pos = decode_varint(data, pos)
+            term_blocks[term] = (pos, pos + block_length)
+            pos += block_length
+        return cls(source_file, documents, data=data, term_blocks=term_blocks)
+
+def _decode_postings(data, pos, end):
+    entry_count, pos = decode_varint(data, pos)
+    entries = []
+    doc_id = 0
+    for _ in range(entry_count):
+        gap, pos = decode_varint(data, pos)
+        doc_id += gap
+        position_count, pos = decode_varint(data, pos)
+        positions = []
+        position = 0
+        for _ in range(position_count):
+            delta, pos = decode_varint(data, pos)
+            position += delta
+            positions.append(position)
+        entries.append((doc_id, positions))
+    return entries
+
+# --- Index --------------------------------------------------------------------
+
+def _file_signature(filepath):
+    stat = os.stat(filepath)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _segment_filename(source_file):
+    return hashlib.sha1(os.path.abspath(source_file).encode('utf-8')).hexdigest()[:16] + ".seg"
+
+class RulesIndex:
+    """
+    BM25-ranked inverted index over rules text with positional postings.
+
+    The index is a set of per-source-file segments stored under index_dir; update() rebuilds
+    only the segments whose source file changed since the last run. A term's postings are
+    decoded from every segment the first time a query uses it and cached, merged under
+    index-wide document ids.
+    """
+
+    def __init__(self, segments=(), errors=()):
+        self.segments = list(segments)
+        self.errors = list(errors)              # [(source file, message)] left out of the index
+        self.documents = []
+        self._segment_offsets = []
+        for segment in self.segments:
+            self._segment_offsets.append(len(self.documents))
+            self.documents.extend(segment.documents)
+        self._postings = {}  # term -> {doc id: [positions]}, filled on demand
+        total_length = sum(document[3] for document in self.documents)
+        self.average_length = total_length / len(self.documents) if self.documents else 0.0
+        # Per-document BM25 length normalisation, computed once instead of per posting.
+        self._length_norms = [BM25_K1 * (1 - BM25_B + BM25_B * document[3] / self.average_length)
+                              for document in self.documents]
+
+    def postings(self, term):
+        merged = self._postings.get(term)
+        if merged is None:
+            merged = {}
+            for segment, offset in zip(self.segments, self._segment_offsets):
+                for doc_id, positions in segment.postings_for(term):
+                    merged[doc_id + offset] = positions
+            self._postings[term] = merged
+        return merged
+
+    def term_count(self):
+        return len(set().union(*(segment.terms() for segment in self.segments)))
+
+    @classmethod
+    def update(cls, sources, index_dir=DEFAULT_INDEX_DIR, verbose=False):
+        """
+        Brings the on-disk segments in line with sources ({kind: [paths or globs]}) and loads them.
+        A source that is missing or fails to parse gets no segment (never a partial one) and is
+        listed in the returned index's errors.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        manifest_path = os.path.join(index_dir, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+
+        new_manifest = {}
+        segments = []
+        errors = []
+        for kind, patterns in sources.items():
+            for pattern in patterns:
+                for source_file in sorted(glob.glob(pattern)) or [pattern]:
+                    if not os.path.exists(source_file):
+                        print(f"Error: File not found {source_file}")
+                        errors.append((source_file, "file not found"))
+                        continue
+                    signature = _file_signature(source_file)
+                    segment_path = os.path.join(index_dir, _segment_filename(source_file))
+                    entry = manifest.get(source_file)
+                    segment = None
+                    if entry and entry.get("kind") == kind and entry.get("signature") == signature:
+                        try:
+                            with open(segment_path, 'rb') as f:
+                                segment = Segment.from_bytes(f.read())
+                        except (OSError, ValueError, IndexError):
+                            segment = None
+                    if segment is None:
+                        if verbose:
+                            print(f"Indexing {source_file}")
+                        try:
+                            segment = Segment.build(kind, source_file)
+                        except (ET.ParseError, ValueError) as e:
+                            print(f"Error parsing {source_file}: {e}")
+                            errors.append((source_file, str(e)))
+                            continue
+                        temp_path = segment_path + ".tmp"
+                        with open(temp_path, 'wb') as f:
+                            f.write(segment.to_bytes())
+                        os.replace(temp_path, segment_path)
+                    new_manifest[source_file] = {"kind": kind, "signature": signature}
+                    segments.append(segment)
+
+        for source_file in manifest.keys() - new_manifest.keys():
+            stale_path = os.path.join(index_dir, _segment_filename(source_file))
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        temp_manifest = manifest_path + ".tmp"
+        with open(temp_manifest, 'w', encoding='utf-8') as f:
+            json.dump(new_manifest, f, indent=2)
+        os.replace(temp_manifest, manifest_path)
+        return cls(segments, errors)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _phrase_matches(self, terms):
+        """doc id -> [start positions] of the consecutive run of terms."""
+        term_positions = []
+        for term in terms:
+            entries = self.postings(term)
+            if not entries:
+                return {}
+            term_positions.append(entries)
+        candidate_docs = set(min(term_positions, key=len))
+        for entries in term_positions:
+            candidate_docs &= entries.keys()
+        matches = {}
+        for doc_id in candidate_docs:
+            following = [set(positions[doc_id]) for positions in term_positions[1:]]
+            starts = [start for start in term_positions[0][doc_id]
+                      if all(start + offset in positions for offset, positions in enumerate(following, 1))]
+            if starts:
+                matches[doc_id] = starts
+        return matches
+
+    def search(self, query, limit=10, kind=None, snippet_tokens=12):
+        """
+        Ranks documents for a query of words and "quoted phrases". Words are scored with BM25
+        (any word may match); every phrase must occur verbatim. Returns
+        [{"kind", "name", "score", "snippet"}], best first.
+        """
+        words = []
+        phrases = []
+        for phrase, word in QUERY_PATTERN.findall(query):
+            if phrase:
+                phrase_terms = [token for token, _, _ in tokenize(phrase)]
+                if len(phrase_terms) > 1:
+                    phrases.append(phrase_terms)
+                words.extend(phrase_terms)
+            else:
+                words.extend(token for token, _, _ in tokenize(word))
+        if not words:
+            return []
+
+        allowed = None
+        highlight_starts = defaultdict(list)
+        for phrase_terms in phrases:
+            matches = self._phrase_matches(phrase_terms)
+            allowed = set(matches) if allowed is None else allowed & matches.keys()
+            for doc_id, starts in matches.items():
+                highlight_starts[doc_id].extend((start, len(phrase_terms)) for start in starts)
+
+        doc_count = len(self.documents)
+        scores = defaultdict(float)
+        for term in set(words):
+            entries = self.postings(term)
+            if not entries:
+                continue
+            idf = math.log(1 + (doc_count - len(entries) + 0.5) / (len(entries) + 0.5))
+            if allowed is not None:
+                # Phrase filters usually leave far fewer documents than a word's postings.
+                entries = {doc_id: entries[doc_id] for doc_id in allowed if doc_id in entries}
+            length_norms = self._length_norms
+            for doc_id, positions in entries.items():
+                if kind is not None and self.documents[doc_id][0] != kind:
+                    continue
+                tf = len(positions)
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + length_norms[doc_id])
+
+        results = []
+        for doc_id, score in nlargest(limit, scores.items(), key=lambda item: item[1]):
+            document_kind, name, text, _ = self.documents[doc_id]
+            if doc_id in highlight_starts:
+                highlighted = {start + offset for start, length in highlight_starts[doc_id] for offset in range(length)}
+            else:
+                highlighted = set()
+                for term in set(words):
+                    highlighted.update(self.postings(term).get(doc_id, ()))
+            results.append({
+                "kind": document_kind,
+                "name": name,
+                "score": round(score, 4),
+                "snippet": make_snippet(text, highlighted, snippet_tokens),
+            })
+        return results
+
+def make_snippet(text, highlighted, window=12):
+    """
+    Excerpt of window tokens around the first highlighted token position, with highlighted
+    tokens wrapped in [ ]. Only the text up to the end of the excerpt is tokenized.
+    """
+    anchor = min(highlighted) if highlighted else 0
+    first = max(0, anchor - window // 3)
+    last = first + window
+    tokens = []
+    more = False
+    for position, match in enumerate(TOKEN_PATTERN.finditer(text.lower())):
+        if position >= last:
+            more = True
+            break
+        if position >= first:
+            tokens.append((position, match.start(), match.end()))
+    if not tokens:
+        return ""
+
+    pieces = []
+    cursor = tokens[0][1]
+    for position, start, end in tokens:
+        pieces.append(text[cursor:start])
+        pieces.append(f"[{text[start:end]}]" if position in highlighted else text[start:end])
+        cursor = end
+    snippet = " ".join("".join(pieces).split())
+    return ("..." if first > 0 else "") + snippet + ("..." if more else "")
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Builds (incrementally) and queries the BM25 rules-text index.")
+    arg_parser.add_argument("query", nargs="?", help='Search terms; wrap phrases in double quotes, e.g. \'"opportunity attack" reach\'.')
+    arg_parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, help=f"Directory for index segments (default: {DEFAULT_INDEX_DIR}).")
+    arg_parser.add_argument("--kind", choices=list(DOCUMENT_READERS), help="Restrict results to one kind of entry.")
+    arg_parser.add_argument("--limit", type=int, default=10)
+    arg_parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = arg_parser.parse_args(argv)
+
+    start = perf_counter()
+    index = RulesIndex.update(DEFAULT_SOURCES, args.index_dir, verbose=True)
+    load_seconds = perf_counter() - start
+    if index.errors:
+        print(f"Error: {len(index.errors)} source file(s) could not be indexed and are missing from the results:")
+        for source_file, message in index.errors:
+            print(f"  {source_file}: {message}")
+    if not args.query:
+        print(f"Indexed {len(index)} entries ({index.term_count()} terms) in {load_seconds * 1000:.1f} ms")
+        if index.errors:
+            sys.exit(1)
+        return
+
+    start = perf_counter()
+    results = index.search(args.query, limit=args.limit, kind=args.kind)
+    search_seconds = perf_counter() - start
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    for result in results:
+        print(f"{result['score']:7.3f}  [{result['kind']}] {result['name']}: {result['snippet']}")
+    print(f"{len(results)} results from {len(index)} entries in {search_seconds * 1000:.3f} ms (index loaded in {load_seconds * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
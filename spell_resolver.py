@@ -0,0 +1,196 @@
+import argparse
+import glob
+import os
+import re
+from collections import Counter
+from time import perf_counter
+
+from compendium_db import iter_entity_elements
+from parse_bestiary import StructuredBestiaryWriter, iter_bestiary_jsonl
+from update_json_references import iter_json_array_items
+
+DEFAULT_SPELL_FILES = "01_Core/spells/spells-*.xml"
+DEFAULT_MIN_SIMILARITY = 0.6  # for suggestions only; fuzzy matches are never written
+NGRAM_SIZE = 3
+
+# Suffixes that name a printing, or a stat block's casting note ("(level 3 version)", "(self only)"),
+# rather than a different spell
+SPELL_EDITION_PATTERN = re.compile(r"\s*\[[^\]]*\]")
+SPELL_NOTE_PATTERN = re.compile(r"\s*\([^)]*\)")
+APOSTROPHE_PATTERN = re.compile(r"['’‘`]")
+
+# The monster spell lists parse_bestiary.parse_spellcasting fills; per_day holds groups of them
+SPELL_LIST_KEYS = ("at_will", "known_spells", "prepared_spells")
+
+def normalize_spell_name(name):
+    """
+    Lookup key for a spell name: "Melf’s Acid Arrow (level 3 version)" and
+    "Melf's Acid Arrow [2024]" -> "melfs acid arrow".
+    """
+    name = SPELL_EDITION_PATTERN.sub("", (name or "").replace("\\/", "/"))
+    name = SPELL_NOTE_PATTERN.sub("", name)
+    name = APOSTROPHE_PATTERN.sub("", name)
+    return " ".join(name.split()).casefold().strip(" .,;*")
+
+def _ngrams(key):
+    padded = f" {key} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+class SpellIndex:
+    """
+    Spell records ({"name", "level", "school"}) keyed by normalize_spell_name, plus an inverted
+    index of character trigrams for names that don't match exactly. Each distinct reference is
+    resolved once and memoized, so resolving N references costs N dict lookups plus one fuzzy
+    search per distinct misspelling (which only touches spells sharing a trigram with it).
+    """
+
+    def __init__(self, spells, min_similarity=DEFAULT_MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self.spells = {}
+        self.ngrams = {}
+        self._grams_by_key = {}
+        self._resolved = {}
+        for spell in spells:
+            key = normalize_spell_name(spell["name"])
+            if not key or key in self.spells:
+                continue
+            self.spells[key] = spell
+            grams = _ngrams(key)
+            self._grams_by_key[key] = len(grams)
+            for gram in grams:
+                self.ngrams.setdefault(gram, []).append(key)
+
+    @classmethod
+    def from_xml_files(cls, paths, min_similarity=DEFAULT_MIN_SIMILARITY):
+        return cls(iter_spell_records(paths), min_similarity=min_similarity)
+
+    def __len__(self):
+        return len(self.spells)
+
+    def _fuzzy_key(self, key):
+        """Known key with the highest trigram Dice similarity to key, if it reaches min_similarity."""
+        grams = _ngrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.ngrams.get(gram, ()))
+        best_key, best_score = None, self.min_similarity
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + self._grams_by_key[candidate])
+            if score >= best_score and (best_key is None or score > best_score or candidate < best_key):
+                best_key, best_score = candidate, score
+        return best_key
+
+    def resolve(self, name):
+        """(spell record or None, "exact" / "fuzzy" / None) for a spell name as written in a stat block."""
+        key = normalize_spell_name(name)
+        if key in self._resolved:
+            return self._resolved[key]
+        if key in self.spells:
+            result = (self.spells[key], "exact")
+        else:
+            fuzzy_key = self._fuzzy_key(key) if key else None
+            result = (self.spells[fuzzy_key], "fuzzy") if fuzzy_key else (None, None)
+        self._resolved[key] = result
+        return result
+
+def iter_spell_records(paths):
+    """{"name", "level", "school"} for every <spell> in the given XML files, streamed."""
+    for path in paths:
+        try:
+            for spell in iter_entity_elements(path, 'spell'):
+                yield {"name": spell.findtext('name', '').strip(),
+                       "level": spell.findtext('level', '').strip(),
+                       "school": spell.findtext('school', '').strip()}
+        except FileNotFoundError:
+            print(f"Error: File not found {path}")
+
+def iter_monster_spell_entries(monster):
+    """Every spell reference dict in a monster's spellcasting section, across all of its lists."""
+    spellcasting = monster.get('spellcasting') or {}
+    for list_key in SPELL_LIST_KEYS:
+        yield from spellcasting.get(list_key, [])
+    for group in spellcasting.get('per_day', []):
+        yield from group.get('spells', [])
+
+def resolve_monster_spells(monsters, spell_index, stats=None):
+    """
+    Fills the empty "level" and "school" of every spell reference that matches a spell exactly,
+    in place, one pass over the monsters; levels already set (e.g. the slot level of a slot list)
+    are kept. Fuzzy matches are only suggestions (stat block fragments such as "Lightning" are
+    close to real spells too) and leave the entry untouched. Yields each monster after it is
+    resolved. stats, if given, counts "exact", "fuzzy" and "unresolved" references, and collects
+    the names behind the last two in stats["fuzzy_names"] (name -> suggested spell) /
+    stats["unresolved_names"].
+    """
+    if stats is not None:
+        stats.setdefault("fuzzy_names", {})
+        stats.setdefault("unresolved_names", Counter())
+    for monster in monsters:
+        for entry in iter_monster_spell_entries(monster):
+            spell, match = spell_index.resolve(entry.get("name", ""))
+            if match == "exact":
+                if not entry.get("level"):
+                    entry["level"] = spell["level"]
+                if not entry.get("school"):
+                    entry["school"] = spell["school"]
+            if stats is not None:
+                stats[match or "unresolved"] = stats.get(match or "unresolved", 0) + 1
+                if match == "fuzzy":
+                    stats["fuzzy_names"][entry.get("name", "")] = spell["name"]
+                elif match is None:
+                    stats["unresolved_names"][entry.get("name", "")] += 1
+        yield monster
+
+def _iter_json_monsters(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for _, monster in iter_json_array_items(f):
+            yield monster
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Fills the level and school of every monster spell from the spell files.")
+    arg_parser.add_argument("--input", default="bestiario_estructurado.json", help="Structured bestiary (.json or .jsonl).")
+    arg_parser.add_argument("--output", help="Where to write the resolved bestiary (default: overwrite --input).")
+    arg_parser.add_argument("--spells", nargs="+", default=sorted(glob.glob(DEFAULT_SPELL_FILES)),
+                            help=f"Spell XML files (default: {DEFAULT_SPELL_FILES}).")
+    arg_parser.add_argument("--min-similarity", type=float, default=DEFAULT_MIN_SIMILARITY,
+                            help=f"Trigram similarity a fuzzy match needs, 0-1 (default: {DEFAULT_MIN_SIMILARITY}).")
+    arg_parser.add_argument("--compact", action="store_true", help="Write the JSON array without indentation.")
+    args = arg_parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"Error: File not found {args.input}")
+        return
+
+    start = perf_counter()
+    spell_index = SpellIndex.from_xml_files(args.spells, min_similarity=args.min_similarity)
+    if not len(spell_index):
+        print("Error: no spells could be loaded. Exiting.")
+        return
+    print(f"Indexed {len(spell_index)} spells in {(perf_counter() - start) * 1000:.1f} ms.")
+
+    output_format = "jsonl" if args.input.endswith('.jsonl') else "json"
+    monsters = iter_bestiary_jsonl(args.input) if output_format == "jsonl" else _iter_json_monsters(args.input)
+    output_path = args.output or args.input
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    stats = {}
+    start = perf_counter()
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            writer = StructuredBestiaryWriter(f, output_format=output_format, compact=args.compact)
+            for monster in resolve_monster_spells(monsters, spell_index, stats):
+                writer.write(monster)
+            writer.close()
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, output_path)
+
+    for name, spell_name in sorted(stats["fuzzy_names"].items()):
+        print(f"  Not filled, closest spell: '{name}' -> '{spell_name}'")
+    for name, count in stats["unresolved_names"].most_common():
+        print(f"  Unresolved: '{name}' ({count}x)")
+    print(f"Resolved spells of {writer.count} monsters into {output_path} in {(perf_counter() - start) * 1000:.1f} ms: "
+          f"{stats.get('exact', 0)} exact, {stats.get('fuzzy', 0)} fuzzy, {stats.get('unresolved', 0)} unresolved.")
+
+if __name__ == "__main__":
+    main()
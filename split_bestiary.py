@@ -1,88 +1,230 @@
 import xml.etree.ElementTree as ET
-from collections import defaultdict
+import argparse
+import glob
+import hashlib
+import math
 import os
+import re
 
-def split_xml_by_first_letter(xml_file_path, output_dir):
+from bestiary_index import challenge_rating_to_number
+from monster_store import normalize_monster_name
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+COMPENDIUM_ROOT_TAG_OPEN = '<compendium version="5" auto_indent="NO">\n'
+COMPENDIUM_ROOT_TAG_CLOSE = '</compendium>'
+
+DEFAULT_PREFIX = "bestiary_mm24"
+# Letter shards keep the historical names; every other key gets its own prefix, joined with "-" so its
+# shards never match the bestiary_mm24_*.xml glob parse_bestiary reads (that would duplicate monsters)
+DEFAULT_PREFIXES = {"letter": DEFAULT_PREFIX, "cr": f"{DEFAULT_PREFIX}-cr", "type": f"{DEFAULT_PREFIX}-type",
+                    "hash": f"{DEFAULT_PREFIX}-hash"}
+DEFAULT_SHARD_SIZE = 64 * 1024  # target bytes per shard for the hash key
+
+# (highest CR in the band, shard label); anything above the last band goes to "cr17-30"
+CR_BANDS = [(1, "cr0-1"), (4, "cr2-4"), (10, "cr5-10"), (16, "cr11-16"), (30, "cr17-30")]
+
+# Shard keys: each maps a <monster> element to the label its shard file is named after
+
+def _monster_name(monster_element):
+    name_element = monster_element.find('name')
+    if name_element is None:
+        print(f"Warning: Found a monster entry with no name element: {ET.tostring(monster_element, encoding='unicode')}")
+        return ""
+    name = (name_element.text or "").strip()
+    if not name:
+        print(f"Warning: Found a monster entry with no name text: {ET.tostring(monster_element, encoding='unicode')}")
+    return name
+
+def letter_shard_key(monster_element):
+    """First letter of the name; names that don't start with a-z (or are missing) go to '#'."""
+    name = _monster_name(monster_element)
+    first_letter = name[0].lower() if name else "#"
+    return first_letter if 'a' <= first_letter <= 'z' else '#'
+
+def cr_shard_key(monster_element):
+    """Challenge rating band (see CR_BANDS), or 'cr-unknown'."""
+    cr_value = challenge_rating_to_number(monster_element.findtext('cr', ''))
+    if cr_value is None:
+        return "cr-unknown"
+    for upper, label in CR_BANDS:
+        if cr_value <= upper:
+            return label
+    return CR_BANDS[-1][1]
+
+def type_shard_key(monster_element):
+    """Creature type without its tags: 'fiend (devil)' -> 'fiend', 'swarm of Tiny beasts' -> 'swarm-of-tiny-beasts'."""
+    type_text = monster_element.findtext('type', '').split('(')[0].strip().lower()
+    return re.sub(r"[^a-z0-9]+", "-", type_text).strip("-") or "unknown"
+
+def make_hash_shard_key(buckets):
     """
-    Splits an XML file containing monster entries into multiple XML files,
-    each corresponding to the first letter of the monster's name.
+    Stable hash of the normalized name into one of buckets shards ('h00', 'h01', ...). A monster
+    always lands in the same shard for a given bucket count, and with many monsters per bucket
+    the shards come out close to the same size.
+    """
+    width = len(str(buckets - 1))
+    def hash_shard_key(monster_element):
+        digest = hashlib.blake2b(normalize_monster_name(_monster_name(monster_element)).encode('utf-8'), digest_size=8).digest()
+        return f"h{int.from_bytes(digest, 'little') % buckets:0{width}d}"
+    return hash_shard_key
 
-    Args:
-        xml_file_path (str): The path to the input XML file.
-        output_dir (str): The directory where the split XML files will be saved.
+SHARD_KEYS = {"letter": letter_shard_key, "cr": cr_shard_key, "type": type_shard_key}  # plus "hash", see make_hash_shard_key
+
+def buckets_for_size(xml_file_paths, shard_size=DEFAULT_SHARD_SIZE):
+    """Hash bucket count that puts roughly shard_size bytes of input in each shard."""
+    total = sum(os.path.getsize(path) for path in xml_file_paths if os.path.exists(path))
+    return max(1, math.ceil(total / shard_size))
+
+class ShardWriter:
     """
-    try:
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-    except ET.ParseError as e:
-        print(f"Error parsing XML file {xml_file_path}: {e}")
-        return
-    except FileNotFoundError:
-        print(f"Error: File not found at {xml_file_path}")
-        return
+    Writes one shard file. Monsters go to <path>.tmp as they arrive; commit() closes the
+    compendium and renames it into place, so readers never see a half-written shard.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self.count = 0
+        self.bytes_written = 0
+        self._file = open(self.temp_path, 'w', encoding='utf-8')
+        self._file.write(XML_DECLARATION)
+        self._file.write(COMPENDIUM_ROOT_TAG_OPEN)
+
+    def write(self, monster_xml_str):
+        self._file.write(monster_xml_str + '\n')
+        self.count += 1
+        self.bytes_written += len(monster_xml_str.encode('utf-8')) + 1
 
-    monsters_by_letter = defaultdict(list)
-
-    for monster_element in root.findall('monster'):
-        name_element = monster_element.find('name')
-        if name_element is not None and name_element.text:
-            name = name_element.text.strip()
-            if name:
-                first_letter = name[0].lower()
-                if 'a' <= first_letter <= 'z':
-                    monsters_by_letter[first_letter].append(monster_element)
-                else:
-                    # Handle names that don't start with a letter (e.g., numbers or symbols)
-                    monsters_by_letter['#'].append(monster_element) # Or some other category
-            else:
-                print(f"Warning: Found a monster entry with no name text: {ET.tostring(monster_element, encoding='unicode')}")
-                monsters_by_letter['#'].append(monster_element) # Or handle as an error
-        else:
-            print(f"Warning: Found a monster entry with no name element: {ET.tostring(monster_element, encoding='unicode')}")
-            monsters_by_letter['#'].append(monster_element) # Or handle as an error
+    def commit(self):
+        self._file.write(COMPENDIUM_ROOT_TAG_CLOSE)
+        self._file.close()
+        os.replace(self.temp_path, self.path)
 
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
 
+def iter_monster_elements(xml_file_path):
+    """
+    Streams the top-level <monster> elements of a bestiary file. Each one is yielded once the
+    next sibling starts (or the compendium ends), so its tail text is complete, and is then
+    dropped from the tree. Raises ET.ParseError / FileNotFoundError like ET.parse.
+    """
+    context = ET.iterparse(xml_file_path, events=("start", "end"))
+    _, root = next(context)
+    depth = 0
+    finished = None
+    for event, elem in context:
+        if event == "start":
+            if depth == 0 and finished is not None:
+                yield finished
+                root.remove(finished)
+                finished = None
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0 and elem.tag == 'monster':
+            finished = elem
+        elif depth == 0:
+            root.remove(elem)
+    if finished is not None:
+        yield finished
+
+def split_bestiary(xml_file_paths, output_dir, shard_key=letter_shard_key, prefix=DEFAULT_PREFIX, prune=False):
+    """
+    Streams every <monster> of the input files into <output_dir>/<prefix>_<key>.xml, where key is
+    shard_key(monster). Only the monster being parsed is held in memory; each shard keeps an
+    open writer. All shards are written to temp files and renamed into place only after every
+    input has been read, so splitting into the same directory the inputs live in is safe and a
+    failed run leaves the old shards untouched. With prune, <prefix>_*.xml shards this run did
+    not write and did not read (e.g. a letter with no monsters left, or hash buckets from a
+    larger bucket count) are removed after a successful run; only use it when the inputs are the
+    whole bestiary, since other shards in output_dir are deleted too. Returns {shard path: monster count}.
+    """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    xml_declaration = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    compendium_root_tag_open = '<compendium version="5" auto_indent="NO">\n'
-    compendium_root_tag_close = '</compendium>'
+    writers = {}
+    try:
+        for xml_file_path in xml_file_paths:
+            try:
+                for monster_element in iter_monster_elements(xml_file_path):
+                    key = shard_key(monster_element)
+                    if key not in writers:
+                        writers[key] = ShardWriter(os.path.join(output_dir, f"{prefix}_{key}.xml"))
+                    writers[key].write(ET.tostring(monster_element, encoding='unicode'))
+            except ET.ParseError as e:
+                print(f"Error parsing XML file {xml_file_path}: {e}")
+                raise
+            except FileNotFoundError:
+                print(f"Error: File not found at {xml_file_path}")
+                raise
+    except BaseException as e:
+        # Nothing is renamed into place unless every input was read
+        for writer in writers.values():
+            writer.discard()
+        if isinstance(e, (ET.ParseError, FileNotFoundError)):
+            return {}
+        raise
 
-    for letter, monsters in monsters_by_letter.items():
-        if not monsters:
-            continue
+    for writer in writers.values():
+        writer.commit()
+        print(f"Created {writer.path} with {writer.count} monster(s) ({writer.bytes_written / 1024:.1f} KB).")
+    if prune:
+        prune_stale_shards(output_dir, prefix, xml_file_paths, [writer.path for writer in writers.values()])
+    return {writer.path: writer.count for writer in writers.values()}
 
-        new_xml_file_name = f"bestiary_mm24_{letter}.xml"
-        new_xml_file_path = os.path.join(output_dir, new_xml_file_name)
+def prune_stale_shards(output_dir, prefix, input_paths, written_paths):
+    """Removes every <prefix>_*.xml in output_dir that is neither an input nor a shard just written."""
+    written = {os.path.abspath(path) for path in list(input_paths) + list(written_paths)}
+    for stale_path in sorted(glob.glob(os.path.join(glob.escape(output_dir), f"{glob.escape(prefix)}_*.xml"))):
+        if os.path.abspath(stale_path) not in written:
+            os.remove(stale_path)
+            print(f"Removed stale shard {stale_path}.")
 
-        with open(new_xml_file_path, 'w', encoding='utf-8') as f:
-            f.write(xml_declaration)
-            f.write(compendium_root_tag_open)
-            for monster_element in monsters:
-                # ET.tostring returns bytes, so decode to string
-                monster_xml_str = ET.tostring(monster_element, encoding='unicode')
-                f.write(monster_xml_str + '\n')
-            f.write(compendium_root_tag_close)
-        print(f"Created {new_xml_file_path} with {len(monsters)} monster(s).")
+def split_xml_by_first_letter(xml_file_path, output_dir):
+    """
+    Splits an XML file containing monster entries into multiple XML files,
+    each corresponding to the first letter of the monster's name.
 
-if __name__ == '__main__':
-    # Get the directory of the script
+    Args:
+        xml_file_path (str): The path to the input XML file.
+        output_dir (str): The directory where the split XML files will be saved.
+    """
+    return split_bestiary([xml_file_path], output_dir, shard_key=letter_shard_key)
+
+def main(argv=None):
+    # Paths default to the script's directory, as before
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the full path to the XML file relative to the script directory
-    # This assumes bestiary_mm24.xml is in 01_Core/03_Monster_Manual_2024/ relative to the script's parent directory
-    # Adjust the relative path as necessary if the script is located elsewhere
-    relative_xml_path = '01_Core/03_Monster_Manual_2024/bestiary_mm24.xml'
-    xml_file_to_split = os.path.join(script_dir, relative_xml_path)
-
-    # Define the output directory, also relative to the script's location
-    # This will place the new files in 01_Core/03_Monster_Manual_2024/
-    output_directory = os.path.join(script_dir, '01_Core/03_Monster_Manual_2024/')
-
-    # Ensure the input XML file exists before proceeding
-    if not os.path.exists(xml_file_to_split):
-        print(f"Input XML file not found: {xml_file_to_split}")
+    arg_parser = argparse.ArgumentParser(description="Splits bestiary XML files into shards by a pluggable key.")
+    arg_parser.add_argument("inputs", nargs="*", default=[os.path.join(script_dir, '01_Core/03_Monster_Manual_2024/bestiary_mm24.xml')],
+                            help="Bestiary XML files to split (default: 01_Core/03_Monster_Manual_2024/bestiary_mm24.xml).")
+    arg_parser.add_argument("--output-dir", default=os.path.join(script_dir, '01_Core/03_Monster_Manual_2024/'),
+                            help="Directory for the shard files (default: 01_Core/03_Monster_Manual_2024/).")
+    arg_parser.add_argument("--key", choices=list(SHARD_KEYS) + ["hash"], default="letter",
+                            help="Shard by first letter, CR band, creature type, or stable name-hash buckets (default: letter).")
+    arg_parser.add_argument("--buckets", type=int, help="Hash buckets for --key hash (default: input size / --shard-size).")
+    arg_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                            help=f"Target bytes per shard used to pick --buckets (default: {DEFAULT_SHARD_SIZE}).")
+    arg_parser.add_argument("--prefix", help=f"Shard file name prefix (default: {DEFAULT_PREFIX} for letter, {DEFAULT_PREFIX}-<key> otherwise).")
+    arg_parser.add_argument("--prune", action="store_true",
+                            help="Remove <prefix>_*.xml shards in --output-dir that this run did not write (inputs must cover the whole bestiary).")
+    args = arg_parser.parse_args(argv)
+
+    missing = [path for path in args.inputs if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f"Input XML file not found: {path}")
         print("Please ensure the path is correct and the file exists.")
+        return
+
+    if args.key == "hash":
+        shard_key = make_hash_shard_key(args.buckets or buckets_for_size(args.inputs, args.shard_size))
     else:
-        split_xml_by_first_letter(xml_file_to_split, output_directory)
-        print(f"Splitting complete. Files are in {output_directory}")
+        shard_key = SHARD_KEYS[args.key]
+    split_bestiary(args.inputs, args.output_dir, shard_key=shard_key, prefix=args.prefix or DEFAULT_PREFIXES[args.key],
+                   prune=args.prune)
+    print(f"Splitting complete. Files are in {args.output_dir}")
+
+if __name__ == '__main__':
+    main()
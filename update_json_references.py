@@ -1,5 +1,15 @@
+import argparse
 import json
 import os
+import re
+import xml.etree.ElementTree as ET
+
+from monster_store import normalize_monster_name
+from parse_bestiary import StructuredBestiaryWriter
+from split_bestiary import iter_monster_elements
+
+READ_CHUNK_SIZE = 1 << 20  # characters read at a time by iter_json_array_items
+WHITESPACE_PATTERN = re.compile(r"\s*")
 
 def get_first_letter_of_name(monster_name):
     """Get the first letter of the monster name, or '#' if not a letter."""
@@ -9,6 +19,146 @@ def get_first_letter_of_name(monster_name):
             return first_char
     return '#'
 
+def iter_json_array_items(f, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yields (raw_text, value) for each element of the top-level JSON array in the open text file f,
+    decoding one element at a time from a buffer of about chunk_size characters, so memory use
+    does not depend on the length of the array. Raises ValueError if f is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size)
+    while buffer and not buffer.strip():
+        buffer = f.read(chunk_size)
+    position = WHITESPACE_PATTERN.match(buffer).end()
+    if buffer[position:position + 1] != "[":
+        raise ValueError("JSON data is not a list")
+    position += 1
+    at_end_of_input = False
+    while True:
+        position = WHITESPACE_PATTERN.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        if position < len(buffer) and buffer[position] == ",":
+            position += 1
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            end = None
+        # A value that stops at the end of the buffer (or doesn't decode) may continue in the next chunk
+        if end is None or end == len(buffer):
+            if at_end_of_input:
+                raise ValueError("Truncated or malformed JSON array")
+            more = f.read(chunk_size)
+            at_end_of_input = not more
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield buffer[position:end], value
+        position = end
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+def _iter_jsonl_items(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield line, json.loads(line)
+
+def source_files_from_shards(shard_paths):
+    """{normalized monster name: shard path} for every <monster> in the given bestiary shard files."""
+    by_name = {}
+    for shard_path in shard_paths:
+        for monster_element in iter_monster_elements(shard_path):
+            by_name.setdefault(normalize_monster_name(monster_element.findtext('name', '')), shard_path)
+    return by_name
+
+def _replace_source_file(raw_text, old_source, new_source):
+    """
+    raw_text with its "source_file" pair pointed at new_source, or None unless the old pair occurs
+    exactly once (then the caller re-encodes the whole monster). Editing the text in place is much
+    cheaper than json.dumps(..., indent=4) and gives the same bytes.
+    """
+    for separator in (": ", ":"):
+        old_pair = f'"source_file"{separator}{json.dumps(old_source, ensure_ascii=False)}'
+        if raw_text.count(old_pair) == 1:
+            return raw_text.replace(old_pair, f'"source_file"{separator}{json.dumps(new_source, ensure_ascii=False)}')
+    return None
+
+def detect_indent(raw_text):
+    """
+    Indent width of an array element as written by json.dump(..., indent=N): N, or None if it
+    is compact. N is the first nested line's indentation minus that of the closing brace.
+    """
+    lines = raw_text.split("\n")
+    if len(lines) < 2:
+        return None
+    width = (len(lines[1]) - len(lines[1].lstrip(" "))) - (len(lines[-1]) - len(lines[-1].lstrip(" ")))
+    return width if width > 0 else 4
+
+def rewrite_source_files(json_file_path, mappings=None, by_name=None, output_path=None, indent="detect"):
+    """
+    Rewrites the 'source_file' of monsters in a structured bestiary (.json array or .jsonl) in one
+    streaming pass. mappings is {old source_file: new source_file, or a callable(monster) giving
+    it (None keeps the old one)}; by_name is {normalized name: new source_file} and applies to
+    any monster it names, whatever its current source (e.g. after re-sharding with split_bestiary).
+    Monsters are copied through verbatim; changed ones only get their source_file value edited
+    (or are re-encoded if that pair can't be located). indent is the JSON array's indentation,
+    None for compact; by default it is detected from the first entry so the whole file keeps
+    one style, and given explicitly every entry is re-encoded in that style. The result goes to a temp file that replaces output_path (default: the input)
+    only once the whole file has been written. Returns the number of updated entries.
+    """
+    mappings = mappings or {}
+    by_name = by_name or {}
+    output_path = output_path or json_file_path
+    output_format = "jsonl" if json_file_path.endswith(".jsonl") else "json"
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    restyle = indent != "detect"  # an explicit style re-encodes every entry, not just the changed ones
+    updated_count = 0
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as f:
+            items = _iter_jsonl_items(source) if output_format == "jsonl" else iter_json_array_items(source)
+            writer = None
+            for raw_text, monster in items:
+                if writer is None:
+                    if indent == "detect":
+                        indent = detect_indent(raw_text)
+                    writer = StructuredBestiaryWriter(f, output_format, compact=indent is None, indent=indent or 4)
+                new_source = None
+                if isinstance(monster, dict):
+                    new_source = by_name.get(normalize_monster_name(monster.get('name') or ''))
+                    mapped = mappings.get(monster.get('source_file'))
+                    if new_source is None and mapped is not None:
+                        new_source = mapped(monster) if callable(mapped) else mapped
+                if new_source is None or new_source == monster.get('source_file'):
+                    if restyle:
+                        writer.write(monster)
+                    else:
+                        writer.write_encoded(raw_text)
+                    continue
+                if restyle:
+                    monster['source_file'] = new_source
+                    writer.write(monster)
+                    updated_count += 1
+                    continue
+                replaced = _replace_source_file(raw_text, monster['source_file'], new_source)
+                if replaced is None:
+                    monster['source_file'] = new_source
+                    writer.write(monster)
+                else:
+                    writer.write_encoded(replaced)
+                updated_count += 1
+            if writer is None:
+                f.write("[]" if output_format == "json" else "")
+            else:
+                writer.close()
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, output_path)
+    return updated_count
+
 def update_json_source_files(json_file_path, original_source_name, new_source_prefix, output_dir_for_new_files):
     """
     Updates the 'source_file' field in a JSON file for monster entries.
@@ -22,42 +172,63 @@ def update_json_source_files(json_file_path, original_source_name, new_source_pr
         output_dir_for_new_files (str): The directory where the new XML files are located
                                      (e.g., "01_Core/03_Monster_Manual_2024/").
     """
+    def letter_source_file(monster):
+        name = monster.get('name')
+        if not name:
+            print(f"Warning: Monster entry without a name found, original source: {monster.get('source_file')}")
+            return None
+        return os.path.join(output_dir_for_new_files, f"{new_source_prefix}{get_first_letter_of_name(name)}.xml")
+
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        updated_count = rewrite_source_files(json_file_path, {original_source_name: letter_source_file})
     except FileNotFoundError:
         print(f"Error: JSON file not found at {json_file_path}")
         return
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"Error decoding JSON from {json_file_path}: {e}")
         return
 
-    if not isinstance(data, list):
-        print("Error: JSON data is not a list of monsters.")
-        return
+    print(f"Updated {updated_count} entries in {json_file_path}.")
 
-    updated_count = 0
-    for monster in data:
-        if isinstance(monster, dict) and monster.get('source_file') == original_source_name:
-            name = monster.get('name')
-            if name:
-                first_letter = get_first_letter_of_name(name)
-                new_filename = f"{new_source_prefix}{first_letter}.xml"
-                monster['source_file'] = os.path.join(output_dir_for_new_files, new_filename)
-                updated_count += 1
-            else:
-                print(f"Warning: Monster entry without a name found, original source: {monster.get('source_file')}")
+def _parse_mapping(text):
+    old, separator, new = text.partition("=")
+    if not separator or not old or not new:
+        raise argparse.ArgumentTypeError(f"expected OLD=NEW, got '{text}'")
+    return old, new
 
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Rewrites the source_file of monsters in the structured bestiary.")
+    arg_parser.add_argument("--json", default="bestiario_estructurado.json", help="Structured bestiary (.json or .jsonl).")
+    arg_parser.add_argument("--map", dest="mappings", type=_parse_mapping, action="append", default=[], metavar="OLD=NEW",
+                            help="Replace source_file OLD with NEW (repeatable; all applied in one pass).")
+    arg_parser.add_argument("--shards", nargs="+", default=[], metavar="SHARD",
+                            help="Point every monster found in these bestiary shard files at its shard (after re-sharding).")
+    style = arg_parser.add_mutually_exclusive_group()
+    style.add_argument("--indent", type=int, help="Indentation for re-encoded entries (default: detected from the file).")
+    style.add_argument("--compact", action="store_true", help="Write the JSON array without indentation.")
+    args = arg_parser.parse_args(argv)
+    indent = None if args.compact else (args.indent if args.indent is not None else "detect")
 
-    with open(json_file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    if not args.mappings and not args.shards:
+        # The original one-off: point the unsplit Monster Manual entries at their first-letter shards
+        original_source = '01_Core/03_Monster_Manual_2024/bestiary_mm24.xml'
+        new_prefix = 'bestiary_mm24_'
+        output_dir = '01_Core/03_Monster_Manual_2024/' # Ensure this ends with a slash if os.path.join is used this way
+        update_json_source_files(args.json, original_source, new_prefix, output_dir)
+        return
 
-    print(f"Updated {updated_count} entries in {json_file_path}.")
+    try:
+        updated_count = rewrite_source_files(args.json, dict(args.mappings), source_files_from_shards(args.shards), indent=indent)
+    except FileNotFoundError as e:
+        print(f"Error: File not found {e.filename}")
+        return
+    except ET.ParseError as e:
+        print(f"Error parsing shard XML: {e}")
+        return
+    except ValueError as e:
+        print(f"Error decoding JSON from {args.json}: {e}")
+        return
+    print(f"Updated {updated_count} entries in {args.json}.")
 
 if __name__ == '__main__':
-    json_file = 'bestiario_estructurado.json'
-    original_source = '01_Core/03_Monster_Manual_2024/bestiary_mm24.xml'
-    new_prefix = 'bestiary_mm24_'
-    output_dir = '01_Core/03_Monster_Manual_2024/' # Ensure this ends with a slash if os.path.join is used this way
-
-    update_json_source_files(json_file, original_source, new_prefix, output_dir)
+    main()
@@ -1,30 +1,209 @@
 from lxml import etree
+import argparse
+import hashlib
+import json
+import os
 import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
 
-def validate_xml_file(filepath):
+DEFAULT_ROOT = "01_Core"
+DEFAULT_CACHE_FILE = ".validate_xml_cache.json"
+OUTPUT_FORMATS = ("text", "json", "junit")
+
+_PARSER = None
+
+def get_parser():
+    """The parser this process validates with; built once and reused for every file."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = etree.XMLParser(dtd_validation=False, no_network=True, resolve_entities=False) # Turning off DTD validation for now
+    return _PARSER
+
+def _validator_fingerprint():
+    """Hash of this module's source, so changing the parser settings invalidates the cache."""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def find_xml_files(paths):
+    """Files are taken as given; directories are walked (sorted) for .xml files."""
+    xml_files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            xml_files.append(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            xml_files.extend(os.path.join(dirpath, filename) for filename in sorted(filenames) if filename.endswith('.xml'))
+    return xml_files
+
+def validate_xml_file(filepath, cached_sha256=None):
+    """
+    Reads and hashes filepath, then parses it unless its hash equals cached_sha256.
+    Returns a result dict: file, valid, cached, sha256, error, line, column, seconds.
+    """
+    start = perf_counter()
+    result = {"file": filepath, "valid": False, "cached": False, "sha256": None, "error": None, "line": None, "column": None}
     try:
-        parser = etree.XMLParser(dtd_validation=False, no_network=True) # Turning off DTD validation for now
-        etree.parse(filepath, parser)
-        print(f"Validation successful for {filepath}")
-        return True
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        result["sha256"] = hashlib.sha256(content).hexdigest()
+        if result["sha256"] == cached_sha256:
+            result["valid"] = result["cached"] = True
+        else:
+            etree.fromstring(content, get_parser(), base_url=filepath)
+            result["valid"] = True
     except etree.XMLSyntaxError as e:
-        print(f"Validation failed for {filepath}:")
-        print(e)
-        return False
+        result["error"] = str(e)
+        result["line"], result["column"] = e.position
+    except FileNotFoundError:
+        result["error"] = "File not found"
     except Exception as e:
-        print(f"An unexpected error occurred while validating {filepath}:")
-        print(e)
-        return False
+        result["error"] = f"An unexpected error occurred: {e}"
+    result["seconds"] = perf_counter() - start
+    return result
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python validate_xml.py <file1.xml> [file2.xml ...]")
+def _validate_batch(batch):
+    return [validate_xml_file(filepath, cached_sha256) for filepath, cached_sha256 in batch]
+
+def load_cache(cache_file, fingerprint):
+    """{path: {"mtime_ns", "size", "sha256"}} of files that validated last time, or {} if stale or missing."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("validator") != fingerprint:
+        return {}
+    return cache.get("files", {})
+
+def store_cache(cache_file, fingerprint, entries):
+    temp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"validator": fingerprint, "files": entries}, f, indent=1, sort_keys=True)
+    os.replace(temp_path, cache_file)
+
+def _stat_key(filepath):
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def validate_xml_files(filepaths, jobs=1, cache_file=None, batch_size=8):
+    """
+    Validates every file and returns the result dicts in the order of filepaths.
+
+    With a cache_file, a file whose (path, mtime, size) matches an entry from the last run is
+    skipped without being read. If only its mtime moved, it is hashed and still skipped when the
+    sha256 matches. Only files that validate are cached, so a failing file is always re-checked.
+
+    With jobs > 1 the files to check go to a ProcessPoolExecutor in batches; each worker
+    process parses all of its files with the same lxml parser.
+    """
+    fingerprint = _validator_fingerprint() if cache_file else None
+    cache = load_cache(cache_file, fingerprint) if cache_file else {}
+    stat_keys = {filepath: _stat_key(filepath) for filepath in filepaths}
+
+    results = {}
+    pending = []
+    for filepath in filepaths:
+        entry = cache.get(filepath)
+        if entry and stat_keys[filepath] == (entry["mtime_ns"], entry["size"]):
+            results[filepath] = {"file": filepath, "valid": True, "cached": True, "sha256": entry["sha256"],
+                                 "error": None, "line": None, "column": None, "seconds": 0.0}
+        else:
+            pending.append((filepath, entry["sha256"] if entry else None))
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    if jobs > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(batches))) as executor:
+            checked = [result for batch_results in executor.map(_validate_batch, batches) for result in batch_results]
+    else:
+        checked = [result for batch in batches for result in _validate_batch(batch)]
+    for result in checked:
+        results[result["file"]] = result
+
+    if cache_file:
+        entries = {}
+        for filepath in filepaths:
+            result = results[filepath]
+            if result["valid"] and stat_keys[filepath] is not None:
+                mtime_ns, size = stat_keys[filepath]
+                entries[filepath] = {"mtime_ns": mtime_ns, "size": size, "sha256": result["sha256"]}
+        store_cache(cache_file, fingerprint, entries)
+    return [results[filepath] for filepath in filepaths]
+
+def format_junit(results, seconds):
+    """JUnit XML report: one testcase per file, a <failure> for each invalid one."""
+    failures = [result for result in results if not result["valid"]]
+    suite = ET.Element("testsuite", name="validate_xml", tests=str(len(results)), failures=str(len(failures)),
+                       errors="0", skipped="0", time=f"{seconds:.3f}")
+    for result in results:
+        case = ET.SubElement(suite, "testcase", classname=os.path.dirname(result["file"]) or ".",
+                             name=os.path.basename(result["file"]), file=result["file"], time=f"{result['seconds']:.4f}")
+        if not result["valid"]:
+            failure = ET.SubElement(case, "failure", message=result["error"].splitlines()[0] if result["error"] else "Invalid XML")
+            failure.text = result["error"]
+    testsuites = ET.Element("testsuites")
+    testsuites.append(suite)
+    ET.indent(testsuites, space="  ")
+    return ET.tostring(testsuites, encoding="unicode", xml_declaration=True) + "\n"
+
+def format_json(results, seconds):
+    report = {
+        "files": len(results),
+        "cached": sum(result["cached"] for result in results),
+        "failed": sum(not result["valid"] for result in results),
+        "seconds": round(seconds, 4),
+        "results": [{key: result[key] for key in ("file", "valid", "cached", "error", "line", "column")} for result in results],
+    }
+    return json.dumps(report, indent=4, ensure_ascii=False) + "\n"
+
+def format_text(results, seconds):
+    lines = []
+    for result in results:
+        if not result["valid"]:
+            lines.append(f"Validation failed for {result['file']}:")
+            lines.append(result["error"])
+    cached = sum(result["cached"] for result in results)
+    failed = sum(not result["valid"] for result in results)
+    lines.append(f"Validated {len(results)} files ({cached} unchanged, skipped) in {seconds:.3f}s: "
+                 + (f"{failed} failed." if failed else "all valid."))
+    return "\n".join(lines) + "\n"
+
+FORMATTERS = {"text": format_text, "json": format_json, "junit": format_junit}
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Checks that XML files are well-formed.")
+    arg_parser.add_argument("paths", nargs="*", default=[DEFAULT_ROOT],
+                            help=f"XML files and/or directories to walk (default: {DEFAULT_ROOT}).")
+    arg_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="text", help="Report format (default: text).")
+    arg_parser.add_argument("--output", default="-", help="Report file, or - for stdout (default).")
+    arg_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (default: one per CPU; 1 validates serially).")
+    arg_parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE,
+                            help=f"Results of the last run, used to skip unchanged files (default: {DEFAULT_CACHE_FILE}).")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Validate every file and leave the cache untouched.")
+    args = arg_parser.parse_args(argv)
+
+    xml_files = find_xml_files(args.paths)
+    if not xml_files:
+        print(f"Error: no XML files found in {' '.join(args.paths)}")
         sys.exit(1)
 
-    all_valid = True
-    for filepath in sys.argv[1:]:
-        if not validate_xml_file(filepath):
-            all_valid = False
+    start = perf_counter()
+    results = validate_xml_files(xml_files, jobs=args.jobs, cache_file=None if args.no_cache else args.cache_file)
+    report = FORMATTERS[args.format](results, perf_counter() - start)
+    if args.output == "-":
+        sys.stdout.write(report)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
 
-    if not all_valid:
+    if not all(result["valid"] for result in results):
         sys.exit(1)
+
+if __name__ == "__main__":
+    main()